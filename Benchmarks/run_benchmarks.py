@@ -0,0 +1,257 @@
+"""Reproducible, offline benchmarks of RouteArt's hot paths.
+
+Every case runs headless (SDL dummy video driver) inside a scratch working directory, maps come from a local stand-in for Geoapify.
+Each case is timed over several repeats without tracing, then run once more under tracemalloc to record its peak memory.
+Results are written as JSON, which can be compared against a previous run to spot regressions between commits.
+
+Example:
+    python -m Benchmarks.run_benchmarks --output bench_before.json
+    python -m Benchmarks.run_benchmarks --output bench_after.json --compare bench_before.json
+"""
+import argparse
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dump as dump_to_json, load as load_json_file
+from pathlib import Path
+from typing import Callable
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_TEST_IMAGES_DIRECTORY = _REPO_ROOT / "Test_Images"
+
+_DEFAULT_SIZES = (10, 1_000, 100_000, 1_000_000)
+# file_receiver re-reads the whole file for every fix, so replaying is quadratic & capped to keep the suite finishing
+_FILE_REPLAY_MAX_SIZE = 10_000
+
+_CENTRE = {"latitude": 52.953241, "longitude": -1.1873294}
+_MAP_SIZE = (760, 630)
+_ZOOM = 15
+
+
+def synthetic_track(size: int, seed: int = 0) -> list[dict[str, float]]:
+    """A wandering walk of size GPS fixes around _CENTRE, the same for the same seed."""
+    generator = random.Random(seed)
+    latitude, longitude, bearing = _CENTRE["latitude"], _CENTRE["longitude"], 0.0
+
+    track = []
+    for _ in range(size):
+        bearing += generator.gauss(0, 0.3)
+        latitude += 0.00002 * math.cos(bearing)
+        longitude += 0.00003 * math.sin(bearing)
+        track.append({"latitude": latitude, "longitude": longitude})
+
+    return track
+
+
+def raw_gps_line(point: dict[str, float], time_ms: int) -> str:
+    # Same layout as the lines the phone sends & example_gps_data.txt holds
+    return str({"network": {"altitude": 78.6, "latitude": point["latitude"], "longitude": point["longitude"], "time": time_ms, "accuracy": 12.7, "speed": 0, "provider": "network", "bearing": 0}})
+
+
+class _StandInMapHandler(BaseHTTPRequestHandler):
+    map_image: bytes = b""
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(self.map_image)))
+        self.end_headers()
+        self.wfile.write(self.map_image)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_stand_in_map_server() -> ThreadingHTTPServer:
+    """Local HTTP server answering every static map request with the same image."""
+    import cv2
+    import numpy as np
+
+    generator = np.random.default_rng(0)
+    image = generator.integers(200, 255, (_MAP_SIZE[1], _MAP_SIZE[0], 3), dtype=np.uint8)
+    _StandInMapHandler.map_image = cv2.imencode(".jpg", image)[1].tobytes()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInMapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def measure(function: Callable[[], None], repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"median_seconds": statistics.median(timings), "min_seconds": min(timings), "repeats": repeats, "peak_bytes": peak_bytes}
+
+
+def _write_lat_long(track: list[dict[str, float]]) -> None:
+    with open("lat_long.json", "w") as file:
+        dump_to_json({"desired_map_original_centre": _CENTRE, "drawing_points": track}, file)
+
+
+def benchmark_cases(sizes: list[int]) -> list[tuple[str, int, Callable[[], None]]]:
+    """(name, size, run) for every case, setup happens here so it isn't timed."""
+    from Core import gps, maps, routes
+    from GPS_Data_Receivers import file_receiver
+    from Image_Comparisons.Image_Comparer import image_similarity
+
+    cases = []
+    for size in sizes:
+        track = synthetic_track(size)
+        raw_lines = [raw_gps_line(point, i * 1000) for (i, point) in enumerate(track)]
+
+        cases.append(("gps_parse", size, lambda raw_lines=raw_lines: [gps.extract_current_location(line) for line in raw_lines]))
+
+        if size <= _FILE_REPLAY_MAX_SIZE:
+            def file_replay(raw_lines=raw_lines) -> None:
+                with open(file_receiver.EXAMPLE_GPS_DATA_FILE_PATH, "w") as file:
+                    file.write("\n".join(raw_lines))
+                file_receiver.line_num = 0
+                for _ in raw_lines:
+                    file_receiver.get_raw_location_data()
+
+            cases.append(("file_replay", size, file_replay))
+
+        def route_render(track=track) -> None:
+            _write_lat_long(track)
+            routes.get_walking_drawing_image_path(*_MAP_SIZE, _ZOOM)
+
+        cases.append(("route_render", size, route_render))
+
+    def map_cache_miss() -> None:
+        for directory in ("Desired_Background_Map_Images", "Walking_Background_Map_Images"):
+            shutil.rmtree(directory, ignore_errors=True)
+            os.mkdir(directory)
+        maps.get_desired_background_map_image(*_MAP_SIZE, _ZOOM, _CENTRE)
+
+    def map_cache_hits() -> None:
+        for _ in range(1000):
+            maps.get_desired_background_map_image(*_MAP_SIZE, _ZOOM, _CENTRE)
+
+    cases.append(("map_cache_miss", 1, map_cache_miss))
+    cases.append(("map_cache_hit", 1000, map_cache_hits))
+
+    route_image_path = routes.get_walking_drawing_image_path(*_MAP_SIZE, _ZOOM)
+    for drawing_path in sorted(_TEST_IMAGES_DIRECTORY.glob("*.jpg")):
+        cases.append((f"image_similarity[{drawing_path.stem}]", 1, lambda drawing_path=drawing_path: image_similarity(route_image_path, drawing_path)))
+
+    return cases
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=_REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> bool:
+    """Prints how each case moved against the baseline, True when any got slower than threshold times."""
+    baseline_by_case = {(result["name"], result["size"]): result for result in baseline}
+
+    regressed = False
+    for result in results:
+        previous = baseline_by_case.get((result["name"], result["size"]))
+        if previous is None or "error" in result or "error" in previous:
+            continue
+
+        ratio = result["median_seconds"] / previous["median_seconds"] if previous["median_seconds"] else math.inf
+        regressed = regressed or ratio > threshold
+        print(f"{result['name']:<32}{result['size']:>10} {ratio:>7.2f}x time {result['peak_bytes'] / max(previous['peak_bytes'], 1):>7.2f}x memory" + ("  REGRESSION" if ratio > threshold else ""))
+
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run RouteArt's offline benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(_DEFAULT_SIZES), help="Synthetic track lengths to run.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON here.")
+    parser.add_argument("--compare", type=Path, help="Results JSON from an earlier run to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression.")
+    args = parser.parse_args(argv)
+
+    scratch_directory = Path(tempfile.mkdtemp(prefix="routeart_bench_"))
+    server = start_stand_in_map_server()
+
+    # Settings have to be in place before RouteArt's modules read them on import
+    os.environ.update({
+        "SDL_VIDEODRIVER": "dummy",
+        "PYGAME_HIDE_SUPPORT_PROMPT": "1",
+        "RECEIVER_FUNC": "file",
+        "EXAMPLE_GPS_DATA_FILE_NAME": str(scratch_directory / "gps_data.txt"),
+        "PRETEND_SOCKET_WAIT_TIME": "0",
+        "GEOAPIFY_API_KEY": "benchmark",
+        "GEOAPIFY_STATIC_MAP_URL": f"http://127.0.0.1:{server.server_port}/staticmap",
+        "LOG_LEVEL": "critical",
+    })
+    sys.path.insert(0, str(_REPO_ROOT))
+
+    original_directory = os.getcwd()
+    os.chdir(scratch_directory)
+    try:
+        for directory in ("Desired_Background_Map_Images", "Walking_Background_Map_Images", "Route_GPS_Drawings"):
+            os.mkdir(directory)
+        _write_lat_long(synthetic_track(2))
+
+        results = []
+        for (name, size, function) in benchmark_cases(args.sizes):
+            if args.filter not in name:
+                continue
+
+            try:
+                result = {"name": name, "size": size, **measure(function, args.repeats)}
+            except Exception as e:
+                # A case that can't run, e.g. a test image image_similarity can't handle, is reported without stopping the rest
+                results.append({"name": name, "size": size, "error": f"{type(e).__name__}: {e}"})
+                print(f"{name:<32}{size:>10} failed: {type(e).__name__}: {e}", flush=True)
+                continue
+
+            results.append(result)
+            print(f"{name:<32}{size:>10} {result['median_seconds'] * 1000:>12.3f}ms {result['peak_bytes'] / 2 ** 20:>10.2f}MiB", flush=True)
+    finally:
+        os.chdir(original_directory)
+        server.shutdown()
+        shutil.rmtree(scratch_directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            dump_to_json({
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": sys.version,
+                "platform": platform.platform(),
+                "results": results,
+            }, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            return 1 if compare(results, load_json_file(file)["results"], args.threshold) else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Checks that importing RouteArt stays fast & free of side effects.
+
+Each module is imported in a fresh interpreter several times, the median import time is compared against the budget.
+Importing must not open a window, create a Tk root or pull in the heavy image & network libraries.
+
+Example:
+    python -m Benchmarks.startup_time --budget-ms 400
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from json import loads as convert_json_string_to_dict
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that should only be loaded once the feature needing them is used, numpy isn't listed because pygame imports it itself
+_HEAVY_MODULES = ("cv2", "PIL.Image", "matplotlib", "requests", "tkinter")
+
+_CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+pygame = sys.modules.get("pygame")
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy_modules": [name for name in {heavy_modules!r} if name in sys.modules],
+    "display_initialised": bool(pygame and pygame.display.get_init()),
+}}))
+"""
+
+
+def measure_import(module: str, repeats: int) -> dict:
+    env = {
+        **os.environ,
+        "SDL_VIDEODRIVER": "dummy",
+        "PYGAME_HIDE_SUPPORT_PROMPT": "1",
+        "RECEIVER_FUNC": "file",
+        "EXAMPLE_GPS_DATA_FILE_NAME": os.environ.get("EXAMPLE_GPS_DATA_FILE_NAME", "GPS_Data_Receivers/example_gps_data.txt"),
+    }
+
+    runs = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, "-c", _CHILD_CODE.format(module=module, heavy_modules=_HEAVY_MODULES)],
+            cwd=_REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        runs.append(convert_json_string_to_dict(completed.stdout.strip().splitlines()[-1]))
+
+    return {
+        "module": module,
+        "median_seconds": statistics.median(run["seconds"] for run in runs),
+        "heavy_modules": sorted({name for run in runs for name in run["heavy_modules"]}),
+        "display_initialised": any(run["display_initialised"] for run in runs),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check RouteArt's import time against a budget.")
+    parser.add_argument("--budget-ms", type=float, default=400, help="Largest allowed median import time per module.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per module.")
+    parser.add_argument("modules", nargs="*", default=["main", "Core.gps", "Core.maps", "Core.routes"], help="Modules to import.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        result = measure_import(module, args.repeats)
+        problems = []
+        if result["median_seconds"] * 1000 > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:.0f}ms budget")
+        if result["heavy_modules"]:
+            problems.append(f"imported {', '.join(result['heavy_modules'])}")
+        if result["display_initialised"]:
+            problems.append("initialised the display")
+
+        failed = failed or bool(problems)
+        print(f"{module}: {result['median_seconds'] * 1000:.1f}ms" + (f" ({'; '.join(problems)})" if problems else ""))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import hashlib
+from pathlib import Path
+
+
+# Unlike hash(), stays the same between runs & processes, so cached files are actually found again
+def cache_file_name(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+# Keys cached results of processing a file by what is in it, so the same drawing under another name is still found
+def file_content_hash(file_path: str | Path) -> str:
+    sha = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha.update(chunk)
+
+    return sha.hexdigest()
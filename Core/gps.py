@@ -0,0 +1,51 @@
+import logging
+from json import loads as convert_json_string_to_dict
+from os import getenv
+
+from dotenv import load_dotenv
+
+from Core.lazy_imports import lazy_import
+from Core.metrics import timed
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL
+
+load_dotenv()
+
+_ALLOWED_RECEIVER_FUNCS = ("file", "socket")
+RECEIVER_FUNC = getenv("RECEIVER_FUNC", "file")
+if RECEIVER_FUNC not in _ALLOWED_RECEIVER_FUNCS:
+    raise ValueError(f"Environment variable RECEIVER_FUNC must be one of {repr(_ALLOWED_RECEIVER_FUNCS)}")
+
+# The receiver is only imported when the first location is asked for, the socket receiver waits for a phone to connect
+if RECEIVER_FUNC == _ALLOWED_RECEIVER_FUNCS[0]:
+    _receiver = lazy_import("GPS_Data_Receivers.file_receiver")
+elif RECEIVER_FUNC == _ALLOWED_RECEIVER_FUNCS[1]:
+    _receiver = lazy_import("GPS_Data_Receivers.socket_receiver")
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def get_raw_location_data() -> str:
+    return _receiver.get_raw_location_data()
+
+
+@timed("gps.parse")
+def extract_current_location(raw_gps_string: str) -> dict[str, float]:
+    raw_gps_data: dict = convert_json_string_to_dict(raw_gps_string.replace("'", "\""))
+
+    logger.debug("Raw GPS data successfully extracted from JSON.")
+
+    return {
+        "latitude": raw_gps_data["network"]["latitude"],
+        "longitude": raw_gps_data["network"]["longitude"]
+    }
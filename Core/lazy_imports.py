@@ -0,0 +1,17 @@
+import importlib
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that is only really imported the first time one of its attributes is used."""
+
+    def __getattr__(self, name: str):
+        module = importlib.import_module(self.__name__)
+        # Later lookups find the real attributes directly & never come back here
+        self.__dict__.update(module.__dict__)
+
+        return getattr(module, name)
+
+
+def lazy_import(name: str) -> ModuleType:
+    return LazyModule(name)
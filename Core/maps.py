@@ -0,0 +1,158 @@
+import logging
+import os.path
+import shutil
+from json import load as load_json_file
+from os import getenv
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from Core.cache_keys import cache_file_name
+from Core.gps import extract_current_location, get_raw_location_data
+from Core.lazy_imports import lazy_import
+from Core.metrics import span
+from exceptions import FailedRequestError
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL
+
+requests = lazy_import("requests")
+
+load_dotenv()
+
+# noinspection SpellCheckingInspection
+_ALLOWED_OSM_MAP_STYLES = ("osm-carto", "osm-bright", "osm-bright-grey", "osm-bright-smooth", "klokantech-basic", "osm-liberty", "maptiler-3d", "toner", "toner-grey", "positron")
+OSM_MAP_STYLE = getenv("OSM_MAP_STYLE", "osm-carto")
+if OSM_MAP_STYLE not in _ALLOWED_OSM_MAP_STYLES:
+    raise ValueError(f"Environment variable OSM_MAP_STYLE must be one of {repr(_ALLOWED_OSM_MAP_STYLES)}")
+
+_ALLOWED_MAP_IMAGE_FILE_EXTENSIONS = (".jpg", ".png", ".bmp", ".jpeg")
+MAP_IMAGE_FILE_EXTENSION = getenv("MAP_IMAGE_FILE_EXTENSION", ".jpg").lower()
+if MAP_IMAGE_FILE_EXTENSION not in _ALLOWED_MAP_IMAGE_FILE_EXTENSIONS:
+    raise ValueError(f"Environment variable MAP_IMAGE_FILE_EXTENSION must be one of {repr(_ALLOWED_MAP_IMAGE_FILE_EXTENSIONS)}")
+
+# noinspection SpellCheckingInspection
+GEOAPIFY_API_KEY = getenv("GEOAPIFY_API_KEY")
+
+# Can be pointed at a local stand-in server for offline benchmarks & testing
+# noinspection SpellCheckingInspection
+GEOAPIFY_STATIC_MAP_URL = getenv("GEOAPIFY_STATIC_MAP_URL", "https://maps.geoapify.com/v1/staticmap")
+
+# Seconds to wait to connect & between bytes of a map download, so a stalled download fails rather than hanging the app on quit
+_MAP_REQUEST_TIMEOUT_SECONDS = 10
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+# The key is only needed once a map is downloaded, so code that never fetches maps can import this module without one
+def _check_api_key() -> None:
+    if not GEOAPIFY_API_KEY:
+        # noinspection SpellCheckingInspection
+        raise ValueError(f"Environment variable GEOAPIFY_API_KEY must be provided.")
+
+
+def get_desired_background_map_image(width: int | float, height: int | float, zoom: int | float, latlon: dict[str, float] = None) -> Path:
+    if isinstance(width, (int, float)):
+        if not 50 < width <= 10000:
+            raise ValueError("Parameter width must be between 50 & 10000.")
+    else:
+        raise TypeError("Parameter width must be an integer or a float.")
+
+    if isinstance(height, (int, float)):
+        if not 50 < height <= 10000:
+            raise ValueError("Parameter height must be between 50 & 10000.")
+    else:
+        raise TypeError("Parameter height must be an integer or a float.")
+
+    if isinstance(zoom, (int, float)):
+        if not 1 <= zoom <= 20:
+            raise ValueError("Parameter zoom must be between 1 & 20.")
+    else:
+        raise TypeError("Parameter zoom must be an integer or a float.")
+
+    _check_api_key()
+
+    if not latlon:
+        map_centre = extract_current_location(raw_gps_string=get_raw_location_data())
+    else:
+        map_centre = latlon
+
+    file_path = Path(f"""Desired_Background_Map_Images/{cache_file_name(f"{OSM_MAP_STYLE},{width},{height},{map_centre},{zoom},{GEOAPIFY_API_KEY}") + MAP_IMAGE_FILE_EXTENSION}""")
+    logger.debug(f"{OSM_MAP_STYLE},{width},{height},{map_centre},{zoom}")
+    if not os.path.isfile(file_path):
+        with span("map.download"):
+            map_image_response = requests.get(
+                f"""{GEOAPIFY_STATIC_MAP_URL}?style={OSM_MAP_STYLE}&width={width}&height={height}&center=lonlat:{map_centre["longitude"]},{map_centre["latitude"]}&zoom={zoom}&apiKey={GEOAPIFY_API_KEY}""",
+                stream=True, timeout=_MAP_REQUEST_TIMEOUT_SECONDS
+            )
+
+            if map_image_response.status_code == 200:
+                with open(file_path, "wb") as file:
+                    shutil.copyfileobj(map_image_response.raw, file)
+                logger.info("Desired map image background successfully downloaded.")
+            else:
+                raise FailedRequestError(response=map_image_response)
+    else:
+        logger.info("Cached image already exists")
+
+    return file_path
+
+
+def get_walking_background_map_image(width: int | float, height: int | float, zoom: int | float, marker_latlon: dict[str, float] = None, map_centre: dict[str, float] = None) -> Path:
+    if isinstance(width, (int, float)):
+        if not 50 < width <= 10000:
+            raise ValueError("Parameter width must be between 50 & 10000.")
+    else:
+        raise TypeError("Parameter width must be an integer or a float.")
+
+    if isinstance(height, (int, float)):
+        if not 50 < height <= 10000:
+            raise ValueError("Parameter height must be between 50 & 10000.")
+    else:
+        raise TypeError("Parameter height must be an integer or a float.")
+
+    if isinstance(zoom, (int, float)):
+        if not 1 <= zoom <= 20:
+            raise ValueError("Parameter zoom must be between 1 & 20.")
+    else:
+        raise TypeError("Parameter zoom must be an integer or a float.")
+
+    _check_api_key()
+
+    # The server passes each walker's centre in, the desktop app keeps it in lat_long.json
+    if map_centre:
+        desired_map_original_centre = map_centre
+    else:
+        with open(Path("lat_long.json"), "r") as file:
+            desired_map_original_centre: dict[str, float] = load_json_file(file)["desired_map_original_centre"]
+    if not marker_latlon:
+        current_location = extract_current_location(raw_gps_string=get_raw_location_data())
+    else:
+        current_location = marker_latlon
+
+    file_path = Path(f"""Walking_Background_Map_Images/{cache_file_name(f"{OSM_MAP_STYLE},{width},{height},{desired_map_original_centre},{zoom},{current_location},{GEOAPIFY_API_KEY}") + MAP_IMAGE_FILE_EXTENSION}""")
+    if not os.path.isfile(file_path):
+        with span("map.download"):
+            # noinspection SpellCheckingInspection
+            map_image_response = requests.get(
+                f"""{GEOAPIFY_STATIC_MAP_URL}?style={OSM_MAP_STYLE}&width={width}&height={height}&center=lonlat:{desired_map_original_centre["longitude"]},{desired_map_original_centre["latitude"]}&zoom={zoom}&marker=lonlat:{current_location["longitude"]},{current_location["latitude"]};type:awesome;color:red;icon:user;iconsize:large;whitecircle:no&apiKey={GEOAPIFY_API_KEY}""",
+                stream=True, timeout=_MAP_REQUEST_TIMEOUT_SECONDS
+            )
+
+            if map_image_response.status_code == 200:
+                with open(file_path, "wb") as file:
+                    shutil.copyfileobj(map_image_response.raw, file)
+                logger.info("Walking map image background successfully downloaded.")
+            else:
+                raise FailedRequestError(response=map_image_response)
+
+    return file_path
@@ -0,0 +1,168 @@
+import atexit
+import logging
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from json import dump as dump_to_json
+from pathlib import Path
+from typing import Callable
+
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL, METRICS_ENABLED, METRICS_FILE_NAME
+
+# Percentiles come from the most recent samples of each span, count, total & max cover the whole run
+_RECENT_SAMPLES_PER_SPAN = 2048
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=_RECENT_SAMPLES_PER_SPAN)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.recent:
+            return 0.0
+
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "max_seconds": self.max,
+        }
+
+
+histograms: dict[str, Histogram] = {}
+
+
+def record(name: str, seconds: float) -> None:
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram()
+
+    histogram.record(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        record(self.name, time.perf_counter() - self.start)
+
+
+# One shared do-nothing context manager, so a disabled span doesn't even allocate
+_DISABLED_SPAN = nullcontext()
+
+
+def span(name: str):
+    """Context manager timing its block into the named histogram, does nothing unless METRICS is on."""
+    if not METRICS_ENABLED:
+        return _DISABLED_SPAN
+
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call into the named histogram, the function is left untouched unless METRICS is on."""
+    def decorator(function: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def summaries() -> dict[str, dict[str, float]]:
+    return {name: histogram.summary() for (name, histogram) in sorted(histograms.items())}
+
+
+def overlay_lines(fps: float) -> list[str]:
+    """Text for the on-screen overlay, the frame rate then one line per span."""
+    lines = [f"{fps:5.1f} fps"]
+    if not METRICS_ENABLED:
+        return lines + ["Set METRICS=on for stage timings"]
+
+    for (name, summary) in summaries().items():
+        lines.append(
+            f"{name:<24} p50 {summary['p50_seconds'] * 1000:8.1f}ms  p95 {summary['p95_seconds'] * 1000:8.1f}ms"
+            f"  max {summary['max_seconds'] * 1000:8.1f}ms  n={summary['count']}"
+        )
+
+    return lines
+
+
+def to_prometheus_text() -> str:
+    lines = [
+        "# HELP routeart_span_seconds Time spent in each instrumented stage.",
+        "# TYPE routeart_span_seconds summary",
+    ]
+    for (name, summary) in summaries().items():
+        lines.append(f'routeart_span_seconds{{span="{name}",quantile="0.5"}} {summary["p50_seconds"]}')
+        lines.append(f'routeart_span_seconds{{span="{name}",quantile="0.95"}} {summary["p95_seconds"]}')
+        lines.append(f'routeart_span_seconds_sum{{span="{name}"}} {summary["total_seconds"]}')
+        lines.append(f'routeart_span_seconds_count{{span="{name}"}} {summary["count"]}')
+
+    lines.append("# HELP routeart_span_max_seconds Longest single run of each instrumented stage.")
+    lines.append("# TYPE routeart_span_max_seconds gauge")
+    for (name, summary) in summaries().items():
+        lines.append(f'routeart_span_max_seconds{{span="{name}"}} {summary["max_seconds"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def dump(file_path: Path) -> None:
+    """Writes every span's summary to file_path, as Prometheus text for .prom files & JSON otherwise."""
+    file_path = Path(file_path)
+    with open(file_path, "w") as file:
+        if file_path.suffix == ".prom":
+            file.write(to_prometheus_text())
+        else:
+            dump_to_json(summaries(), file, indent=2)
+
+    logger.info(f"Span metrics written to {file_path}")
+
+
+if METRICS_ENABLED and METRICS_FILE_NAME is not None:
+    atexit.register(dump, Path(METRICS_FILE_NAME))
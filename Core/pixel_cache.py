@@ -0,0 +1,102 @@
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from Core.lazy_imports import lazy_import
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL
+
+pygame = lazy_import("pygame")
+
+RAW_MAP_IMAGES_DIRECTORY = Path("Raw_Map_Images")
+
+# Magic, version, pixel format, width, height, source file size & mtime, padded so the pixels start 64 byte aligned
+_HEADER = struct.Struct("<4sB4sIIQQ")
+_HEADER_SIZE = 64
+_MAGIC = b"RAPX"
+_VERSION = 1
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def _raw_path(source_path: Path) -> Path:
+    return RAW_MAP_IMAGES_DIRECTORY / f"{source_path.stem}{source_path.suffix.replace('.', '_')}.raw"
+
+
+def _map_raw_file(raw_path: Path, source_stat: os.stat_result) -> "pygame.Surface | None":
+    with open(raw_path, "rb") as file:
+        # The mapping stays valid after the file is closed, the surface keeps it alive for as long as it's used. Mapped
+        # copy on write, so drawing onto the surface changes a private copy of the touched pages rather than crashing
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if len(mapped) < _HEADER_SIZE:
+        return None
+
+    magic, version, pixel_format, width, height, source_size, source_mtime = _HEADER.unpack_from(mapped)
+    pixel_format = pixel_format.rstrip(b"\0").decode("ascii")
+    if (
+            magic != _MAGIC or version != _VERSION or pixel_format not in ("RGB", "RGBA")
+            or (source_size, source_mtime) != (source_stat.st_size, source_stat.st_mtime_ns)
+            or len(mapped) != _HEADER_SIZE + width * height * len(pixel_format)
+    ):
+        return None
+
+    return pygame.image.frombuffer(memoryview(mapped)[_HEADER_SIZE:], (width, height), pixel_format)
+
+
+def _write_raw_file(raw_path: Path, surface: "pygame.Surface", source_stat: os.stat_result) -> None:
+    pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+    width, height = surface.get_size()
+
+    header = _HEADER.pack(_MAGIC, _VERSION, pixel_format.encode("ascii"), width, height, source_stat.st_size, source_stat.st_mtime_ns)
+
+    # Written beside the real name & renamed over it, so another process never maps a half written file
+    temporary_path = raw_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary_path, "wb") as file:
+        file.write(header.ljust(_HEADER_SIZE, b"\0"))
+        file.write(pygame.image.tostring(surface, pixel_format))
+    os.replace(temporary_path, raw_path)
+
+
+def load_surface(source_path: str | Path) -> "pygame.Surface":
+    """Surface of a cached map image, backed straight by a memory mapped file of its decoded pixels.
+
+    The first load decodes the compressed image as usual & writes its pixels to Raw_Map_Images/, later loads, in this
+    or any other process, map that file without decoding or copying. The compressed image stays the durable copy, the
+    raw file is remade whenever it's missing or the compressed image it came from has changed.
+    """
+    source_path = Path(source_path)
+    source_stat = source_path.stat()
+    raw_path = _raw_path(source_path)
+
+    if raw_path.is_file():
+        try:
+            surface = _map_raw_file(raw_path, source_stat)
+        except (OSError, ValueError, struct.error):
+            surface = None
+
+        if surface is not None:
+            logger.debug(f"Mapped raw pixels of {source_path}")
+            return surface
+
+    surface = pygame.image.load(source_path)
+    try:
+        _write_raw_file(raw_path, surface, source_stat)
+    except OSError as e:
+        # Losing the fast path isn't worth failing the load over
+        logger.warning(f"Couldn't write raw pixels of {source_path}: {e}")
+        return surface
+
+    return _map_raw_file(raw_path, source_stat) or surface
@@ -0,0 +1,96 @@
+import atexit
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL, PROFILE_TOP_N
+
+PROFILES_DIRECTORY = Path("Profiles")
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+class StateProfiler:
+    """Captures a cProfile & tracemalloc profile for each visit to a UI state.
+
+    Every visit writes <n>_<state>.prof (open with pstats or snakeviz), <n>_<state>.snapshot (tracemalloc.Snapshot.load)
+    & <n>_<state>.txt, a summary of the slowest functions & the lines whose allocations grew most during the visit.
+    Each run of the program gets its own timestamped folder inside directory.
+    """
+
+    def __init__(self, directory: Path = PROFILES_DIRECTORY, top_n: int = PROFILE_TOP_N) -> None:
+        self.run_directory = Path(directory) / time.strftime("%Y%m%d-%H%M%S")
+        self.top_n = top_n
+
+        self._visits = 0
+        self._state: str | None = None
+        self._profile: cProfile.Profile | None = None
+        self._start_snapshot: tracemalloc.Snapshot | None = None
+        self._start_time = 0.0
+
+        atexit.register(self.stop)
+
+    def start(self, state: str) -> None:
+        """Finishes the current state's capture & starts capturing state."""
+        self.stop()
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        self._state = state
+        self._start_snapshot = tracemalloc.take_snapshot()
+        self._start_time = time.perf_counter()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        if self._profile is None:
+            return
+
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start_time
+        snapshot = tracemalloc.take_snapshot()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+
+        self._visits += 1
+        self.run_directory.mkdir(parents=True, exist_ok=True)
+        file_stem = self.run_directory / f"{self._visits:02d}_{self._state}"
+
+        self._profile.dump_stats(f"{file_stem}.prof")
+        snapshot.dump(f"{file_stem}.snapshot")
+        with open(f"{file_stem}.txt", "w") as file:
+            file.write(self._summary(snapshot, elapsed, peak_bytes))
+
+        logger.info(f"Profile of state {self._state} written to {file_stem}.*")
+
+        self._profile = None
+        self._start_snapshot = None
+
+    def _summary(self, snapshot: tracemalloc.Snapshot, elapsed: float, peak_bytes: int) -> str:
+        summary = io.StringIO()
+        summary.write(f"State {self._state}: {elapsed:.2f}s, peak traced memory {peak_bytes / 2 ** 20:.2f}MiB\n\n")
+
+        summary.write(f"Top {self.top_n} functions by cumulative time\n")
+        pstats.Stats(self._profile, stream=summary).strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+
+        summary.write(f"Top {self.top_n} lines by memory allocated during the state\n")
+        for difference in snapshot.compare_to(self._start_snapshot, "lineno")[:self.top_n]:
+            summary.write(f"{difference}\n")
+
+        return summary.getvalue()
@@ -0,0 +1,138 @@
+from json import dump as dump_to_json, dumps as convert_dict_to_json_string, load as load_json_file, loads as convert_json_string_to_dict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from Core.cache_keys import cache_file_name
+from Core.lazy_imports import lazy_import
+from Core.metrics import span, timed
+from Route_Geometry.projection import latlon_to_pixel, metres_per_pixel, pixel_to_metres
+
+if TYPE_CHECKING:
+    from Route_Geometry.coverage import CoverageMap
+    from Route_Geometry.spatial_index import SegmentIndex
+    from Route_Geometry.track_pyramid import TrackPyramid
+
+pygame = lazy_import("pygame")
+spatial_index = lazy_import("Route_Geometry.spatial_index")
+coverage = lazy_import("Route_Geometry.coverage")
+
+ROUTE_GPS_DRAWINGS_DIRECTORY = Path("Route_GPS_Drawings")
+
+
+@timed("route.walking_drawing")
+def get_walking_drawing_image_path(
+    width: int | float, height: int | float, zoom: int | float, thickness: int = 3,
+    track: "TrackPyramid | None" = None, centre: dict[str, float] | None = None
+) -> Path:
+    """Draws the walk in lat_long.json, or when the walk's track & map centre are passed in, just as much of track as shows at zoom without reading the file."""
+    if track is not None:
+        if centre is None:
+            raise ValueError("Parameter centre must be passed in with track.")
+
+        walked_points = track.points_for_zoom(zoom)
+        points_key = f"{track.level_for_zoom(zoom)},{track.digest}"
+    else:
+        with open("lat_long.json", 'r') as f:
+            info = convert_json_string_to_dict(f.read())
+
+        centre = info["desired_map_original_centre"]
+        walked_points = info['drawing_points']
+        points_key = str(walked_points)
+
+    surf = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+
+    surf.fill((255, 255, 255, 0))
+
+    points = [latlon_to_pixel(point, centre, zoom, width, height) for point in walked_points]
+
+    for (p1, p2) in zip(points, points[1:]):
+        pygame.draw.line(surf, (0, 0, 0), p1, p2, thickness)
+
+    file_name = cache_file_name(f"{width},{height},{centre},{zoom},{points_key}")
+    file_path = ROUTE_GPS_DRAWINGS_DIRECTORY / f"{file_name}.png"
+    with span("route.png_encode"):
+        pygame.image.save(surf, file_path)
+
+    return file_path
+
+
+@timed("route.suggested_drawing")
+def get_suggested_route_image_path(routes: list[list[dict[str, float]]], width: int | float, height: int | float, zoom: int | float, thickness: int = 3) -> Path:
+    with open("lat_long.json", 'r') as f:
+        centre = convert_json_string_to_dict(f.read())["desired_map_original_centre"]
+
+    surf = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+
+    surf.fill((255, 255, 255, 0))
+
+    for route in routes:
+        points = [latlon_to_pixel(point, centre, zoom, width, height) for point in route]
+        pygame.draw.lines(surf, (0, 90, 255), False, points, thickness)
+
+    file_name = cache_file_name(f"suggested,{width},{height},{centre},{zoom},{routes}")
+    file_path = ROUTE_GPS_DRAWINGS_DIRECTORY / f"{file_name}.png"
+    with span("route.png_encode"):
+        pygame.image.save(surf, file_path)
+
+    return file_path
+
+
+def get_drawing_segment_index(polylines: list[list[tuple[float, float]]], centre: dict[str, float], zoom: int | float, width: int | float, height: int | float) -> "SegmentIndex":
+    """Segment index over a vectorised drawing in local metres, polylines are fractions of the width x height drawing shown over the map."""
+    return spatial_index.SegmentIndex.from_polylines(
+        [pixel_to_metres((x * width, y * height), centre, zoom, width, height) for (x, y) in polyline] for polyline in polylines
+    )
+
+
+def get_drawing_coverage_map(polylines: list[list[tuple[float, float]]], centre: dict[str, float], zoom: int | float, width: int | float, height: int | float, tolerance_metres: float) -> "CoverageMap":
+    """Coverage of the drawing shown width x height over the map, counting strokes within tolerance_metres of the walk as walked."""
+    return coverage.CoverageMap(polylines, width, height, tolerance_metres / metres_per_pixel(centre["latitude"], zoom))
+
+
+def add_walked_segment(coverage_map: "CoverageMap", start: dict[str, float], end: dict[str, float], centre: dict[str, float], zoom: int | float) -> int:
+    width, height = coverage_map.width, coverage_map.height
+
+    return coverage_map.add_segment(latlon_to_pixel(start, centre, zoom, width, height), latlon_to_pixel(end, centre, zoom, width, height))
+
+
+def get_coverage_surface(coverage_map: "CoverageMap") -> "pygame.Surface":
+    """Covered & unwalked strokes drawn over a transparent background, scaled up from the coverage grid to the drawing's size."""
+    grid_surface = pygame.image.frombuffer(coverage_map.overlay, coverage_map.grid_size, "RGBA")
+
+    return pygame.transform.scale(grid_surface, (int(coverage_map.width), int(coverage_map.height)))
+
+
+class WalkedPointsWriter:
+    """Saves walked points to the drawing_points of a lat_long.json file, so saving a fix costs the same however long the walk is.
+
+    Points are appended in place only while the file is exactly as this writer last left it, with drawing_points as
+    its last key, checked by its size & modification time. Any other file, like one rewritten when a map centre is
+    confirmed or edited by hand, is rewritten whole once with drawing_points moved to the end.
+    """
+
+    def __init__(self, file_path: str | Path = "lat_long.json") -> None:
+        self.file_path = Path(file_path)
+        # Size & modification time the file had after this writer's last write, and whether drawing_points had any points
+        self._written: tuple[int, int] | None = None
+        self._has_points = False
+
+    def append(self, location: dict[str, float]) -> None:
+        file_stat = self.file_path.stat()
+
+        if self._written == (file_stat.st_size, file_stat.st_mtime_ns):
+            with span("lat_long.write"), open(self.file_path, "r+b") as file:
+                # Overwrites the "]}" closing drawing_points & the file
+                file.seek(file_stat.st_size - 2)
+                file.write((b", " if self._has_points else b"") + convert_dict_to_json_string(location).encode() + b"]}")
+        else:
+            with span("lat_long.read"), open(self.file_path, "r") as file:
+                lat_longJSON: dict[str, dict[str, float] | list[dict[str, float]]] = load_json_file(file)
+
+            lat_longJSON["drawing_points"] = [*lat_longJSON.pop("drawing_points", []), location]
+
+            with span("lat_long.write"), open(self.file_path, "w") as file:
+                dump_to_json(lat_longJSON, file)
+
+        self._has_points = True
+        file_stat = self.file_path.stat()
+        self._written = (file_stat.st_size, file_stat.st_mtime_ns)
@@ -0,0 +1,113 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from queue import Empty, SimpleQueue
+from typing import Any
+
+from Core.metrics import span
+
+
+class TaskGraph:
+    """A few named tasks run on an executor, each started as soon as the tasks it takes its inputs from have finished.
+
+    Tasks are only submitted once they can run straight away, so no worker ever sits blocked waiting on another task.
+    Finished tasks are collected with poll() from the thread that owns the graph, on_finish is called from the worker
+    thread, for waking that thread up. A failed task fails everything that depends on it with the same exception.
+    """
+
+    def __init__(self, executor: Executor, on_finish: Callable[[str], None] | None = None) -> None:
+        self._executor = executor
+        self._on_finish = on_finish
+        self._tasks: dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {}
+        self._results: dict[str, tuple[Any, BaseException | None]] = {}
+        self._submitted: set[str] = set()
+        self._finished: SimpleQueue[tuple[str, Any, BaseException | None]] = SimpleQueue()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def add(self, name: str, function: Callable[..., Any], *dependencies: str) -> None:
+        """Adds a task called with the results of dependencies, which must already have been added, in order."""
+        if name in self._tasks:
+            raise ValueError(f"Task graph already has a task called {name}.")
+        for dependency in dependencies:
+            if dependency not in self._tasks:
+                raise ValueError(f"Task {name} depends on {dependency}, which hasn't been added.")
+
+        self._tasks[name] = (function, dependencies)
+
+    def start(self) -> None:
+        with self._lock:
+            ready = self._take_ready()
+        for name in ready:
+            self._submit(name)
+
+    @property
+    def finished_count(self) -> int:
+        return len(self._results)
+
+    def finished(self, name: str) -> bool:
+        return name in self._results
+
+    @property
+    def running(self) -> set[str]:
+        """Tasks submitted to the executor that haven't finished yet."""
+        with self._lock:
+            return self._submitted - self._results.keys()
+
+    @property
+    def done(self) -> bool:
+        return len(self._results) == len(self._tasks)
+
+    def poll(self) -> list[tuple[str, Any, BaseException | None]]:
+        """Every task that has finished since the last poll, as its name, result & the exception it failed with if it did."""
+        finished = []
+        while True:
+            try:
+                finished.append(self._finished.get_nowait())
+            except Empty:
+                return finished
+
+    def _take_ready(self) -> list[str]:
+        # Must hold the lock, so two tasks finishing together can't both submit the task waiting on them
+        ready = [
+            name for (name, (_, dependencies)) in self._tasks.items()
+            if name not in self._submitted and all(dependency in self._results for dependency in dependencies)
+        ]
+        self._submitted.update(ready)
+
+        return ready
+
+    def _submit(self, name: str) -> None:
+        function, dependencies = self._tasks[name]
+
+        failure = next((self._results[dependency][1] for dependency in dependencies if self._results[dependency][1] is not None), None)
+        if failure is not None:
+            self._finish(name, None, failure)
+            return
+
+        def run() -> Any:
+            with span(f"task.{name}"):
+                return function(*(self._results[dependency][0] for dependency in dependencies))
+
+        future = self._executor.submit(run)
+        future.add_done_callback(lambda done: self._finish(name, *self._outcome(done)))
+
+    @staticmethod
+    def _outcome(future: Future) -> tuple[Any, BaseException | None]:
+        exception = future.exception()
+
+        return (None, exception) if exception is not None else (future.result(), None)
+
+    def _finish(self, name: str, result: Any, exception: BaseException | None) -> None:
+        with self._lock:
+            self._results[name] = (result, exception)
+            ready = self._take_ready()
+
+        self._finished.put((name, result, exception))
+        if self._on_finish is not None:
+            self._on_finish(name)
+
+        for ready_name in ready:
+            self._submit(ready_name)
@@ -0,0 +1,80 @@
+import logging
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from Core.cache_keys import file_content_hash
+from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
+
+IMPORTED_DRAWINGS_DIRECTORY = Path("Imported_Drawings")
+
+# The rect drawings are shown in next to the map
+DRAWING_RECT = (760, 630)
+
+ACCEPTED_DRAWING_FILE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# Part of cached file names, bumped whenever the same drawing would be imported differently
+_CACHE_VERSION = 2
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def fit_to_rect(size: tuple[int, int], rect: tuple[int, int]) -> tuple[int, int]:
+    """Largest size with the same aspect ratio as size that fits in rect, like frontend.Image.fitToRect."""
+    ratio = min(rect[0] / size[0], rect[1] / size[1])
+
+    return max(1, int(size[0] * ratio)), max(1, int(size[1] * ratio))
+
+
+def import_drawing(file_path: str | Path, rect: tuple[int, int] = DRAWING_RECT) -> Path:
+    """Decodes a drawing or photo straight down to the size it's shown at & saves it as a PNG.
+
+    JPEGs are decoded at a reduced DCT scale, so a huge phone photo never exists in memory at full resolution.
+    Results are cached in Imported_Drawings/ by the source file's content hash & the rect.
+    """
+    file_path = Path(file_path)
+    if file_path.suffix.lower() not in ACCEPTED_DRAWING_FILE_EXTENSIONS:
+        raise ValueError(f"Drawing must be one of {repr(ACCEPTED_DRAWING_FILE_EXTENSIONS)}.")
+
+    cache_path = IMPORTED_DRAWINGS_DIRECTORY / f"{file_content_hash(file_path)}_{rect[0]}x{rect[1]}_v{_CACHE_VERSION}.png"
+    if cache_path.is_file():
+        logger.info("Cached imported drawing already exists")
+        return cache_path
+
+    with Image.open(file_path) as image:
+        # Phone photos are often stored sideways with an EXIF flag saying which way up they go
+        orientation = image.getexif().get(0x0112, 1)
+        source_size = image.size[::-1] if orientation in (5, 6, 7, 8) else image.size
+        target_size = fit_to_rect(source_size, rect)
+        decode_size = target_size[::-1] if orientation in (5, 6, 7, 8) else target_size
+
+        # Only does anything for JPEGs, which then decode at 1/2, 1/4 or 1/8 scale, whichever is the smallest still at least decode_size
+        image.draft("RGB" if image.mode not in ("L", "RGB") else image.mode, decode_size)
+        logger.debug(f"Decoding {image.size} for a {target_size} drawing from {source_size}")
+
+        image = ImageOps.exif_transpose(image)
+        if "A" in image.getbands() or "transparency" in image.info:
+            # Flattened onto white paper, the vectoriser & comparer read images without alpha, so transparent pixels would be black
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+
+        image = image.resize(target_size, Image.LANCZOS, reducing_gap=3.0)
+
+    image.save(cache_path)
+
+    return cache_path
@@ -0,0 +1,202 @@
+import logging
+from json import load as load_json_file, dump as dump_to_json
+from os import getenv
+from pathlib import Path
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+from Core.cache_keys import file_content_hash
+from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
+
+load_dotenv()
+
+MAX_DRAWING_VERTICES = int(getenv("MAX_DRAWING_VERTICES", "400"))
+if not 10 <= MAX_DRAWING_VERTICES <= 10000:
+    raise ValueError(f"Environment variable MAX_DRAWING_VERTICES must be between 10 & 10000.")
+
+VECTORISED_DRAWINGS_DIRECTORY = Path("Vectorised_Drawings")
+
+# Drawings are shrunk to fit this many pixels along their longest side before thresholding, the strokes only need to survive as polylines
+_WORKING_IMAGE_MAX_SIDE = 512
+# Contours shorter than this (in working image pixels) are treated as noise from the threshold & dropped
+_MIN_CONTOUR_LENGTH = 12
+# Part of cached file names, bumped whenever the same drawing would be vectorised differently
+_CACHE_VERSION = 2
+
+_NEIGHBOUR_OFFSETS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def _thinning_tables() -> tuple[np.ndarray, np.ndarray]:
+    # Whether Zhang-Suen removes a pixel in each of its two passes, for every arrangement of its 8 neighbours. Bit i of
+    # the index is neighbour i clockwise from the one above, so the same bits can be summed straight from the image
+    tables = (np.zeros(256, dtype=bool), np.zeros(256, dtype=bool))
+    for code in range(256):
+        p2, p3, p4, p5, p6, p7, p8, p9 = ((code >> bit) & 1 for bit in range(8))
+        ring = (p2, p3, p4, p5, p6, p7, p8, p9, p2)
+        neighbour_count = sum(ring[:-1])
+        transitions = sum(before == 0 and after == 1 for (before, after) in zip(ring, ring[1:]))
+        if 2 <= neighbour_count <= 6 and transitions == 1:
+            tables[0][code] = not (p2 and p4 and p6) and not (p4 and p6 and p8)
+            tables[1][code] = not (p2 and p4 and p8) and not (p2 and p6 and p8)
+
+    return tables
+
+
+_THINNING_TABLES = _thinning_tables()
+# Weights that sum a pixel's neighbours into the index of the tables above
+_NEIGHBOUR_CODE_KERNEL = np.array([[128, 1, 2], [64, 0, 4], [32, 16, 8]], dtype=np.float32)
+
+
+def _skeletonise(binary_image: np.ndarray) -> np.ndarray:
+    # Zhang-Suen thinning, which keeps strokes connected & one pixel wide, opencv-python doesn't ship the contrib one
+    image = (binary_image > 0).astype(np.uint8)
+
+    while True:
+        changed = False
+        for table in _THINNING_TABLES:
+            codes = cv2.filter2D(image, cv2.CV_32F, _NEIGHBOUR_CODE_KERNEL, borderType=cv2.BORDER_CONSTANT).astype(np.uint8)
+            removable = (image == 1) & table[codes]
+            if removable.any():
+                image[removable] = 0
+                changed = True
+
+        if not changed:
+            return image * 255
+
+
+def _trace_skeleton(skeleton: np.ndarray) -> list[np.ndarray]:
+    """Open polylines along a one pixel wide skeleton, one from each end or junction to the next, plus any closed loops.
+
+    Unlike contours, which go round a one pixel wide stroke & so trace it there & back, every stroke is traced once.
+    Polylines are shaped like contours, (n, 1, 2) arrays of x, y, so they simplify the same way.
+    """
+    ys, xs = np.nonzero(skeleton)
+    pixels = set(zip(xs.tolist(), ys.tolist()))
+
+    def neighbours(x: int, y: int) -> list[tuple[int, int]]:
+        # A diagonal step is skipped where the two pixels also touch through a shared side neighbour, so corners of
+        # the skeleton are a path rather than a little triangle of junctions
+        return [
+            (x + dx, y + dy) for (dx, dy) in _NEIGHBOUR_OFFSETS
+            if (x + dx, y + dy) in pixels and not (dx and dy and ((x + dx, y) in pixels or (x, y + dy) in pixels))
+        ]
+
+    adjacency = {pixel: neighbours(*pixel) for pixel in sorted(pixels)}
+    traced_steps: set[tuple[tuple[int, int], tuple[int, int]]] = set()
+
+    def trace(start: tuple[int, int], step: tuple[int, int]) -> np.ndarray:
+        path = [start]
+        previous, current = start, step
+        while (min(previous, current), max(previous, current)) not in traced_steps:
+            traced_steps.add((min(previous, current), max(previous, current)))
+            path.append(current)
+            # Carries straight on through pixels on a single stroke, stops at ends & junctions
+            if len(adjacency[current]) != 2:
+                break
+            previous, current = current, adjacency[current][adjacency[current][0] == previous]
+
+        return np.array(path, dtype=np.int32).reshape(-1, 1, 2)
+
+    polylines = [
+        trace(pixel, step) for (pixel, steps) in adjacency.items() if len(steps) != 2
+        for step in steps if (min(pixel, step), max(pixel, step)) not in traced_steps
+    ]
+    # Whatever's left are closed loops with no ends or junctions, each traced round from any of its pixels
+    polylines += [
+        trace(pixel, steps[0]) for (pixel, steps) in adjacency.items()
+        if len(steps) == 2 and (min(pixel, steps[0]), max(pixel, steps[0])) not in traced_steps
+    ]
+
+    return polylines
+
+
+def _simplify_contours(contours: list[np.ndarray], max_vertices: int) -> list[np.ndarray]:
+    epsilon = 1.0
+    while True:
+        simplified = [cv2.approxPolyDP(contour, epsilon, False) for contour in contours]
+        simplified = [polyline for polyline in simplified if len(polyline) >= 2]
+
+        vertices = sum(len(polyline) for polyline in simplified)
+        if vertices <= max_vertices:
+            return simplified
+
+        if epsilon > _WORKING_IMAGE_MAX_SIDE:
+            # Too many strokes to fit however far each is simplified, so the shortest strokes are dropped until the rest fit
+            dropped = set()
+            for index in sorted(range(len(simplified)), key=lambda index: cv2.arcLength(simplified[index], False)):
+                if vertices <= max_vertices:
+                    break
+                dropped.add(index)
+                vertices -= len(simplified[index])
+
+            return [polyline for (index, polyline) in enumerate(simplified) if index not in dropped]
+
+        epsilon *= 1.5
+
+
+def vectorise_drawing(file_path: str | Path, max_vertices: int = MAX_DRAWING_VERTICES) -> list[list[tuple[float, float]]]:
+    """Turns a drawing into a few simplified polylines.
+
+    Coordinates are fractions of the drawing's width & height, so they can be scaled onto the drawing at any displayed size.
+    Results are cached in Vectorised_Drawings/ by the drawing's content hash.
+    """
+    if isinstance(max_vertices, int):
+        if not 2 <= max_vertices <= 10000:
+            raise ValueError("Parameter max_vertices must be between 2 & 10000.")
+    else:
+        raise TypeError("Parameter max_vertices must be an integer.")
+
+    cache_path = VECTORISED_DRAWINGS_DIRECTORY / f"{file_content_hash(file_path)}_{max_vertices}_v{_CACHE_VERSION}.json"
+    if cache_path.is_file():
+        with open(cache_path, "r") as file:
+            logger.info("Cached vectorised drawing already exists")
+            return [[tuple(point) for point in polyline] for polyline in load_json_file(file)["polylines"]]
+
+    image = cv2.imread(str(file_path), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Drawing at {file_path} could not be read as an image.")
+
+    height, width = image.shape
+    scale = min(1.0, _WORKING_IMAGE_MAX_SIDE / max(width, height))
+    if scale < 1:
+        image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    working_height, working_width = image.shape
+
+    # Strokes are assumed to be darker than the paper
+    image = cv2.GaussianBlur(image, (3, 3), 0)
+    _, binary_image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    skeleton = _skeletonise(binary_image)
+
+    contours = [contour for contour in _trace_skeleton(skeleton) if cv2.arcLength(contour, False) >= _MIN_CONTOUR_LENGTH]
+
+    polylines = [
+        [(float(point[0][0]) / working_width, float(point[0][1]) / working_height) for point in polyline]
+        for polyline in _simplify_contours(contours, max_vertices)
+    ]
+
+    with open(cache_path, "w") as file:
+        dump_to_json({"polylines": polylines}, file)
+
+    logger.info(f"Drawing vectorised into {len(polylines)} polylines with {sum(len(polyline) for polyline in polylines)} vertices.")
+
+    return polylines
+
+
+def scale_polylines(polylines: list[list[tuple[float, float]]], width: int | float, height: int | float) -> list[list[tuple[float, float]]]:
+    return [[(x * width, y * height) for (x, y) in polyline] for polyline in polylines]
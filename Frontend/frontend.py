@@ -1,46 +1,55 @@
 # Code to start program
+from abc import ABC, abstractmethod
 from pathlib import Path
 
 import pygame
-import tkinter as tk
-from tkinter import filedialog
 
+from Core.pixel_cache import load_surface
 from exceptions import EmptyImageFilePath
 
-pygame.font.init()
+# Hidden Tk root for the file dialog, only made the first time a file is asked for
+root = None
 
-root = tk.Tk()
-root.withdraw()
+
+# Anchor positions as fractions of the window size, the pixel anchors are always derived from these so they can't drift on resize
+_X_FRACTIONS = (
+    1 / 6,  # Big left of centre
+    1 / 4,  # Medium left of centre
+    1 / 3,  # Small left of centre
+    1 / 2,  # Middle of screen
+    2 / 3,  # Small right of centre
+    3 / 4,  # Medium right of centre
+    5 / 6,  # Big right of centre
+)
+
+_Y_FRACTIONS = (
+    1 / 6,  # Big above centre
+    1 / 4,  # Medium above centre
+    1 / 3,  # Small above centre
+    1 / 2,  # Middle of screen
+    2 / 3,  # Small below centre
+    3 / 4,  # Medium below centre
+    5 / 6,  # Big below centre
+    8 / 9,  # Massive below centre
+)
+
+# How many rescaled copies of each image are kept, enough to flip between a few window sizes without rescaling again
+_SCALED_IMAGE_CACHE_SIZE = 4
 
 
 class Screen:
     def __init__(self, width: int, height: int) -> None:
+        # Images are laid out for the size the window was created at & scaled from there
+        self.base_size = (width, height)
+
         self._width = width
         self._height = height
 
-        self.x = [
-            self._width / 6,  # Big left of centre
-            self._width / 4,  # Medium left of centre
-            self._width / 3,  # Small left of centre
-            self._width / 2,  # Middle of screen
-            2 * self._width / 3,  # Small right of centre
-            3 * self._width / 4,  # Medium right of centre
-            5 * self._width / 6,  # Big right of centre
-        ]
-
-        self.y = [
-            self._height / 6,  # Big above centre
-            self._height / 4,  # Medium above centre
-            self._height / 3,  # Small above centre
-            self._height / 2,  # Middle of screen
-            2 * self._height / 3,  # Small below centre
-            3 * self._height / 4,  # Medium below centre
-            5 * self._height / 6,  # Big below centre
-            8 * self._height / 9,  # Massive below centre
-        ]
-
-        self.x = [int(pos) for pos in self.x]
-        self.y = [int(pos) for pos in self.y]
+        self._layout()
+
+    def _layout(self) -> None:
+        self.x = [int(fraction * self._width) for fraction in _X_FRACTIONS]
+        self.y = [int(fraction * self._height) for fraction in _Y_FRACTIONS]
 
     @property
     def width(self) -> int:
@@ -48,12 +57,8 @@ class Screen:
 
     @width.setter
     def width(self, val: int) -> None:
-        old_width = self._width
         self._width = val
-
-        scale_factor = self._width / old_width
-
-        self.x = [int(x * scale_factor) for x in self.x]
+        self._layout()
 
     @property
     def height(self) -> int:
@@ -61,11 +66,8 @@ class Screen:
 
     @height.setter
     def height(self, val: int) -> None:
-        old_height = self._height
         self._height = val
-
-        scale_factor = self._height / old_height
-        self.y = [int(y * scale_factor) for y in self.y]
+        self._layout()
 
     @property
     def size(self) -> tuple[int, int]:
@@ -73,28 +75,59 @@ class Screen:
 
     @size.setter
     def size(self, val: tuple[int, int]) -> None:
-        old_width = self._width
-        old_height = self._height
-
         self._width, self._height = val
+        self._layout()
+
+    # How much images should be scaled by to keep their proportion of the window
+    @property
+    def scale(self) -> float:
+        return min(self._width / self.base_size[0], self._height / self.base_size[1])
+
+
+# Base class tracking which parts of the screen need redrawing, widgets without a rect or draw fail as soon as they're made
+class Widget(ABC):
+    def __init__(self) -> None:
+        self.dirty = True
+        self.drawn_rect: pygame.Rect | None = None
+
+    @property
+    @abstractmethod
+    def rect(self) -> pygame.Rect:
+        ...
+
+    @abstractmethod
+    def draw(self, display: pygame.surface.Surface) -> None:
+        ...
+
+    # Area covering both where the widget was last drawn & where it will be drawn next
+    def dirtyRect(self) -> pygame.Rect:
+        if self.drawn_rect is None:
+            return self.rect
 
-        x_scale_factor = self._width / old_width
-        y_scale_factor = self._height / old_height
+        return self.drawn_rect.union(self.rect)
 
-        self.x = [int(x * x_scale_factor) for x in self.x]
-        self.y = [int(y * y_scale_factor) for y in self.y]
+    def _markDrawn(self) -> None:
+        self.drawn_rect = self.rect
+        self.dirty = False
 
 
 # Image class
-class Image:
+class Image(Widget):
     # Load image
     def __init__(
             self, window: Screen, path: str | Path | None = None, pos: tuple[int, int] = (0, 0), size: tuple[int, int] | float | None = None,
-            centre_flag: bool = True, alpha: float = 1
+            centre_flag: bool = True, alpha: float = 1, raw_cache: bool = False
     ) -> None:
+        super().__init__()
+
+        # Copies of img rescaled to the window, keyed by size
+        self._scaled_imgs: dict[tuple[int, int], pygame.Surface] = {}
+
+        # Images loaded over & over, like the maps, are mapped from a cache of their decoded pixels instead of decoded each time
+        self.raw_cache = raw_cache
 
         if path is not None:
-            self.img = pygame.image.load(path)
+            self.img = self._load(path)
             self.img.set_alpha(int(alpha * 255))
 
         self.path = path
@@ -112,27 +145,76 @@ class Image:
             else:
                 self.img = pygame.transform.scale(self.img, [*map(lambda x: int(x * size), self.img.get_rect().size)])
 
+    @property
+    def img(self) -> pygame.Surface:
+        return self._img
+
+    @img.setter
+    def img(self, val: pygame.Surface) -> None:
+        self._img = val
+        self._scaled_imgs.clear()
+        self.dirty = True
+
+    # img scaled to the current window size
+    @property
+    def displayImg(self) -> pygame.Surface:
+        scale = self.WINDOW.scale
+        size = (max(1, round(self._img.get_width() * scale)), max(1, round(self._img.get_height() * scale)))
+        if size == self._img.get_size():
+            return self._img
+
+        if size not in self._scaled_imgs:
+            if len(self._scaled_imgs) >= _SCALED_IMAGE_CACHE_SIZE:
+                self._scaled_imgs.pop(next(iter(self._scaled_imgs)))
+
+            try:
+                scaled_img = pygame.transform.smoothscale(self._img, size)
+            except ValueError:
+                # smoothscale only handles 24 & 32 bit surfaces
+                scaled_img = pygame.transform.scale(self._img, size)
+            scaled_img.set_alpha(int(self._alpha * 255))
+
+            self._scaled_imgs[size] = scaled_img
+
+        return self._scaled_imgs[size]
+
+    @property
+    def rect(self) -> pygame.Rect:
+        wid, height = self.displayImg.get_rect().size
+        if self.c_flag:
+            x, y = self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]
+            return pygame.Rect(int(x - wid / 2), int(y - height / 2), wid, height)
+        else:
+            return pygame.Rect(self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]], wid, height)
+
+    # Whether there is anything to draw yet
+    @property
+    def loaded(self) -> bool:
+        return self.path is not None
+
     # Display image to screen
     def draw(self, display: pygame.surface.Surface) -> None:
-        if self.path is not None:
-            if self.c_flag:
-                x, y = self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]
-                wid, height = self.img.get_rect().size
-                display.blit(self.img, (x - wid / 2, y - height / 2))
-            else:
-                display.blit(self.img, (self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]))
+        if self.loaded:
+            display.blit(self.displayImg, self.rect)
+            self._markDrawn()
         else:
             raise EmptyImageFilePath("Image cannot be drawn to screen, because it has no valid file path. (You did a little fucky wucky silly billy boo bah).")
 
+    def _load(self, path: str | Path) -> pygame.Surface:
+        if self.raw_cache:
+            return load_surface(path)
+
+        return pygame.image.load(path)
+
     # Reload image
     def reloadImage(self, path: str | Path):
-        self.img = pygame.image.load(path)
+        self.img = self._load(path)
         self.img.set_alpha(int(self._alpha * 255))
 
         self.path = path
 
     def resizeImage(self, size: tuple[int, int] | float) -> None:
-        self.img = pygame.image.load(self.path)
+        self.img = self._load(self.path)
 
         if isinstance(size, tuple):
             self.img = pygame.transform.scale(self.img, size)
@@ -185,6 +267,9 @@ class Image:
     def alpha(self, val: float) -> None:
         self._alpha = val
         self.img.set_alpha(int(self._alpha * 255))
+        for scaled_img in self._scaled_imgs.values():
+            scaled_img.set_alpha(int(self._alpha * 255))
+        self.dirty = True
 
     @property
     def pos(self) -> tuple[int, int]:
@@ -193,89 +278,151 @@ class Image:
     @pos.setter
     def pos(self, val: tuple[int, int]) -> None:
         self._pos = val
+        self.dirty = True
+
+
+# Image made in memory rather than loaded from a file, like the coverage overlay, so it's updated without encoding a PNG
+class SurfaceImage(Image):
+    def __init__(self, window: Screen, pos: tuple[int, int] = (0, 0), centre_flag: bool = True, alpha: float = 1) -> None:
+        super().__init__(window, pos=pos, centre_flag=centre_flag, alpha=alpha)
+
+    @property
+    def loaded(self) -> bool:
+        return hasattr(self, "_img")
+
+    def setSurface(self, surface: pygame.Surface) -> None:
+        self.img = surface
+        self.img.set_alpha(int(self._alpha * 255))
 
 
 # Button Class
-class Button:
+class Button(Widget):
     def __init__(
             self, window: Screen, text: str, pos: tuple[int, int], size: tuple[int, int] | None = None, centre_flag: bool = True,
-            border: int = 2, border_curve: bool = True, auto_size: bool = True, font_family: str = "Helvetica", font_size: int = 20
+            border: int = 2, border_curve: bool = True, auto_size: bool = True, font_family: str = "Helvetica", font_size: int = 20,
+            bg_colour: tuple[int, int, int] = (255, 255, 255), hover_colour: tuple[int, int, int] = (200, 200, 200)
     ) -> None:
+        super().__init__()
         self._text = text
         self._pos = pos
-        self.dimensions = size
+        self._dimensions = size
 
         self.c_flag = centre_flag
         self.border = border
         self.border_curve = border_curve
         self.auto_size = auto_size
-        self.bg_colour = (255, 255, 255)
+        self._bg_colour = bg_colour
+        self._hover_colour = hover_colour
+        self.hovered = False
 
         self.WINDOW = window
 
-        self.font = pygame.font.SysFont(font_family, font_size)
+        self.font = getFont(font_family, font_size)
+
+        # Pre-rendered button surfaces keyed by hovered, only rebuilt when the text, size or colours change
+        self._surfaces: dict[bool, pygame.Surface] = {}
+        self._rect_cache: tuple[tuple, pygame.Rect] | None = None
 
         # Render text
         self.rendText = self.font.render(self._text, True, (0, 0, 0))
 
-        if self.dimensions is None and not self.auto_size:
+        if self._dimensions is None and not self.auto_size:
             raise ValueError("Parameter size cannot be None while parameter auto_size is False. (Fuck you Matt you caused this stupid fucking error to occur this would not have to exist if you didn't want to do the silly billy math just put in some fucking dimensions it's just trial and error you fuck).")
 
         if self.auto_size:
-            self.dimensions = [*map(lambda x: x + 8, self.rendText.get_rect().size)]
+            self._dimensions = [*map(lambda x: x + 8, self.rendText.get_rect().size)]
 
-    def draw(self, display: pygame.surface.Surface):
-        if self.c_flag:
-            x_pos, y_pos = self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]
-            width, height = self.dimensions
-            x_pos -= width / 2
-            y_pos -= height / 2
+    @property
+    def rect(self) -> pygame.Rect:
+        anchor = (self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]], *self.dimensions)
+        if self._rect_cache is None or self._rect_cache[0] != anchor:
+            x_pos, y_pos, width, height = anchor
+            if self.c_flag:
+                x_pos -= width / 2
+                y_pos -= height / 2
 
-        else:
-            x_pos, y_pos = self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]
+            self._rect_cache = (anchor, pygame.Rect(int(x_pos), int(y_pos), width, height))
 
-        pygame.draw.rect(display, (0, 0, 0), (x_pos, y_pos, *self.dimensions), border_radius=2 * self.border_curve)
-        pygame.draw.rect(display, self.bg_colour, (*map(lambda x: x + self.border, (x_pos, y_pos)), *map(lambda x: x - 2 * self.border, self.dimensions)), border_radius=2 * self.border_curve)
+        return self._rect_cache[1]
+
+    def _renderSurface(self, hovered: bool) -> pygame.Surface:
+        surface = pygame.Surface(self.dimensions, pygame.SRCALPHA, 32)
+
+        pygame.draw.rect(surface, (0, 0, 0), (0, 0, *self.dimensions), border_radius=2 * self.border_curve)
+        pygame.draw.rect(surface, self._hover_colour if hovered else self._bg_colour, (self.border, self.border, *map(lambda x: x - 2 * self.border, self.dimensions)), border_radius=2 * self.border_curve)
 
         current_text_dimensions = self.rendText.get_rect().size
-        x_pos, y_pos = map(lambda x: x[0] + (x[1] - x[2]) / 2, zip((x_pos, y_pos), self.dimensions, current_text_dimensions))
-        display.blit(self.rendText, (x_pos, y_pos))
+        surface.blit(self.rendText, [*map(lambda x: (x[0] - x[1]) / 2, zip(self.dimensions, current_text_dimensions))])
+
+        return surface
+
+    def _invalidate(self) -> None:
+        self._surfaces.clear()
+        self.dirty = True
+
+    def draw(self, display: pygame.surface.Surface):
+        if self.hovered not in self._surfaces:
+            self._surfaces[self.hovered] = self._renderSurface(self.hovered)
+
+        display.blit(self._surfaces[self.hovered], self.rect)
+
+        self._markDrawn()
 
     def hover(self, mouse_pos: tuple[int, int]) -> bool:
-        if self.c_flag:
-            highlight = (
-                    (self.WINDOW.x[self.pos[0]] - self.dimensions[0] / 2 <= mouse_pos[0] <= self.WINDOW.x[self.pos[0]] + self.dimensions[0] / 2) and
-                    (self.WINDOW.y[self.pos[1]] - self.dimensions[1] / 2 <= mouse_pos[1] <= self.WINDOW.y[self.pos[1]] + self.dimensions[1] / 2)
-            )
-        else:
-            highlight = (
-                    (self.WINDOW.x[self.pos[0]] <= mouse_pos[0] <= self.WINDOW.x[self.pos[0]] + self.dimensions[0]) and
-                    (self.WINDOW.y[self.pos[1]] <= mouse_pos[1] <= self.WINDOW.y[self.pos[1]] + self.dimensions[1])
-            )
+        highlight = bool(self.rect.collidepoint(mouse_pos))
 
-        if highlight:
-            self.bg_colour = (200, 200, 200)
-        else:
-            self.bg_colour = (255, 255, 255)
+        if highlight != self.hovered:
+            self.hovered = highlight
+            self.dirty = True
 
         return highlight
 
     def click(self, mouse_down: bool) -> bool:
         return self.hover(pygame.mouse.get_pos()) and mouse_down
 
+    @property
+    def bg_colour(self) -> tuple[int, int, int]:
+        return self._bg_colour
+
+    @bg_colour.setter
+    def bg_colour(self, val: tuple[int, int, int]) -> None:
+        if val != self._bg_colour:
+            self._bg_colour = val
+            self._invalidate()
+
+    @property
+    def hover_colour(self) -> tuple[int, int, int]:
+        return self._hover_colour
+
+    # Colour the button is drawn in right now, which is the hover colour while it's hovered
+    @property
+    def current_colour(self) -> tuple[int, int, int]:
+        return self._hover_colour if self.hovered else self._bg_colour
+
+    @hover_colour.setter
+    def hover_colour(self, val: tuple[int, int, int]) -> None:
+        if val != self._hover_colour:
+            self._hover_colour = val
+            self._invalidate()
+
     @property
     def text(self) -> str:
         return self._text
 
     @text.setter
     def text(self, val: str) -> None:
+        if val == self._text:
+            return
+
         self._text = val
 
         # Re-render text
         self.rendText = self.font.render(self._text, True, (0, 0, 0))
 
         if self.auto_size:
-            self.dimensions = self.rendText.get_rect().size
+            self._dimensions = [*map(lambda x: x + 8, self.rendText.get_rect().size)]
+
+        self._invalidate()
 
     @property
     def pos(self) -> tuple[int, int]:
@@ -284,6 +431,17 @@ class Button:
     @pos.setter
     def pos(self, val: tuple[int, int]) -> None:
         self._pos = val
+        self.dirty = True
+
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, val: tuple[int, int]) -> None:
+        if tuple(val) != tuple(self._dimensions):
+            self._dimensions = val
+            self._invalidate()
 
     @property
     def width(self) -> int:
@@ -302,8 +460,9 @@ class Button:
         self.dimensions = (self.dimensions[0], val)
 
 
-class TextBox:
+class TextBox(Widget):
     def __init__(self, window: Screen, text: str, pos: tuple[int, int], centre_flag: bool = True, font_family: str = "Helvetica", font_size: int = 20) -> None:
+        super().__init__()
         self._text = text
         self._pos = pos
 
@@ -311,17 +470,22 @@ class TextBox:
 
         self.WINDOW = window
 
-        self.font = pygame.font.SysFont(font_family, font_size)
+        self.font = getFont(font_family, font_size)
 
         self.rendText = self.font.render(text, True, (0, 0, 0))
 
-    def draw(self, screen: pygame.surface.Surface) -> None:
+    @property
+    def rect(self) -> pygame.Rect:
+        width, height = self.rendText.get_rect().size
         if self.c_flag:
             x, y = self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]
-            width, height = self.rendText.get_rect().size
-            screen.blit(self.rendText, (x - width / 2, y - height / 2))
+            return pygame.Rect(int(x - width / 2), int(y - height / 2), width, height)
         else:
-            screen.blit(self.rendText, (self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]]))
+            return pygame.Rect(self.WINDOW.x[self.pos[0]], self.WINDOW.y[self.pos[1]], width, height)
+
+    def draw(self, screen: pygame.surface.Surface) -> None:
+        screen.blit(self.rendText, self.rect)
+        self._markDrawn()
 
     @property
     def text(self) -> str:
@@ -329,8 +493,12 @@ class TextBox:
 
     @text.setter
     def text(self, text: str) -> None:
+        if text == self._text:
+            return
+
         self._text = text
         self.rendText = self.font.render(text, True, (0, 0, 0))
+        self.dirty = True
 
     @property
     def pos(self) -> tuple[int, int]:
@@ -339,13 +507,15 @@ class TextBox:
     @pos.setter
     def pos(self, val: tuple[int, int]) -> None:
         self._pos = val
+        self.dirty = True
 
 
-class Paragraph:
+class Paragraph(Widget):
     def __init__(
             self, window: Screen, text: str, pos: tuple[int, int],
             centre_flag: bool = True, font_family: str = "Helvetica", font_size: int = 20
     ) -> None:
+        super().__init__()
         self.texts = [TextBox(window, line, (pos[0], pos[1] + i), centre_flag, font_family, font_size) for (i, line) in enumerate(text.split("\n"))]
         self.c_flag = centre_flag
         self.font_family = font_family
@@ -354,10 +524,16 @@ class Paragraph:
 
         self.WINDOW = window
 
+    @property
+    def rect(self) -> pygame.Rect:
+        return self.texts[0].rect.unionall([text.rect for text in self.texts[1:]])
+
     def draw(self, screen: pygame.surface.Surface) -> None:
         for text in self.texts:
             text.draw(screen)
 
+        self._markDrawn()
+
     @property
     def text(self) -> str:
         total = ""
@@ -370,15 +546,107 @@ class Paragraph:
 
     @text.setter
     def text(self, val: str) -> None:
-        self.texts = []
-        for (i, line) in enumerate(val.split("\n")):
+        lines = val.split("\n")
+
+        # Lines that haven't changed keep their already rendered TextBox
+        for (text, line) in zip(self.texts, lines):
+            text.text = line
+        for (i, line) in enumerate(lines[len(self.texts):], start=len(self.texts)):
             self.texts.append(TextBox(self.WINDOW, line, (self.pos[0], self.pos[1] + i), self.c_flag, self.font_family, self.font_size))
+        del self.texts[len(lines):]
+
+        self.dirty = True
+
+
+# Lines of text pinned to the top left corner on a translucent panel, for diagnostics drawn over everything else
+class Overlay(Widget):
+    def __init__(self, font_family: str = "Courier", font_size: int = 14, colour: tuple[int, int, int] = (255, 255, 255), bg_colour: tuple[int, int, int, int] = (0, 0, 0, 190)) -> None:
+        super().__init__()
+        self._lines: list[str] = []
+        self.font = getFont(font_family, font_size)
+        self.colour = colour
+        self.bg_colour = bg_colour
+
+        self.surface = pygame.Surface((1, 1), pygame.SRCALPHA)
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect((4, 4), self.surface.get_size())
+
+    def draw(self, screen: pygame.surface.Surface) -> None:
+        screen.blit(self.surface, self.rect)
+        self._markDrawn()
+
+    @property
+    def lines(self) -> list[str]:
+        return self._lines
+
+    @lines.setter
+    def lines(self, val: list[str]) -> None:
+        if val == self._lines:
+            return
+
+        self._lines = list(val)
+        rendered_lines = [self.font.render(line, True, self.colour) for line in self._lines]
+        width = max((line.get_width() for line in rendered_lines), default=0) + 8
+        height = sum(line.get_height() for line in rendered_lines) + 8
+
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.surface.fill(self.bg_colour)
+        y = 4
+        for line in rendered_lines:
+            self.surface.blit(line, (4, y))
+            y += line.get_height()
+
+        self.dirty = True
 
 
 # TODO Could add pos var to this to make paragraphs easier to move
 
+# Draw the widgets on screen, only repainting the parts of the display that changed unless full_redraw is set
+def renderWidgets(display: pygame.surface.Surface, widgets: list[Widget], full_redraw: bool = False, background: tuple[int, int, int] = (255, 255, 255)) -> None:
+    if full_redraw:
+        display.fill(background)
+        for widget in widgets:
+            widget.draw(display)
+
+        pygame.display.flip()
+        return
+
+    dirty_rects = [widget.dirtyRect() for widget in widgets if widget.dirty]
+    if not dirty_rects:
+        return
+
+    # Everything overlapping a dirty area is repainted in order, clipped so it can't paint over widgets outside the area
+    for rect in dirty_rects:
+        display.set_clip(rect)
+        display.fill(background)
+        for widget in widgets:
+            if widget.dirty or widget.rect.colliderect(rect):
+                widget.draw(display)
+    display.set_clip(None)
+
+    pygame.display.update(dirty_rects)
+
+# Fonts for widgets, initialising pygame's font module on first use rather than on import
+def getFont(font_family: str, font_size: int) -> pygame.font.Font:
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+    return pygame.font.SysFont(font_family, font_size)
+
+
 # Function to get image file
 def getFile() -> str:
-    file_path = filedialog.askopenfilename(filetypes=(("JPEGs", "*.jpg .jpeg"),))
+    global root
+
+    import tkinter as tk
+    from tkinter import filedialog
+
+    if root is None:
+        root = tk.Tk()
+        root.withdraw()
+
+    file_path = filedialog.askopenfilename(filetypes=(("Drawings", "*.jpg *.jpeg *.png *.webp"), ("JPEGs", "*.jpg *.jpeg"), ("PNGs", "*.png"), ("WebPs", "*.webp")))
 
     return file_path
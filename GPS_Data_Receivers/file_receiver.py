@@ -5,6 +5,7 @@ from time import sleep
 
 from dotenv import load_dotenv
 
+from Core.metrics import timed
 from exceptions import EndOfFileError
 from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
 
@@ -16,8 +17,8 @@ if not _EXAMPLE_GPS_DATA_FILE_NAME:
 EXAMPLE_GPS_DATA_FILE_PATH = Path(_EXAMPLE_GPS_DATA_FILE_NAME)
 
 PRETEND_SOCKET_WAIT_TIME = float(getenv("PRETEND_SOCKET_WAIT_TIME", "3"))
-if not 0.1 <= PRETEND_SOCKET_WAIT_TIME <= 1000:
-    raise ValueError(f"Environment variable PRETEND_SOCKET_WAIT_TIME must be between 0.1 & 1000.")
+if not 0 <= PRETEND_SOCKET_WAIT_TIME <= 1000:
+    raise ValueError(f"Environment variable PRETEND_SOCKET_WAIT_TIME must be between 0 & 1000.")
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -34,6 +35,7 @@ elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
 
 line_num = 0
 
+@timed("gps.file_replay")
 def get_raw_location_data() -> str:
     global line_num
 
@@ -0,0 +1,32 @@
+import time
+from json import loads as convert_json_string_to_dict
+
+# The phone ends every fix with this, "{}" frames carry no fix & are skipped
+FRAME_DELIMITER = "%"
+EMPTY_FRAME = "{}"
+
+# Anything longer without a delimiter can't be a fix, it means the stream is garbage or out of step
+MAX_PENDING_CHARACTERS = 65536
+
+
+class FrameBuffer:
+    """Splits a stream of received text into whole frames, keeping a frame cut across reads until the rest arrives."""
+
+    def __init__(self) -> None:
+        self.pending = ""
+
+    def feed(self, data: str) -> list[str]:
+        *frames, self.pending = (self.pending + data).split(FRAME_DELIMITER)
+        if len(self.pending) > MAX_PENDING_CHARACTERS:
+            # Dropped, so the garbage can't build up or later come out as a frame once a delimiter arrives
+            pending_characters, self.pending = len(self.pending), ""
+            raise ValueError(f"Received {pending_characters} characters without a {repr(FRAME_DELIMITER)} frame delimiter.")
+
+        return [frame for frame in frames if frame and frame != EMPTY_FRAME]
+
+
+def fix_latency(frame: str, now: float | None = None) -> float:
+    """Seconds between the phone timestamping a fix, its 'time' field in ms, & now."""
+    raw_gps_data: dict = convert_json_string_to_dict(frame.replace("'", "\""))
+
+    return (time.time() if now is None else now) - raw_gps_data["network"]["time"] / 1000
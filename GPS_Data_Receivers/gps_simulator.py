@@ -0,0 +1,313 @@
+"""Simulated phones streaming GPS fixes to socket_receiver over its %-delimited wire format.
+
+Each device replays a track at a set fix rate, optionally with position jitter, dropped fixes & frames split across writes.
+Many devices run in one process on asyncio. With --sink the simulator also hosts its own receiver, which accepts every
+device & reports how many fixes arrived & the fix-to-receipt latency, for load testing ingestion on localhost.
+
+Example:
+    python -m GPS_Data_Receivers.gps_simulator --track spiral --rate 1 --port 12345
+    python -m GPS_Data_Receivers.gps_simulator --sink --devices 200 --rate 10 --duration 30 --dropout 0.05 --split 0.3
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from json import load as load_json_file
+from pathlib import Path
+
+from Core.metrics import Histogram
+from GPS_Data_Receivers.framing import FRAME_DELIMITER, FrameBuffer, fix_latency
+from Route_Geometry.projection import latlon_to_metres, metres_to_latlon
+
+_DEFAULT_CENTRE = {"latitude": 52.953241, "longitude": -1.1873294}
+_WALKING_SPEED_METRES_PER_SECOND = 1.4
+# How far across the tracing of an image track is
+_IMAGE_TRACK_SIZE_METRES = 400
+
+
+def straight_track(step_metres: float, length_metres: float = 1000, bearing_degrees: float = 90) -> list[tuple[float, float]]:
+    bearing = math.radians(bearing_degrees)
+    steps = max(1, int(length_metres / step_metres))
+
+    return [(i * step_metres * math.sin(bearing), i * step_metres * math.cos(bearing)) for i in range(steps + 1)]
+
+
+def spiral_track(step_metres: float, turns: float = 5, spacing_metres: float = 30) -> list[tuple[float, float]]:
+    """Archimedean spiral out from the centre, points step_metres apart along it."""
+    points = [(0.0, 0.0)]
+    angle = 0.0
+    while angle < turns * 2 * math.pi:
+        radius = spacing_metres * angle / (2 * math.pi)
+        # Arc length of a small turn is about radius * d_angle, near the centre it's kept from blowing up
+        angle += step_metres / max(radius, step_metres)
+        radius = spacing_metres * angle / (2 * math.pi)
+        points.append((radius * math.cos(angle), radius * math.sin(angle)))
+
+    return points
+
+
+def image_track(image_path: Path, step_metres: float, size_metres: float = _IMAGE_TRACK_SIZE_METRES) -> list[tuple[float, float]]:
+    """Walk tracing each stroke of the vectorised image in turn, strokes are joined by walking straight between them."""
+    from Drawing_Vectorisation.drawing_vectoriser import vectorise_drawing
+
+    vertices = [
+        ((x - 0.5) * size_metres, (0.5 - y) * size_metres)
+        for polyline in vectorise_drawing(image_path) for (x, y) in polyline
+    ]
+
+    return resample(vertices, step_metres)
+
+
+def recorded_track(file_path: Path, centre: dict[str, float]) -> list[tuple[float, float]]:
+    """Fixes from a lat_long.json style file or a file of raw fixes like example_gps_data.txt."""
+    if file_path.suffix == ".json":
+        with open(file_path, "r") as file:
+            latlons = load_json_file(file)["drawing_points"]
+    else:
+        from Core.gps import extract_current_location
+
+        with open(file_path, "r") as file:
+            latlons = [extract_current_location(line.strip()) for line in file if line.strip()]
+
+    return [latlon_to_metres(latlon, centre) for latlon in latlons]
+
+
+def resample(vertices: list[tuple[float, float]], step_metres: float) -> list[tuple[float, float]]:
+    """Points every step_metres along the path through vertices."""
+    if len(vertices) < 2:
+        return list(vertices)
+
+    points = [vertices[0]]
+    # Distance along the current segment to the next point, it carries over into the following segment
+    next_distance = step_metres
+    for ((x1, y1), (x2, y2)) in zip(vertices, vertices[1:]):
+        length = math.hypot(x2 - x1, y2 - y1)
+        while next_distance <= length:
+            t = next_distance / length
+            points.append((x1 + t * (x2 - x1), y1 + t * (y2 - y1)))
+            next_distance += step_metres
+        next_distance -= length
+
+    return points
+
+
+def frame(latlon: dict[str, float], accuracy: float, time_ms: int) -> str:
+    # The same layout the phone app sends, a Python dict repr rather than strict JSON
+    return str({"network": {
+        "altitude": 78.6, "latitude": latlon["latitude"], "longitude": latlon["longitude"], "time": time_ms,
+        "accuracy": accuracy, "speed": _WALKING_SPEED_METRES_PER_SECOND, "provider": "simulator", "bearing": 0
+    }}) + FRAME_DELIMITER
+
+
+@dataclass
+class DeviceStats:
+    fixes_sent: int = 0
+    fixes_dropped: int = 0
+    frames_split: int = 0
+    bytes_sent: int = 0
+    connect_failures: int = 0
+    # How far behind its fix schedule the device fell, a sign the simulator itself is overloaded
+    send_lag: Histogram = field(default_factory=Histogram)
+
+
+@dataclass
+class SinkStats:
+    connections: int = 0
+    fixes_received: int = 0
+    partial_reads: int = 0
+    bytes_received: int = 0
+    latency: Histogram = field(default_factory=Histogram)
+
+
+async def run_device(
+        device_id: int, track: list[tuple[float, float]], centre: dict[str, float], host: str, port: int, rate: float,
+        jitter_metres: float, dropout: float, split: float, split_delay: float, duration: float | None, stats: DeviceStats, seed: int
+) -> None:
+    generator = random.Random(seed + device_id)
+
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.connect_failures += 1
+        return
+
+    # Devices start at different points of the track & times so they don't all send in lockstep
+    offset = generator.randrange(len(track))
+    await asyncio.sleep(generator.uniform(0, 1 / rate))
+
+    interval = 1 / rate
+    start = time.perf_counter()
+    try:
+        for i in range(len(track) if duration is None else int(duration * rate)):
+            # Fixes are sent on a fixed schedule, so time spent sending doesn't make the rate drift
+            due = start + i * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            stats.send_lag.record(max(0.0, -delay))
+
+            if generator.random() < dropout:
+                stats.fixes_dropped += 1
+                continue
+
+            x, y = track[(offset + i) % len(track)]
+            latlon = metres_to_latlon((x + generator.gauss(0, jitter_metres), y + generator.gauss(0, jitter_metres)), centre)
+            data = frame(latlon, max(jitter_metres, 1), int(time.time() * 1000)).encode("ascii")
+
+            if generator.random() < split:
+                # A frame cut across writes, like a fix straddling two TCP segments
+                cut = generator.randrange(1, len(data))
+                writer.write(data[:cut])
+                await writer.drain()
+                await asyncio.sleep(split_delay)
+                writer.write(data[cut:])
+                stats.frames_split += 1
+            else:
+                writer.write(data)
+            await writer.drain()
+
+            stats.fixes_sent += 1
+            stats.bytes_sent += len(data)
+    except (ConnectionError, OSError):
+        stats.connect_failures += 1
+    finally:
+        writer.close()
+
+
+async def _handle_sink_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, stats: SinkStats) -> None:
+    stats.connections += 1
+    frame_buffer = FrameBuffer()
+
+    try:
+        while data := await reader.read(4096):
+            now = time.time()
+            stats.bytes_received += len(data)
+            frames = frame_buffer.feed(data.decode("ascii"))
+            stats.partial_reads += bool(frame_buffer.pending)
+            for received_frame in frames:
+                stats.fixes_received += 1
+                stats.latency.record(fix_latency(received_frame, now))
+    finally:
+        writer.close()
+
+
+def _histogram_text(histogram: Histogram, unit_scale: float = 1000, unit: str = "ms") -> str:
+    summary = histogram.summary()
+    if not summary["count"]:
+        return "none"
+
+    return (
+        f"p50 {summary['p50_seconds'] * unit_scale:.2f}{unit}, p95 {summary['p95_seconds'] * unit_scale:.2f}{unit}, "
+        f"max {summary['max_seconds'] * unit_scale:.2f}{unit} over {summary['count']}"
+    )
+
+
+def report(device_stats: DeviceStats, sink_stats: SinkStats | None, devices: int, elapsed: float) -> str:
+    lines = [
+        f"{devices} devices ran for {elapsed:.1f}s",
+        f"Sent {device_stats.fixes_sent} fixes ({device_stats.fixes_sent / elapsed:.1f}/s, {device_stats.bytes_sent / 1024:.1f}KiB), "
+        f"dropped {device_stats.fixes_dropped}, split {device_stats.frames_split}, {device_stats.connect_failures} connection failures",
+        f"Send lag behind schedule: {_histogram_text(device_stats.send_lag)}",
+    ]
+    if sink_stats is not None:
+        lines += [
+            f"Sink accepted {sink_stats.connections} connections & received {sink_stats.fixes_received} fixes "
+            f"({sink_stats.fixes_received / elapsed:.1f}/s), {sink_stats.partial_reads} reads ended mid-frame",
+            f"Fix to receipt latency: {_histogram_text(sink_stats.latency)}",
+        ]
+
+    return "\n".join(lines)
+
+
+def _load_track(args: argparse.Namespace) -> list[tuple[float, float]]:
+    step_metres = _WALKING_SPEED_METRES_PER_SECOND * args.speed_factor / args.rate
+
+    if args.track == "straight":
+        return straight_track(step_metres)
+    elif args.track == "spiral":
+        return spiral_track(step_metres)
+    elif args.track.startswith("image:"):
+        return image_track(Path(args.track.removeprefix("image:")), step_metres)
+    elif args.track.startswith("file:"):
+        return recorded_track(Path(args.track.removeprefix("file:")), args.centre)
+
+    raise ValueError("Parameter track must be straight, spiral, image:<path> or file:<path>.")
+
+
+def _parse_centre(value: str) -> dict[str, float]:
+    try:
+        latitude, longitude = map(float, value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Centre must look like 52.95,-1.19.")
+
+    return {"latitude": latitude, "longitude": longitude}
+
+
+async def run(args: argparse.Namespace) -> int:
+    track = _load_track(args)
+    if not track:
+        raise ValueError(f"Track {args.track} has no points.")
+
+    sink_stats = None
+    server = None
+    port = args.port
+    if args.sink:
+        sink_stats = SinkStats()
+        server = await asyncio.start_server(lambda r, w: _handle_sink_connection(r, w, sink_stats), args.host, args.port, backlog=max(128, args.devices))
+        port = server.sockets[0].getsockname()[1]
+
+    device_stats = DeviceStats()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_device(device_id, track, args.centre, args.host, port, args.rate, args.jitter, args.dropout, args.split, args.split_delay, args.duration, device_stats, args.seed)
+        for device_id in range(args.devices)
+    ))
+
+    if server is not None:
+        # Gives the sink a moment to read what is still in flight before the totals are taken
+        await asyncio.sleep(0.2)
+        server.close()
+        await server.wait_closed()
+
+    print(report(device_stats, sink_stats, args.devices, time.perf_counter() - start))
+
+    return 1 if device_stats.connect_failures else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream simulated GPS fixes to the socket receiver.")
+    parser.add_argument("--host", default="127.0.0.1", help="Where socket_receiver is listening (SOCKET_HOST_IP).")
+    parser.add_argument("--port", type=int, default=12345, help="Port socket_receiver is listening on (SOCKET_HOST_PORT), 0 picks a free one with --sink.")
+    parser.add_argument("--track", default="straight", help="straight, spiral, image:<drawing path> or file:<lat_long.json or raw fixes file>.")
+    parser.add_argument("--centre", type=_parse_centre, default=_DEFAULT_CENTRE, help="Latitude,longitude the track is placed around.")
+    parser.add_argument("--devices", type=int, default=1, help="Simulated phones, each on its own connection.")
+    parser.add_argument("--rate", type=float, default=1, help="Fixes per second per device.")
+    parser.add_argument("--speed-factor", type=float, default=1, help="Multiple of walking speed the track is covered at.")
+    parser.add_argument("--jitter", type=float, default=0, help="Standard deviation in metres of noise added to each fix.")
+    parser.add_argument("--dropout", type=float, default=0, help="Chance each fix is never sent.")
+    parser.add_argument("--split", type=float, default=0, help="Chance each frame is cut across two writes.")
+    parser.add_argument("--split-delay", type=float, default=0.01, help="Seconds between the two writes of a split frame.")
+    parser.add_argument("--duration", type=float, help="Seconds to run for, by default each device sends its track once.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter, dropouts & splits.")
+    parser.add_argument("--sink", action="store_true", help="Host a receiver in this process & report what it received.")
+    args = parser.parse_args(argv)
+
+    if args.devices < 1:
+        parser.error("--devices must be at least 1.")
+    if not 0 < args.rate <= 1000:
+        parser.error("--rate must be above 0 & at most 1000.")
+    if args.speed_factor <= 0:
+        parser.error("--speed-factor must be above 0.")
+    if not (0 <= args.dropout < 1 and 0 <= args.split <= 1):
+        parser.error("--dropout must be in [0, 1) & --split in [0, 1].")
+    if args.split_delay < 0 or args.jitter < 0:
+        parser.error("--split-delay & --jitter can't be negative.")
+
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
+import select
 import socket as socket_lib
 from os import getenv
 
 from dotenv import load_dotenv
 
+from Core.metrics import record, timed
+from GPS_Data_Receivers.framing import FrameBuffer, fix_latency
 from exceptions import SocketDataError
+from settings import METRICS_ENABLED
 
 load_dotenv()
 
@@ -14,16 +18,53 @@ HOST_PORT = getenv("SOCKET_HOST_PORT")
 if not HOST_PORT:
     raise ValueError(f"Environment variable SOCKET_HOST_PORT must be provided when using socket_receiver.")
 
-socket = socket_lib.socket()
-socket.setsockopt(socket_lib.SOL_SOCKET, socket_lib.SO_REUSEADDR, 1)
-socket.bind((HOST_IP,int(HOST_PORT)))
-socket.listen(1)
-connection, client_address = socket.accept()
+_RECEIVE_SIZE = 4096
 
+socket = None
+connection = None
+client_address = None
+
+# Holds the start of a frame split across reads until the rest of it arrives
+_frame_buffer = FrameBuffer()
+
+
+# Waits for the phone to connect the first time a location is asked for, rather than blocking whoever imports this module
+def _get_connection() -> socket_lib.socket:
+    global socket, connection, client_address
+
+    if connection is None:
+        socket = socket_lib.socket()
+        socket.setsockopt(socket_lib.SOL_SOCKET, socket_lib.SO_REUSEADDR, 1)
+        socket.bind((HOST_IP, int(HOST_PORT)))
+        socket.listen(1)
+        connection, client_address = socket.accept()
+
+    return connection
+
+
+@timed("gps.socket_receive")
 def get_raw_location_data() -> str:
-    contents = connection.recv(2048).decode("ascii").split("%")
-    for content in contents:
-        if content != "{}":
-            return content
+    """Newest whole fix the phone has sent, waiting for one if none has arrived since the last call."""
+    conn = _get_connection()
+
+    frames = []
+    while True:
+        # Everything already waiting is read without blocking, so older queued fixes are passed over for the newest
+        readable, _, _ = select.select([conn], [], [], 0 if frames else None)
+        if not readable:
+            break
+
+        data = conn.recv(_RECEIVE_SIZE)
+        if not data:
+            raise SocketDataError("The GPS device closed the connection.", socket_data=[_frame_buffer.pending])
+
+        try:
+            frames += _frame_buffer.feed(data.decode("ascii"))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise SocketDataError(socket_data=[_frame_buffer.pending]) from e
+
+    frame = frames[-1]
+    if METRICS_ENABLED:
+        record("gps.fix_latency", fix_latency(frame))
 
-    raise SocketDataError(socket_data=contents)
+    return frame
@@ -1,9 +1,10 @@
 import cv2
-import matplotlib.pyplot as plt
 from PIL import Image
 import numpy as np
 import random
 
+from Core.metrics import span, timed
+
 # # read image 1
 # #img1 = cv2.imread('User_Drawings\panda.png')
 # #img1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
@@ -65,6 +66,23 @@ def mse(img1, img2):
 # plt.show()
 #
 
+def magnitude_spectrum(image):
+    dtf = cv2.dft(np.float32(image), flags=cv2.DFT_COMPLEX_OUTPUT)
+    dtf_shift = np.fft.fftshift(dtf)
+
+    return 20 * np.log(cv2.magnitude(dtf_shift[:, :, 0], dtf_shift[:, :, 1]))
+
+
+def spectrum_similarity(spectrum1, spectrum2, randomiser=random):
+    error = 0.8 * mse(spectrum1, spectrum2)
+
+    if error > 40:
+        error = randomiser.uniform(97.9, 99.9)
+
+    return 100 - error
+
+
+@timed("comparison.image_similarity")
 def image_similarity(fp1, fp2):
     fp1 = str(fp1)
     fp2 = str(fp2)
@@ -72,31 +90,13 @@ def image_similarity(fp1, fp2):
     image1 = cv2.imread(fp1)
     image1 = cv2.cvtColor(image1, cv2.COLOR_BGR2GRAY)
 
-    # resizes second image to first
-    h, w = image1.shape
-    resize_image = Image.open(fp2)
-    new_resize_image = resize_image.resize((w, h))
-    new_resize_image.save(fp2)
+    # resizes second image to first, in memory, as fp2 may be a cached drawing that's read elsewhere at the same time
+    with span("comparison.resize"):
+        h, w = image1.shape
+        with Image.open(fp2) as resize_image:
+            image2 = np.asarray(resize_image.convert("RGB").resize((w, h)).convert("L"))
 
-    image2 = cv2.imread(fp2)
-    image2 = cv2.cvtColor(image2, cv2.COLOR_BGR2GRAY)
-
-    dtf1 = cv2.dft(np.float32(image1), flags=cv2.DFT_COMPLEX_OUTPUT)
-    dtf2 = cv2.dft(np.float32(image2), flags=cv2.DFT_COMPLEX_OUTPUT)
-    dtf_shift1 = np.fft.fftshift(dtf1)
-    dtf_shift2 = np.fft.fftshift(dtf2)
-
-    spectrum1 = 20 * np.log(cv2.magnitude(dtf_shift1[:, :, 0], dtf_shift1[:, :, 1]))
-    spectrum2 = 20 * np.log(cv2.magnitude(dtf_shift2[:, :, 0], dtf_shift2[:, :, 1]))
-
-    error = 0.8 * mse(spectrum1,spectrum2)
-
-    if error > 40:
-        error = random.uniform(97.9, 99.9)
-
-    similarity = 100 - error
+    with span("comparison.spectrum"):
+        similarity = spectrum_similarity(magnitude_spectrum(image1), magnitude_spectrum(image2))
     string_similarity = f"{similarity: .2f}%"
     return string_similarity
-
-
-
@@ -0,0 +1,229 @@
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import chain, islice
+from json import JSONDecoder, dumps as convert_dict_to_json_string
+from os import getenv
+from pathlib import Path
+from typing import Any, TextIO
+from xml.sax.saxutils import escape
+
+from dotenv import load_dotenv
+
+from Core.metrics import timed
+from Route_Geometry.projection import latlon_to_pixel
+from Route_Geometry.simplify import simplify_stream
+from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
+
+load_dotenv()
+
+# 0 exports every recorded point
+EXPORT_SIMPLIFY_TOLERANCE_METRES = float(getenv("EXPORT_SIMPLIFY_TOLERANCE_METRES", "0"))
+if not 0 <= EXPORT_SIMPLIFY_TOLERANCE_METRES <= 1000:
+    raise ValueError(f"Environment variable EXPORT_SIMPLIFY_TOLERANCE_METRES must be between 0 & 1000.")
+
+EXPORTED_WALKS_DIRECTORY = Path("Exported_Walks")
+
+EXPORT_FILE_EXTENSIONS = (".gpx", ".geojson", ".svg")
+
+_READ_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that can carry on a number, the decoder stops before any it can't use yet so "51." decodes as 51
+_NUMBER_CHARACTERS = frozenset("0123456789.eE+-")
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def iter_json_value(file: TextIO, key: str) -> Iterator[Any]:
+    """Decodes the value of a top level key of a JSON object file a chunk at a time.
+
+    Yields each item in turn if the value is an array, or else just the value, so only one item is ever in memory.
+    """
+    decoder = JSONDecoder()
+    marker = f'"{key}"'
+    buffer = ""
+    position = 0
+
+    def read_chunk() -> bool:
+        nonlocal buffer, position
+        chunk = file.read(_READ_CHUNK_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+
+        return bool(chunk)
+
+    def next_character() -> str:
+        nonlocal position
+        while (position := _WHITESPACE.match(buffer, position).end()) == len(buffer):
+            if not read_chunk():
+                return ""
+
+        return buffer[position]
+
+    def next_value() -> Any:
+        nonlocal position
+        next_character()
+        while True:
+            # A value running to the end of the buffer may be cut off, a number especially would still decode
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) and buffer[end] not in _NUMBER_CHARACTERS:
+                    position = end
+                    return value
+            except ValueError:
+                pass
+
+            if not read_chunk():
+                value, position = decoder.raw_decode(buffer, position)
+                return value
+
+    # Keeps the tail of the last chunk in case the marker is split across two
+    while (index := buffer.find(marker)) == -1:
+        position = max(0, len(buffer) - len(marker))
+        if not read_chunk():
+            raise ValueError(f"{file.name} has no {key}.")
+    position = index + len(marker)
+
+    if next_character() != ":":
+        raise ValueError(f"{file.name} has a malformed {key}.")
+    position += 1
+
+    if next_character() != "[":
+        yield next_value()
+        return
+    position += 1
+
+    if next_character() == "]":
+        return
+
+    while True:
+        yield next_value()
+
+        separator = next_character()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"{file.name} has a malformed {key}.")
+        position += 1
+
+
+def _at_least_two_points(points: Iterable[dict[str, float]]) -> Iterator[dict[str, float]]:
+    # Checked up front, as a track or line of one point isn't valid in any of the formats
+    points = iter(points)
+    first = list(islice(points, 2))
+    if len(first) < 2:
+        raise ValueError("A walk needs at least 2 points to be exported.")
+
+    return chain(first, points)
+
+
+def write_gpx(points: Iterable[dict[str, float]], file: TextIO, name: str) -> None:
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write('<gpx version="1.1" creator="RouteArt" xmlns="http://www.topografix.com/GPX/1/1">\n')
+    file.write(f"  <trk>\n    <name>{escape(name)}</name>\n    <trkseg>\n")
+    file.writelines(f'      <trkpt lat="{point["latitude"]:.7f}" lon="{point["longitude"]:.7f}"/>\n' for point in points)
+    file.write("    </trkseg>\n  </trk>\n</gpx>\n")
+
+
+def write_geojson(points: Iterable[dict[str, float]], file: TextIO, name: str) -> None:
+    file.write('{"type": "FeatureCollection", "features": [{"type": "Feature", ')
+    file.write(f'"properties": {{"name": {convert_dict_to_json_string(name)}}}, "geometry": {{"type": "LineString", "coordinates": [')
+    # GeoJSON positions are longitude first
+    file.writelines(
+        f'{", " if index else ""}[{point["longitude"]:.7f}, {point["latitude"]:.7f}]' for (index, point) in enumerate(points)
+    )
+    file.write("]}}]}\n")
+
+
+def write_svg(
+        points: Iterable[dict[str, float]], file: TextIO, centre: dict[str, float], zoom: int | float, width: int, height: int,
+        drawing_polylines: list[list[tuple[float, float]]] | None = None, thickness: int = 3
+) -> None:
+    """The walk drawn as it is over the map, optionally over the drawing's strokes, which are fractions of width & height."""
+    file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n')
+
+    if drawing_polylines:
+        file.write('  <g fill="none" stroke="#999999" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">\n')
+        for polyline in drawing_polylines:
+            if len(polyline) >= 2:
+                file.write(f'    <polyline points="{" ".join(f"{x * width:.1f},{y * height:.1f}" for (x, y) in polyline)}"/>\n')
+        file.write("  </g>\n")
+
+    file.write(f'  <path fill="none" stroke="#000000" stroke-width="{thickness}" stroke-linecap="round" stroke-linejoin="round" d="')
+    file.writelines(
+        f'{"L" if index else "M"}{x:.1f},{y:.1f} '
+        for (index, (x, y)) in enumerate(latlon_to_pixel(point, centre, zoom, width, height) for point in points)
+    )
+    file.write('"/>\n</svg>\n')
+
+
+@timed("export.route")
+def export_route(
+        route_path: str | Path, output_path: str | Path, zoom: int | float | None = None, size: tuple[int, int] | None = None,
+        drawing_polylines: list[list[tuple[float, float]]] | None = None, simplify_tolerance_metres: float = EXPORT_SIMPLIFY_TOLERANCE_METRES
+) -> Path:
+    """Streams the drawing_points of a lat_long.json style route file out as a GPX track, GeoJSON line or SVG picked by output_path's extension.
+
+    Points are read, simplified & written one at a time, so a route of any length is exported in constant memory.
+    SVGs need the zoom & size the walk was shown at, zoom is read from the route file when it isn't given.
+    """
+    route_path = Path(route_path)
+    output_path = Path(output_path)
+    if output_path.suffix not in EXPORT_FILE_EXTENSIONS:
+        raise ValueError(f"Export file must be one of {repr(EXPORT_FILE_EXTENSIONS)}.")
+
+    if output_path.suffix == ".svg":
+        if size is None:
+            raise ValueError("Exporting an SVG needs the size the walk was drawn at.")
+        with open(route_path, "r") as file:
+            centre = next(iter_json_value(file, "desired_map_original_centre"))
+        if zoom is None:
+            with open(route_path, "r") as file:
+                zoom = next(iter_json_value(file, "zoom"))
+
+    # Written beside the real name & renamed over it, so a failed export never leaves half a file behind
+    temporary_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(route_path, "r") as route_file, open(temporary_path, "w", encoding="utf-8") as output_file:
+            points = iter_json_value(route_file, "drawing_points")
+            if simplify_tolerance_metres:
+                points = simplify_stream(points, simplify_tolerance_metres)
+            points = _at_least_two_points(points)
+
+            if output_path.suffix == ".gpx":
+                write_gpx(points, output_file, output_path.stem)
+            elif output_path.suffix == ".geojson":
+                write_geojson(points, output_file, output_path.stem)
+            else:
+                write_svg(points, output_file, centre, zoom, *size, drawing_polylines)
+
+        os.replace(temporary_path, output_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    logger.info(f"Exported {route_path} to {output_path}")
+
+    return output_path
+
+
+def export_walk(route_path: str | Path, zoom: int | float, size: tuple[int, int], drawing_polylines: list[list[tuple[float, float]]] | None = None) -> list[Path]:
+    """Exports a finished walk in every format to Exported_Walks/, named by when it was exported so walks are never overwritten."""
+    stem = datetime.now().strftime("walk_%Y%m%d_%H%M%S")
+
+    return [
+        export_route(route_path, EXPORTED_WALKS_DIRECTORY / f"{stem}{extension}", zoom, size, drawing_polylines)
+        for extension in EXPORT_FILE_EXTENSIONS
+    ]
@@ -0,0 +1,106 @@
+import math
+
+import cv2
+import numpy as np
+
+Point = tuple[float, float]
+
+# Colours of the overlay, covered & still unwalked stroke cells, everything else is transparent
+COVERED_COLOUR = (0, 170, 60, 255)
+UNCOVERED_COLOUR = (220, 30, 30, 255)
+
+
+def _clip_segment(start: Point, end: Point, low: Point, high: Point) -> tuple[Point, Point] | None:
+    # Liang-Barsky, the part of the segment inside the box from low to high, None when it misses the box
+    t_start, t_end = 0.0, 1.0
+    for axis in (0, 1):
+        delta = end[axis] - start[axis]
+        for (direction, distance) in ((-delta, start[axis] - low[axis]), (delta, high[axis] - start[axis])):
+            if direction == 0:
+                if distance < 0:
+                    return None
+            elif direction < 0:
+                t_start = max(t_start, distance / direction)
+            else:
+                t_end = min(t_end, distance / direction)
+
+    if t_start > t_end:
+        return None
+
+    return (
+        (start[0] + t_start * (end[0] - start[0]), start[1] + t_start * (end[1] - start[1])),
+        (start[0] + t_end * (end[0] - start[0]), start[1] + t_end * (end[1] - start[1]))
+    )
+
+
+class CoverageMap:
+    """Low resolution bitmap of a drawing's strokes recording which of them the walk has passed close to.
+
+    The drawing is rasterised once onto a grid of cell_size pixel cells. Each walked segment marks the stroke cells within
+    tolerance of it as covered by stamping a disc every cell along the segment, so an update costs O(segment length)
+    however big the drawing is. The covered count is kept as it changes, so percent_covered is free to read.
+    """
+
+    def __init__(self, polylines: list[list[Point]], width: int | float, height: int | float, tolerance: float, cell_size: float = 4) -> None:
+        """polylines are fractions of the width x height drawing, tolerance & cell_size are in the drawing's pixels."""
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.grid_size = (max(1, math.ceil(width / cell_size)), max(1, math.ceil(height / cell_size)))
+
+        strokes = np.zeros(self.grid_size[::-1], dtype=np.uint8)
+        grid_polylines = [
+            np.round(np.array(polyline, dtype=np.float64) * (self.grid_size[0], self.grid_size[1]) * 16).astype(np.int32)
+            for polyline in polylines if len(polyline) >= 2
+        ]
+        # 4 fractional bits keep sub cell positions without going through floats in cv2
+        cv2.polylines(strokes, grid_polylines, False, 1, 1, cv2.LINE_8, shift=4)
+
+        self._strokes = strokes.astype(bool).ravel()
+        self._covered = np.zeros_like(self._strokes)
+        self.stroke_cells = int(self._strokes.sum())
+        self.covered_cells = 0
+
+        radius = max(0.5, tolerance / cell_size)
+        reach = math.ceil(radius)
+        # Box a sample's disc can still reach the grid from, with a cell spare for samples being rounded to cells
+        self._reach_low = (-reach - 1, -reach - 1)
+        self._reach_high = (self.grid_size[0] + reach, self.grid_size[1] + reach)
+        offset_ys, offset_xs = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+        in_disc = offset_xs ** 2 + offset_ys ** 2 <= radius ** 2
+        self._disc_xs = offset_xs[in_disc]
+        self._disc_ys = offset_ys[in_disc]
+
+        # Kept up to date cell by cell as the walk goes, so the overlay never has to be redrawn from scratch
+        self.overlay = np.zeros((*self.grid_size[::-1], 4), dtype=np.uint8)
+        self.overlay.reshape(-1, 4)[self._strokes] = UNCOVERED_COLOUR
+
+    @property
+    def percent_covered(self) -> float:
+        return 100 * self.covered_cells / self.stroke_cells if self.stroke_cells else 0.0
+
+    def add_segment(self, start: Point, end: Point) -> int:
+        """Marks stroke cells within tolerance of the segment between two drawing pixels as covered, returning how many were new."""
+        clipped = _clip_segment(
+            (start[0] / self.cell_size, start[1] / self.cell_size), (end[0] / self.cell_size, end[1] / self.cell_size),
+            self._reach_low, self._reach_high
+        )
+        # Only the part that could cover a cell is sampled, so a wild fix far off the drawing costs nothing
+        if clipped is None:
+            return 0
+        ((start_x, start_y), (end_x, end_y)) = clipped
+
+        samples = max(1, math.ceil(math.hypot(end_x - start_x, end_y - start_y))) + 1
+        t = np.linspace(0, 1, samples)
+        xs = np.round(start_x + t * (end_x - start_x)).astype(np.int64)[:, None] + self._disc_xs
+        ys = np.round(start_y + t * (end_y - start_y)).astype(np.int64)[:, None] + self._disc_ys
+
+        on_grid = (xs >= 0) & (xs < self.grid_size[0]) & (ys >= 0) & (ys < self.grid_size[1])
+        cells = ys[on_grid] * self.grid_size[0] + xs[on_grid]
+        newly_covered = np.unique(cells[self._strokes[cells] & ~self._covered[cells]])
+
+        self._covered[newly_covered] = True
+        self.covered_cells += len(newly_covered)
+        self.overlay.reshape(-1, 4)[newly_covered] = COVERED_COLOUR
+
+        return len(newly_covered)
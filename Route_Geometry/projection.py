@@ -0,0 +1,46 @@
+import math
+
+# Equatorial radius of the earth in metres
+X_CONST = 6_378_137
+# Metres per degree of latitude
+Y_CONST = 111139
+
+
+def metres_per_pixel(latitude: float, zoom: int | float) -> float:
+    return math.pi * X_CONST * math.cos(math.radians(latitude)) / (2 ** (zoom + 8))
+
+
+def latlon_to_metres(latlon: dict[str, float], centre: dict[str, float]) -> tuple[float, float]:
+    """Local east/north offset in metres of latlon from centre."""
+    dif_x = latlon["longitude"] - centre["longitude"]
+    dif_y = latlon["latitude"] - centre["latitude"]
+
+    return dif_x * X_CONST * math.pi / 180 * math.cos(math.radians(latlon["latitude"])), dif_y * Y_CONST
+
+
+def metres_to_latlon(point: tuple[float, float], centre: dict[str, float]) -> dict[str, float]:
+    latitude = centre["latitude"] + point[1] / Y_CONST
+
+    return {
+        "latitude": latitude,
+        "longitude": centre["longitude"] + point[0] / (X_CONST * math.pi / 180 * math.cos(math.radians(latitude)))
+    }
+
+
+def latlon_to_pixel(latlon: dict[str, float], centre: dict[str, float], zoom: int | float, width: int | float, height: int | float) -> tuple[float, float]:
+    """Position of latlon on a width x height map image centred on centre, matching the Geoapify static map projection."""
+    dif_x_m, dif_y_m = latlon_to_metres(latlon, centre)
+    pixel_size = metres_per_pixel(latlon["latitude"], zoom)
+
+    return width / 2 + dif_x_m / pixel_size, height / 2 - dif_y_m / pixel_size
+
+
+def pixel_to_metres(point: tuple[float, float], centre: dict[str, float], zoom: int | float, width: int | float, height: int | float) -> tuple[float, float]:
+    # The pixel size is taken at the map centre, which is accurate to well under a pixel at walking scales
+    pixel_size = metres_per_pixel(centre["latitude"], zoom)
+
+    return (point[0] - width / 2) * pixel_size, (height / 2 - point[1]) * pixel_size
+
+
+def pixel_to_latlon(point: tuple[float, float], centre: dict[str, float], zoom: int | float, width: int | float, height: int | float) -> dict[str, float]:
+    return metres_to_latlon(pixel_to_metres(point, centre, zoom, width, height), centre)
@@ -0,0 +1,16 @@
+import cv2
+import numpy as np
+
+from Route_Geometry.projection import latlon_to_pixel
+
+
+def render_route(points: list[dict[str, float]], centre: dict[str, float], zoom: int | float, width: int, height: int, thickness: int = 3) -> np.ndarray:
+    """Greyscale route image, black line on white, matching what get_walking_drawing_image_path saves but without pygame."""
+    image = np.full((height, width), 255, dtype=np.uint8)
+
+    if len(points) >= 2:
+        pixels = np.array([latlon_to_pixel(point, centre, zoom, width, height) for point in points], dtype=np.float64)
+        # 4 fractional bits keep sub pixel positions without going through floats in cv2
+        cv2.polylines(image, [np.round(pixels * 16).astype(np.int32)], False, 0, thickness, cv2.LINE_8, shift=4)
+
+    return image
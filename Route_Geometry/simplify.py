@@ -0,0 +1,85 @@
+import math
+from collections.abc import Iterable, Iterator
+
+from Route_Geometry.projection import latlon_to_metres
+
+
+class StreamingSimplifier:
+    """Decides point by point which points of a track to keep, so every dropped one is within tolerance_metres of the line that replaced it.
+
+    Works in one pass with constant memory. From each kept point it narrows the sector of directions a straight line
+    could leave in & still pass every point since, a point is only kept once the next one falls outside that sector or
+    doubles back on the line. Half the squared tolerance goes to how far a point may sit beside the line & half to how
+    far past its end, so together they never add up to more than tolerance_metres.
+    """
+
+    def __init__(self, tolerance_metres: float) -> None:
+        self.tolerance_metres = tolerance_metres
+        self.anchor: dict[str, float] | None = None
+        # The newest point added, the simplified track always ends with it even though it may not be kept for good yet
+        self.last: dict[str, float] | None = None
+
+        self._sleeve = tolerance_metres / math.sqrt(2)
+        # Sector bounds are relative to the direction of the first point far enough from the anchor to have one
+        self._reference: float | None = None
+        self._low = self._high = 0.0
+        self._furthest = 0.0
+
+    def add(self, point: dict[str, float]) -> dict[str, float] | None:
+        """Adds the next point, returning the point that's now kept for good if this settled one."""
+        if self.anchor is None:
+            self.anchor = self.last = point
+            return point
+
+        kept = None
+        distance, angle = self._from_anchor(point)
+
+        # Until a point strays beyond tolerance of the anchor, a line from it to anywhere passes close enough to them all
+        if self._reference is not None and not (self._low <= angle <= self._high and distance >= self._furthest - self._sleeve):
+            kept = self.anchor = self.last
+            self._reference = None
+            self._furthest = 0.0
+            distance, angle = self._from_anchor(point)
+
+        # A point this near the anchor is close enough to any line from it, so it doesn't narrow the sector
+        if distance > self.tolerance_metres:
+            if self._reference is None:
+                self._reference = angle
+                self._low, self._high = -math.pi, math.pi
+                angle = 0.0
+
+            spread = math.asin(self._sleeve / distance)
+            self._low = max(self._low, angle - spread)
+            self._high = min(self._high, angle + spread)
+            self._furthest = max(self._furthest, distance)
+
+        self.last = point
+
+        return kept
+
+    def _from_anchor(self, point: dict[str, float]) -> tuple[float, float]:
+        # Distance & direction from the anchor, the direction relative to the sector's reference once there is one
+        dx, dy = latlon_to_metres(point, self.anchor)
+        distance = math.hypot(dx, dy)
+        # Before there's a sector, the direction of a point this near the anchor is never needed
+        if self._reference is None and distance <= self.tolerance_metres:
+            return distance, 0.0
+
+        angle = math.atan2(dy, dx)
+        if self._reference is not None:
+            angle = (angle - self._reference + math.pi) % (2 * math.pi) - math.pi
+
+        return distance, angle
+
+
+def simplify_stream(points: Iterable[dict[str, float]], tolerance_metres: float) -> Iterator[dict[str, float]]:
+    """Yields a subset of points, keeping every dropped point within tolerance_metres of the line that replaced it."""
+    simplifier = StreamingSimplifier(tolerance_metres)
+
+    for point in points:
+        kept = simplifier.add(point)
+        if kept is not None:
+            yield kept
+
+    if simplifier.last is not simplifier.anchor:
+        yield simplifier.last
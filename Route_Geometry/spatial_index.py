@@ -0,0 +1,171 @@
+import math
+from typing import Iterable
+
+import numpy as np
+
+Point = tuple[float, float]
+
+
+class SegmentIndex:
+    """Uniform grid over line segments answering nearest segment & within radius queries.
+
+    Segments are registered in every grid cell they pass through, so a query only measures the segments in the few cells around it.
+    Works in any planar units, RouteArt uses local metres from projection.latlon_to_metres.
+    """
+
+    def __init__(self, segments: Iterable[tuple[Point, Point]], cell_size: float | None = None) -> None:
+        segments = list(segments)
+
+        self._starts = np.array([segment[0] for segment in segments], dtype=np.float64).reshape(-1, 2)
+        self._ends = np.array([segment[1] for segment in segments], dtype=np.float64).reshape(-1, 2)
+
+        self._segments = [
+            (start_x, start_y, end_x - start_x, end_y - start_y, (end_x - start_x) ** 2 + (end_y - start_y) ** 2)
+            for ((start_x, start_y), (end_x, end_y)) in zip(self._starts.tolist(), self._ends.tolist())
+        ]
+
+        if cell_size is None:
+            lengths = np.hypot(*(self._ends - self._starts).T)
+            cell_size = float(lengths.mean()) if len(lengths) else 1.0
+        self.cell_size = max(cell_size, 1e-6)
+
+        cells: dict[tuple[int, int], list[int]] = {}
+        for (i, (start, end)) in enumerate(zip(self._starts.tolist(), self._ends.tolist())):
+            for cell in self._cells_along(start, end):
+                cells.setdefault(cell, []).append(i)
+        self._cells = {cell: tuple(segment_ids) for (cell, segment_ids) in cells.items()}
+
+        if self._cells:
+            cell_xs, cell_ys = zip(*self._cells)
+            self._bounds = (min(cell_xs), min(cell_ys), max(cell_xs), max(cell_ys))
+        else:
+            self._bounds = None
+
+    @classmethod
+    def from_polylines(cls, polylines: Iterable[Iterable[Point]], cell_size: float | None = None) -> "SegmentIndex":
+        segments = []
+        for polyline in polylines:
+            polyline = list(polyline)
+            segments.extend(zip(polyline, polyline[1:]))
+
+        return cls(segments, cell_size)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _cell(self, point: Point) -> tuple[int, int]:
+        return math.floor(point[0] / self.cell_size), math.floor(point[1] / self.cell_size)
+
+    def _cells_along(self, start: tuple[float, float], end: tuple[float, float]) -> list[tuple[int, int]]:
+        # Every cell whose centre is within half a cell diagonal of the segment, a superset of the cells it actually crosses
+        (low_x, low_y), (high_x, high_y) = self._cell((min(start[0], end[0]), min(start[1], end[1]))), self._cell((max(start[0], end[0]), max(start[1], end[1])))
+        if low_x == high_x and low_y == high_y:
+            return [(low_x, low_y)]
+
+        half_diagonal = self.cell_size * math.sqrt(0.5)
+        direction_x, direction_y = end[0] - start[0], end[1] - start[1]
+        length_squared = direction_x ** 2 + direction_y ** 2
+
+        cells = []
+        for x in range(low_x, high_x + 1):
+            for y in range(low_y, high_y + 1):
+                offset_x, offset_y = (x + 0.5) * self.cell_size - start[0], (y + 0.5) * self.cell_size - start[1]
+                projection = min(1.0, max(0.0, (offset_x * direction_x + offset_y * direction_y) / length_squared)) if length_squared > 0 else 0.0
+                if math.hypot(offset_x - direction_x * projection, offset_y - direction_y * projection) <= half_diagonal:
+                    cells.append((x, y))
+
+        return cells
+
+    def _distances(self, point: Point, segment_ids: np.ndarray) -> np.ndarray:
+        starts = self._starts[segment_ids]
+        directions = self._ends[segment_ids] - starts
+        offsets = np.asarray(point) - starts
+
+        lengths_squared = np.einsum("ij,ij->i", directions, directions)
+        projections = np.divide(np.einsum("ij,ij->i", offsets, directions), lengths_squared, out=np.zeros_like(lengths_squared), where=lengths_squared > 0)
+        projections = np.clip(projections, 0, 1)
+
+        return np.hypot(*(offsets - directions * projections[:, None]).T)
+
+    def _distance(self, point: Point, segment_id: int) -> float:
+        # Per query candidate sets are a handful of segments, where plain floats beat numpy's call overhead
+        start_x, start_y, direction_x, direction_y, length_squared = self._segments[segment_id]
+        offset_x, offset_y = point[0] - start_x, point[1] - start_y
+
+        projection = 0.0
+        if length_squared > 0:
+            projection = min(1.0, max(0.0, (offset_x * direction_x + offset_y * direction_y) / length_squared))
+
+        return math.hypot(offset_x - direction_x * projection, offset_y - direction_y * projection)
+
+    def _brute_force_nearest(self, point: Point) -> tuple[float, int]:
+        distances = self._distances(point, np.arange(len(self)))
+        nearest = int(np.argmin(distances))
+
+        return float(distances[nearest]), nearest
+
+    def nearest(self, point: Point) -> tuple[float, int]:
+        """Distance to & index of the nearest segment, (inf, -1) when the index is empty."""
+        if self._bounds is None:
+            return math.inf, -1
+
+        cell_x, cell_y = self._cell(point)
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(abs(cell_x - min_x), abs(cell_x - max_x), abs(cell_y - min_y), abs(cell_y - max_y))
+
+        best_distance, best_id = math.inf, -1
+        measured = set()
+        cells_visited = 0
+        for ring in range(max_ring + 1):
+            for cell in self._ring(cell_x, cell_y, ring):
+                for segment_id in self._cells.get(cell, ()):
+                    if segment_id not in measured:
+                        measured.add(segment_id)
+                        distance = self._distance(point, segment_id)
+                        if distance < best_distance:
+                            best_distance, best_id = distance, segment_id
+            cells_visited += max(1, 8 * ring)
+
+            # Anything not found yet lies wholly outside the square of cells searched so far, once that's further than the best we're done
+            if best_distance <= min(
+                    point[0] - (cell_x - ring) * self.cell_size, (cell_x + ring + 1) * self.cell_size - point[0],
+                    point[1] - (cell_y - ring) * self.cell_size, (cell_y + ring + 1) * self.cell_size - point[1]
+            ):
+                break
+
+            # Far from the drawing the rings get big & empty, measuring every segment directly is cheaper
+            if cells_visited > len(self):
+                return self._brute_force_nearest(point)
+
+        return best_distance, best_id
+
+    def query_radius(self, point: Point, radius: float) -> list[int]:
+        """Indices of every segment within radius of point."""
+        if self._bounds is None:
+            return []
+
+        (low_x, low_y), (high_x, high_y) = self._cell((point[0] - radius, point[1] - radius)), self._cell((point[0] + radius, point[1] + radius))
+        # Cells outside the bounds are all empty, a big radius or tiny cells would otherwise loop over huge numbers of them
+        min_x, min_y, max_x, max_y = self._bounds
+        candidates = set()
+        for x in range(max(low_x, min_x), min(high_x, max_x) + 1):
+            for y in range(max(low_y, min_y), min(high_y, max_y) + 1):
+                candidates.update(self._cells.get((x, y), ()))
+
+        return sorted(segment_id for segment_id in candidates if self._distance(point, segment_id) <= radius)
+
+    def within(self, point: Point, radius: float) -> bool:
+        return bool(self.query_radius(point, radius))
+
+    @staticmethod
+    def _ring(cell_x: int, cell_y: int, ring: int) -> Iterable[tuple[int, int]]:
+        if ring == 0:
+            yield cell_x, cell_y
+            return
+
+        for x in range(cell_x - ring, cell_x + ring + 1):
+            yield x, cell_y - ring
+            yield x, cell_y + ring
+        for y in range(cell_y - ring + 1, cell_y + ring):
+            yield cell_x - ring, y
+            yield cell_x + ring, y
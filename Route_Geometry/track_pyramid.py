@@ -0,0 +1,74 @@
+import hashlib
+import math
+from collections.abc import Iterable
+
+from Route_Geometry.projection import metres_per_pixel
+from Route_Geometry.simplify import StreamingSimplifier
+
+# Zooms the map can be shown at, beyond the most detailed level every recorded point is drawn
+MIN_ZOOM_LEVEL = 1
+MAX_ZOOM_LEVEL = 20
+
+
+class TrackPyramid:
+    """A recorded track kept simplified for every whole zoom level as its points arrive.
+
+    Each level drops points that stay within half a pixel at its zoom of the line that replaced them, so the drawn line
+    is never more than half a pixel from where the full track would put it. Drawing at a zoom uses the coarsest level
+    that's still that accurate, so redrawing costs what is visible on screen rather than how long the walk was. Adding
+    a point costs the same however long the track is.
+    """
+
+    def __init__(self, points: Iterable[dict[str, float]] = ()) -> None:
+        self.points: list[dict[str, float]] = []
+        # Built once the first point gives a latitude to size pixels at, walks are never long enough for that to drift
+        self._levels: dict[int, tuple[StreamingSimplifier, list[dict[str, float]]]] = {}
+        # Identifies exactly these points, for naming cached renders, without rehashing the whole track
+        self._sha = hashlib.sha256()
+
+        self.extend(points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def add(self, point: dict[str, float]) -> None:
+        if not self._levels:
+            self._levels = {
+                level: (StreamingSimplifier(metres_per_pixel(point["latitude"], level) / 2), [])
+                for level in range(MIN_ZOOM_LEVEL, MAX_ZOOM_LEVEL + 1)
+            }
+
+        self.points.append(point)
+        self._sha.update(f"{point['latitude']},{point['longitude']};".encode())
+
+        for (simplifier, kept) in self._levels.values():
+            settled = simplifier.add(point)
+            if settled is not None:
+                kept.append(settled)
+
+    def extend(self, points: Iterable[dict[str, float]]) -> None:
+        for point in points:
+            self.add(point)
+
+    @property
+    def digest(self) -> str:
+        return self._sha.hexdigest()
+
+    def level_for_zoom(self, zoom: int | float) -> int | None:
+        """Coarsest level that's accurate to half a pixel at zoom, None when only every recorded point is."""
+        level = max(MIN_ZOOM_LEVEL, math.ceil(zoom))
+
+        return level if level <= MAX_ZOOM_LEVEL else None
+
+    def points_for_zoom(self, zoom: int | float) -> list[dict[str, float]]:
+        """The fewest points that draw the track at zoom to within half a pixel of every recorded point."""
+        level = self.level_for_zoom(zoom)
+        if level is None or not self._levels:
+            return list(self.points)
+
+        simplifier, kept = self._levels[level]
+        if kept[-1] is simplifier.last:
+            return list(kept)
+
+        # The newest point always ends the track, whether or not the level has settled on keeping it yet
+        return [*kept, simplifier.last]
@@ -0,0 +1,62 @@
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from Core.maps import get_desired_background_map_image, get_walking_background_map_image
+
+# Paths remembered in memory, older ones are still on disk & just cost a cache file check when asked for again
+_REMEMBERED_PATHS = 4096
+
+
+class MapCache:
+    """Background maps shared by every session, fetched through Core.maps & its on-disk cache.
+
+    Requests for the same map share one fetch, so a crowd starting at the same spot costs one Geoapify download.
+    Maps already fetched are remembered by key & returned without touching a thread or the disk.
+    """
+
+    def __init__(self) -> None:
+        self._paths: OrderedDict[tuple, Path] = OrderedDict()
+        # Fetches in progress, gone once they finish whether or not they worked, so a failed map is fetched afresh next time
+        self._fetches: dict[tuple, asyncio.Task[Path]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _get(self, key: tuple, fetch: Callable[[], Path]) -> Path:
+        path = self._paths.get(key)
+        if path is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return path
+
+        fetching = self._fetches.get(key)
+        if fetching is None:
+            self.misses += 1
+            fetching = self._fetches[key] = asyncio.create_task(self._fetch(key, fetch))
+        else:
+            self.hits += 1
+
+        # Shielded, so one request giving up doesn't cancel the fetch for everyone else waiting on it
+        return await asyncio.shield(fetching)
+
+    async def _fetch(self, key: tuple, fetch: Callable[[], Path]) -> Path:
+        try:
+            # Core.maps downloads with requests, so it runs on a thread rather than blocking the event loop
+            path = self._paths[key] = await asyncio.to_thread(fetch)
+            if len(self._paths) > _REMEMBERED_PATHS:
+                self._paths.popitem(last=False)
+
+            return path
+        finally:
+            del self._fetches[key]
+
+    async def desired_map(self, width: int, height: int, zoom: float, centre: dict[str, float]) -> Path:
+        key = ("desired", width, height, zoom, centre["latitude"], centre["longitude"])
+
+        return await self._get(key, lambda: get_desired_background_map_image(width, height, zoom, centre))
+
+    async def walking_map(self, width: int, height: int, zoom: float, centre: dict[str, float], marker: dict[str, float]) -> Path:
+        key = ("walking", width, height, zoom, centre["latitude"], centre["longitude"], marker["latitude"], marker["longitude"])
+
+        return await self._get(key, lambda: get_walking_background_map_image(width, height, zoom, marker, centre))
@@ -0,0 +1,388 @@
+"""Multi-user RouteArt server for events, one process holding every walker's session.
+
+Walkers create a session around their map centre, upload a drawing & stream positions over a WebSocket, either as
+{"latitude": .., "longitude": ..} JSON messages or the phone app's own %-delimited frames. Background maps come from one
+cache shared by every session, overlays & scores are made on a process pool with the batch scorer's code.
+
+Endpoints:
+    POST   /sessions                      {"centre": {"latitude": .., "longitude": ..}, "zoom": 15}
+    GET    /sessions/{id}                 Session summary
+    DELETE /sessions/{id}
+    PUT    /sessions/{id}/drawing         Raw image bytes
+    GET    /sessions/{id}/positions       WebSocket, send positions & get back how many have been recorded
+    GET    /sessions/{id}/watch           WebSocket, receive each position the walker sends
+    GET    /sessions/{id}/map?kind=...    desired or walking background map image
+    GET    /sessions/{id}/overlay.png     The walked route drawn to match the map
+    GET    /sessions/{id}/score           Similarity of the walked route to the drawing
+    GET    /stats
+
+Example:
+    python -m Server.server --port 8080 --workers 4
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from json import JSONDecodeError, dumps as convert_dict_to_json_string, loads as convert_json_string_to_dict
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+from Core.gps import extract_current_location
+from GPS_Data_Receivers.framing import FRAME_DELIMITER, FrameBuffer
+from Server import workers
+from Server.map_cache import MapCache
+from Server.sessions import DEFAULT_DRAWING_RECT, Session, SessionStore
+from exceptions import FailedRequestError
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL
+
+SERVER_DRAWINGS_DIRECTORY = Path("Server_Drawings")
+
+_MAX_DRAWING_BYTES = 20 * 2 ** 20
+_DRAWING_FILE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/bmp": ".bmp"}
+_PRUNE_INTERVAL_SECONDS = 60
+# A watcher that can't take its updates this quickly is dropped, rather than holding up the walker sending them
+_WATCHER_SEND_TIMEOUT_SECONDS = 5
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+SESSIONS = web.AppKey("sessions", SessionStore)
+MAP_CACHE = web.AppKey("map_cache", MapCache)
+POOL = web.AppKey("pool", ProcessPoolExecutor)
+POOL_SLOTS = web.AppKey("pool_slots", asyncio.Semaphore)
+IDLE_SECONDS = web.AppKey("idle_seconds", float)
+
+
+def _json_error(error: type[web.HTTPException], message: str) -> web.HTTPException:
+    return error(text=convert_dict_to_json_string({"error": message}), content_type="application/json")
+
+
+def _parse_latlon(value) -> dict[str, float]:
+    try:
+        latlon = {"latitude": float(value["latitude"]), "longitude": float(value["longitude"])}
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("A position must have a numeric latitude & longitude.")
+
+    if not (-90 <= latlon["latitude"] <= 90 and -180 <= latlon["longitude"] <= 180):
+        raise ValueError("Latitude must be between -90 & 90 & longitude between -180 & 180.")
+
+    return latlon
+
+
+def _session(request: web.Request) -> Session:
+    session = request.app[SESSIONS].get(request.match_info["session_id"])
+    if session is None:
+        raise _json_error(web.HTTPNotFound, "No session with that id.")
+
+    return session
+
+
+async def _run_in_pool(app: web.Application, function, *args):
+    # Only a few jobs per worker are queued, so a burst of requests waits here rather than piling pickled routes onto the pool
+    async with app[POOL_SLOTS]:
+        return await asyncio.get_running_loop().run_in_executor(app[POOL], function, *args)
+
+
+async def create_session(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+        centre = _parse_latlon(body["centre"])
+        zoom = float(body.get("zoom", 15))
+    except (JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise _json_error(web.HTTPBadRequest, f"Body must be JSON with a centre latitude & longitude & an optional zoom. {e}")
+
+    if not 1 <= zoom <= 20:
+        raise _json_error(web.HTTPBadRequest, "Zoom must be between 1 & 20.")
+
+    try:
+        session = request.app[SESSIONS].create(centre, zoom)
+    except OverflowError as e:
+        raise _json_error(web.HTTPServiceUnavailable, str(e))
+
+    logger.info(f"Created session {session.session_id}")
+
+    return web.json_response(session.summary(), status=201)
+
+
+async def get_session(request: web.Request) -> web.Response:
+    return web.json_response(_session(request).summary())
+
+
+async def delete_session(request: web.Request) -> web.Response:
+    session = request.app[SESSIONS].remove(request.match_info["session_id"])
+    if session is None:
+        raise _json_error(web.HTTPNotFound, "No session with that id.")
+
+    for ws in [*session.walkers, *session.watchers]:
+        await ws.close()
+
+    return web.Response(status=204)
+
+
+async def upload_drawing(request: web.Request) -> web.Response:
+    session = _session(request)
+
+    data = await request.read()
+    if not data:
+        raise _json_error(web.HTTPBadRequest, "Body must be the drawing's image bytes.")
+
+    # Stored by content, so the same drawing uploaded by many walkers is kept & decoded once
+    file_name = hashlib.sha256(data).hexdigest() + _DRAWING_FILE_EXTENSIONS.get(request.content_type, ".img")
+    drawing_path = SERVER_DRAWINGS_DIRECTORY / file_name
+    if not drawing_path.is_file():
+        await asyncio.to_thread(_write_drawing, drawing_path, data)
+
+    try:
+        width, height = await _run_in_pool(request.app, workers.drawing_size, str(drawing_path), DEFAULT_DRAWING_RECT)
+    except ValueError:
+        # Left in place, other sessions may share the file & the same bytes would fail the same way again
+        raise _json_error(web.HTTPBadRequest, "Drawing could not be read as an image.")
+
+    session.drawing_path = str(drawing_path)
+    session.width, session.height = width, height
+    session.score = None
+
+    return web.json_response(session.summary())
+
+
+def _write_drawing(drawing_path: Path, data: bytes) -> None:
+    # Written under a name of its own & moved into place whole, so a concurrent upload of the same drawing never reads it half written
+    temporary_path = drawing_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        temporary_path.write_bytes(data)
+        os.replace(temporary_path, drawing_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def _positions_from_message(message: str, frame_buffer: FrameBuffer) -> list[dict[str, float]]:
+    if FRAME_DELIMITER in message or frame_buffer.pending or message.startswith("{'"):
+        positions = []
+        # Parsed one by one, the buffer has already moved past these frames, so a bad one mustn't lose the rest
+        for frame in frame_buffer.feed(message):
+            try:
+                positions.append(extract_current_location(frame))
+            except (JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                logger.info(f"Skipped a GPS frame that couldn't be parsed. {e!r}")
+
+        return positions
+
+    return [_parse_latlon(convert_json_string_to_dict(message))]
+
+
+async def _add_positions(session: Session, positions: list[dict[str, float]]) -> None:
+    first_point = len(session.points) + 1
+    session.track.extend(positions)
+    session.touch()
+
+    updates = [
+        {"latitude": position["latitude"], "longitude": position["longitude"], "points": points}
+        for (points, position) in enumerate(positions, first_point)
+    ]
+    watchers = [ws for ws in session.watchers if not ws.closed]
+    # Sent to every watcher at once, so one slow watcher doesn't hold up the others
+    results = await asyncio.gather(
+        *(asyncio.wait_for(_send_to_watcher(ws, updates), _WATCHER_SEND_TIMEOUT_SECONDS) for ws in watchers),
+        return_exceptions=True
+    )
+
+    for (ws, result) in zip(watchers, results):
+        if isinstance(result, Exception):
+            logger.info(f"Dropped a watcher of session {session.session_id}. {result!r}")
+            session.watchers.discard(ws)
+            ws.force_close()
+
+
+async def _send_to_watcher(ws: web.WebSocketResponse, updates: list[dict[str, float | int]]) -> None:
+    for update in updates:
+        await ws.send_json(update)
+
+
+async def stream_positions(request: web.Request) -> web.WebSocketResponse:
+    session = _session(request)
+
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    session.walkers.add(ws)
+
+    frame_buffer = FrameBuffer()
+    try:
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+
+            try:
+                positions = _positions_from_message(message.data, frame_buffer)
+            except (JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                await ws.send_json({"error": f"Position not understood. {e}"})
+                continue
+
+            await _add_positions(session, positions)
+            await ws.send_json({"points": len(session.points)})
+    finally:
+        session.walkers.discard(ws)
+
+    return ws
+
+
+async def watch_positions(request: web.Request) -> web.WebSocketResponse:
+    session = _session(request)
+
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    session.watchers.add(ws)
+
+    try:
+        # Nothing is expected from watchers, this just waits for them to go away
+        async for _ in ws:
+            pass
+    finally:
+        session.watchers.discard(ws)
+
+    return ws
+
+
+async def get_map(request: web.Request) -> web.FileResponse:
+    session = _session(request)
+    kind = request.query.get("kind", "desired")
+    map_cache = request.app[MAP_CACHE]
+
+    try:
+        if kind == "desired":
+            path = await map_cache.desired_map(session.width, session.height, session.zoom, session.centre)
+        elif kind == "walking":
+            if not session.points:
+                raise _json_error(web.HTTPConflict, "The walking map needs at least one position.")
+            path = await map_cache.walking_map(session.width, session.height, session.zoom, session.centre, session.points[-1])
+        else:
+            raise _json_error(web.HTTPBadRequest, "Kind must be desired or walking.")
+    except FailedRequestError as e:
+        raise _json_error(web.HTTPBadGateway, str(e))
+    except ValueError as e:
+        # Raised when the server has no Geoapify key configured
+        raise _json_error(web.HTTPServiceUnavailable, str(e))
+
+    return web.FileResponse(path)
+
+
+async def get_overlay(request: web.Request) -> web.Response:
+    session = _session(request)
+
+    point_count = len(session.points)
+    if session.overlay is None or session.overlay[0] != point_count:
+        png = await _run_in_pool(request.app, workers.render_overlay, session.track.points_for_zoom(session.zoom), session.centre, session.zoom, session.width, session.height)
+        session.overlay = (point_count, png)
+
+    return web.Response(body=session.overlay[1], content_type="image/png")
+
+
+async def get_score(request: web.Request) -> web.Response:
+    session = _session(request)
+    if session.drawing_path is None:
+        raise _json_error(web.HTTPConflict, "Upload a drawing before asking for a score.")
+
+    point_count = len(session.points)
+    if point_count < 2:
+        raise _json_error(web.HTTPConflict, "A score needs at least two positions.")
+
+    if session.score is None or session.score[0] != point_count:
+        try:
+            similarity = await _run_in_pool(request.app, workers.score, session.points[:point_count], session.centre, session.zoom, session.drawing_path, DEFAULT_DRAWING_RECT)
+        except ValueError as e:
+            raise _json_error(web.HTTPConflict, str(e))
+        session.score = (point_count, similarity)
+
+    return web.json_response({"similarity": session.score[1], "points": point_count})
+
+
+async def get_stats(request: web.Request) -> web.Response:
+    sessions = request.app[SESSIONS]
+    map_cache = request.app[MAP_CACHE]
+
+    return web.json_response({
+        "sessions": len(sessions),
+        "walkers": sum(len(session.walkers) for session in sessions),
+        "watchers": sum(len(session.watchers) for session in sessions),
+        "points": sum(len(session.points) for session in sessions),
+        "map_cache": {"hits": map_cache.hits, "misses": map_cache.misses},
+    })
+
+
+async def _prune_sessions(app: web.Application) -> None:
+    while True:
+        await asyncio.sleep(_PRUNE_INTERVAL_SECONDS)
+        pruned = app[SESSIONS].prune(app[IDLE_SECONDS])
+        if pruned:
+            logger.info(f"Pruned {pruned} idle sessions")
+
+
+async def _background_tasks(app: web.Application):
+    task = asyncio.create_task(_prune_sessions(app))
+    yield
+    task.cancel()
+    app[POOL].shutdown(cancel_futures=True)
+
+
+def create_app(worker_count: int = os.cpu_count(), max_sessions: int = 1000, idle_seconds: float = 2 * 60 * 60) -> web.Application:
+    SERVER_DRAWINGS_DIRECTORY.mkdir(exist_ok=True)
+
+    app = web.Application(client_max_size=_MAX_DRAWING_BYTES)
+    app[SESSIONS] = SessionStore(max_sessions)
+    app[MAP_CACHE] = MapCache()
+    app[POOL] = ProcessPoolExecutor(max_workers=worker_count, initializer=workers.init_worker)
+    app[POOL_SLOTS] = asyncio.Semaphore(4 * worker_count)
+    app[IDLE_SECONDS] = idle_seconds
+    app.cleanup_ctx.append(_background_tasks)
+
+    app.add_routes([
+        web.post("/sessions", create_session),
+        web.get("/sessions/{session_id}", get_session),
+        web.delete("/sessions/{session_id}", delete_session),
+        web.put("/sessions/{session_id}/drawing", upload_drawing),
+        web.get("/sessions/{session_id}/positions", stream_positions),
+        web.get("/sessions/{session_id}/watch", watch_positions),
+        web.get("/sessions/{session_id}/map", get_map),
+        web.get("/sessions/{session_id}/overlay.png", get_overlay),
+        web.get("/sessions/{session_id}/score", get_score),
+        web.get("/stats", get_stats),
+    ])
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve RouteArt to many walkers at once.")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes rendering overlays & scores (default: CPU count).")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="Most sessions held at once.")
+    parser.add_argument("--session-idle-minutes", type=float, default=120, help="Sessions unused for this long with no open WebSockets are dropped.")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if args.max_sessions < 1:
+        parser.error("--max-sessions must be at least 1.")
+
+    web.run_app(create_app(args.workers, args.max_sessions, args.session_idle_minutes * 60), host=args.host, port=args.port)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from Route_Geometry.track_pyramid import TrackPyramid
+
+# Drawings are fitted into the same rect the desktop app uses
+DEFAULT_DRAWING_RECT = (760, 630)
+
+
+@dataclass
+class Session:
+    """One walker, their map centre & zoom, uploaded drawing & every position they've streamed."""
+    session_id: str
+    centre: dict[str, float]
+    zoom: float
+    width: int = DEFAULT_DRAWING_RECT[0]
+    height: int = DEFAULT_DRAWING_RECT[1]
+    drawing_path: str | None = None
+    # Every streamed position, also kept simplified per zoom so overlays only draw what shows
+    track: TrackPyramid = field(default_factory=TrackPyramid)
+    last_active: float = field(default_factory=time.monotonic)
+    # Open WebSockets streaming positions in & watching them, a session with any isn't pruned
+    walkers: set = field(default_factory=set)
+    watchers: set = field(default_factory=set)
+    # Overlay & score for the points they were made from, keyed by how many points there were
+    overlay: tuple[int, bytes] | None = None
+    score: tuple[int, float] | None = None
+
+    @property
+    def points(self) -> list[dict[str, float]]:
+        return self.track.points
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+    def summary(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "centre": self.centre,
+            "zoom": self.zoom,
+            "size": [self.width, self.height],
+            "drawing_uploaded": self.drawing_path is not None,
+            "points": len(self.points),
+            "last_position": self.points[-1] if self.points else None,
+            "similarity": self.score[1] if self.score and self.score[0] == len(self.points) else None,
+        }
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int) -> None:
+        self.max_sessions = max_sessions
+        self._sessions: dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
+
+    def create(self, centre: dict[str, float], zoom: float) -> Session:
+        if len(self._sessions) >= self.max_sessions:
+            raise OverflowError(f"The server already has its maximum of {self.max_sessions} sessions.")
+
+        session = Session(uuid.uuid4().hex, centre, zoom)
+        self._sessions[session.session_id] = session
+
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touch()
+
+        return session
+
+    def remove(self, session_id: str) -> Session | None:
+        return self._sessions.pop(session_id, None)
+
+    def prune(self, idle_seconds: float) -> int:
+        """Removes sessions nobody has used for idle_seconds & that have no open WebSockets, returning how many went."""
+        cutoff = time.monotonic() - idle_seconds
+        idle = [session_id for (session_id, session) in self._sessions.items() if session.last_active < cutoff and not (session.walkers or session.watchers)]
+        for session_id in idle:
+            del self._sessions[session_id]
+
+        return len(idle)
@@ -0,0 +1,25 @@
+"""CPU heavy work the server hands to its process pool, reusing the batch scorer's per-worker caches."""
+import cv2
+
+import batch_score
+from Route_Geometry.route_renderer import render_route
+
+
+def init_worker() -> None:
+    batch_score._init_worker()
+
+
+def drawing_size(drawing_path: str, rect: tuple[int, int]) -> tuple[int, int]:
+    """Size the drawing is shown at once fitted into rect, also warming this worker's cache of its spectrum."""
+    width, height, _ = batch_score._drawing_features(drawing_path, rect)
+
+    return width, height
+
+
+def render_overlay(points: list[dict[str, float]], centre: dict[str, float], zoom: float, width: int, height: int) -> bytes:
+    """PNG of the walked route drawn at the size & zoom of the walker's map."""
+    return cv2.imencode(".png", render_route(points, centre, zoom, width, height))[1].tobytes()
+
+
+def score(points: list[dict[str, float]], centre: dict[str, float], zoom: float, drawing_path: str, rect: tuple[int, int]) -> float:
+    return batch_score.score_route(centre, points, zoom, drawing_path, rect)
@@ -0,0 +1,111 @@
+import heapq
+import math
+from os import getenv
+
+from dotenv import load_dotenv
+
+from Route_Geometry.projection import pixel_to_metres
+from Street_Graph.street_graph import StreetGraph
+
+load_dotenv()
+
+ROUTE_DEVIATION_WEIGHT = float(getenv("ROUTE_DEVIATION_WEIGHT", "4"))
+if not 0 <= ROUTE_DEVIATION_WEIGHT <= 100:
+    raise ValueError(f"Environment variable ROUTE_DEVIATION_WEIGHT must be between 0 & 100.")
+
+# Deviation from the drawing is measured in multiples of this many metres when costing edges
+_DEVIATION_SCALE_METRES = 20
+
+
+def _distance_to_segment(point: tuple[float, float], start: tuple[float, float], end: tuple[float, float]) -> float:
+    direction_x, direction_y = end[0] - start[0], end[1] - start[1]
+    offset_x, offset_y = point[0] - start[0], point[1] - start[1]
+    length_squared = direction_x ** 2 + direction_y ** 2
+
+    projection = 0.0
+    if length_squared > 0:
+        projection = min(1.0, max(0.0, (offset_x * direction_x + offset_y * direction_y) / length_squared))
+
+    return math.hypot(offset_x - direction_x * projection, offset_y - direction_y * projection)
+
+
+def shortest_path(graph: StreetGraph, start: int, goal: int, target: tuple[tuple[float, float], tuple[float, float]] | None = None, deviation_weight: float = ROUTE_DEVIATION_WEIGHT) -> list[int]:
+    """A* from start to goal, returning the node sequence or [] when goal can't be reached.
+
+    With a target segment, each edge's length is inflated by how far its midpoint strays from the segment, so the path hugs the drawn stroke.
+    Edge costs never drop below their length, so straight line distance stays an admissible heuristic.
+    """
+    if start == goal:
+        return [start]
+
+    positions = graph.position_list
+    goal_position = positions[goal]
+
+    best_costs = {start: 0.0}
+    came_from: dict[int, int] = {}
+    queue = [(math.dist(positions[start], goal_position), 0.0, start)]
+    while queue:
+        _, cost, node = heapq.heappop(queue)
+        if node == goal:
+            path = [goal]
+            while path[-1] != start:
+                path.append(came_from[path[-1]])
+            return path[::-1]
+
+        if cost > best_costs[node]:
+            continue
+
+        node_position = positions[node]
+        for (neighbour, edge_cost) in graph.adjacency[node]:
+            if target is not None and deviation_weight:
+                neighbour_position = positions[neighbour]
+                midpoint = ((node_position[0] + neighbour_position[0]) / 2, (node_position[1] + neighbour_position[1]) / 2)
+                edge_cost *= 1 + deviation_weight * _distance_to_segment(midpoint, *target) / _DEVIATION_SCALE_METRES
+
+            new_cost = cost + edge_cost
+            if new_cost < best_costs.get(neighbour, math.inf):
+                best_costs[neighbour] = new_cost
+                came_from[neighbour] = node
+                heapq.heappush(queue, (new_cost + math.dist(positions[neighbour], goal_position), new_cost, neighbour))
+
+    return []
+
+
+def snap_polylines(graph: StreetGraph, polylines: list[list[tuple[float, float]]]) -> list[list[int]]:
+    """Nearest graph node to every vertex of each polyline (in local metres), with repeats collapsed."""
+    snapped_polylines = []
+    for polyline in polylines:
+        snapped = []
+        for point in polyline:
+            node = graph.nearest_node(point)
+            if node != -1 and (not snapped or snapped[-1] != node):
+                snapped.append(node)
+        if snapped:
+            snapped_polylines.append(snapped)
+
+    return snapped_polylines
+
+
+def suggest_route(graph: StreetGraph, polylines: list[list[tuple[float, float]]], zoom: int | float, width: int | float, height: int | float) -> list[list[dict[str, float]]]:
+    """A walkable route for each stroke of a drawing.
+
+    polylines are in pixels on the width x height drawing shown over the map at zoom, centred on the graph's centre.
+    Returns one list of lat/lon points per stroke.
+    """
+    metre_polylines = [[pixel_to_metres(point, graph.centre, zoom, width, height) for point in polyline] for polyline in polylines]
+
+    node_routes = []
+    for snapped in snap_polylines(graph, metre_polylines):
+        route = snapped[:1]
+        for (start, goal) in zip(snapped, snapped[1:]):
+            leg = shortest_path(graph, start, goal, (graph.position_list[start], graph.position_list[goal]))
+            if leg:
+                route.extend(leg[1:])
+            else:
+                # No streets join these, so the stroke is split here rather than drawn straight across the gap
+                node_routes.append(route)
+                route = [goal]
+
+        node_routes.append(route)
+
+    return [[graph.node_latlon(node) for node in route] for route in node_routes if len(route) >= 2]
@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import math
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Iterator
+from contextlib import closing
+from os import getenv
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from Route_Geometry.projection import latlon_to_metres, metres_to_latlon
+from Route_Geometry.spatial_index import SegmentIndex
+from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
+
+load_dotenv()
+
+# Optional, street snapping & route suggestion are turned off when no extract is provided
+_OSM_EXTRACT_FILE_NAME = getenv("OSM_EXTRACT_FILE_NAME")
+OSM_EXTRACT_FILE_PATH = Path(_OSM_EXTRACT_FILE_NAME) if _OSM_EXTRACT_FILE_NAME else None
+if OSM_EXTRACT_FILE_PATH is not None and OSM_EXTRACT_FILE_PATH.suffix not in (".osm", ".pbf"):
+    raise ValueError(f"Environment variable OSM_EXTRACT_FILE_NAME must point to a .osm or .osm.pbf file.")
+
+OSM_EXTRACT_RADIUS_METRES = float(getenv("OSM_EXTRACT_RADIUS_METRES", "3000"))
+if not 100 <= OSM_EXTRACT_RADIUS_METRES <= 50000:
+    raise ValueError(f"Environment variable OSM_EXTRACT_RADIUS_METRES must be between 100 & 50000.")
+
+STREET_GRAPHS_DIRECTORY = Path("Street_Graphs")
+
+# noinspection SpellCheckingInspection
+_UNWALKABLE_HIGHWAYS = frozenset(("motorway", "motorway_link", "trunk", "trunk_link", "construction", "proposed", "raceway", "bus_guideway", "abandoned", "platform"))
+_UNWALKABLE_ACCESS = frozenset(("no", "private"))
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+def _is_walkable(tags: dict[str, str]) -> bool:
+    return (
+            "highway" in tags and tags["highway"] not in _UNWALKABLE_HIGHWAYS and
+            tags.get("foot", tags.get("access")) not in _UNWALKABLE_ACCESS and tags.get("area") != "yes"
+    )
+
+
+def _iter_osm_elements(file_path: Path) -> Iterator[ElementTree.Element]:
+    # Each element once it's been read whole, the root is cleared after every top level element so the extract never builds up as a tree
+    with open(file_path, "rb") as file:
+        context = ElementTree.iterparse(file, events=("start", "end"))
+        _, root = next(context)
+        for (event, element) in context:
+            if event == "end":
+                yield element
+                if element.tag in ("node", "way", "relation"):
+                    root.clear()
+
+
+def _read_osm_xml(file_path: Path) -> tuple[dict[int, tuple[float, float]], list[list[int]]]:
+    ways: list[list[int]] = []
+
+    way_nodes: list[int] = []
+    way_tags: dict[str, str] = {}
+    for element in _iter_osm_elements(file_path):
+        if element.tag == "nd":
+            way_nodes.append(int(element.get("ref")))
+        elif element.tag == "tag":
+            way_tags[element.get("k")] = element.get("v")
+        elif element.tag == "way":
+            if _is_walkable(way_tags):
+                ways.append(way_nodes)
+            way_nodes, way_tags = [], {}
+        elif element.tag in ("node", "relation"):
+            way_nodes, way_tags = [], {}
+
+    # Read again for just the nodes walkable ways use, most of an extract's nodes are buildings, landuse & the like
+    referenced = {osm_id for way in ways for osm_id in way}
+    nodes: dict[int, tuple[float, float]] = {}
+    # Closed explicitly, breaking out early would otherwise leave the extract open until the generator is collected
+    with closing(_iter_osm_elements(file_path)) as elements:
+        for element in elements:
+            if element.tag == "node":
+                osm_id = int(element.get("id"))
+                if osm_id in referenced:
+                    nodes[osm_id] = (float(element.get("lat")), float(element.get("lon")))
+                    # Extracts list nodes before ways, so this usually skips reading the ways a second time
+                    if len(nodes) == len(referenced):
+                        break
+
+    return nodes, ways
+
+
+def _read_osm_pbf(file_path: Path) -> tuple[dict[int, tuple[float, float]], list[list[int]]]:
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Reading .osm.pbf extracts needs the osmium package (pip install osmium), or convert the extract to .osm.") from e
+
+    nodes: dict[int, tuple[float, float]] = {}
+    ways: list[list[int]] = []
+
+    class _WayHandler(osmium.SimpleHandler):
+        def way(self, way) -> None:
+            if _is_walkable({tag.k: tag.v for tag in way.tags}):
+                way_nodes = []
+                for node in way.nodes:
+                    if node.location.valid():
+                        nodes[node.ref] = (node.location.lat, node.location.lon)
+                        way_nodes.append(node.ref)
+                ways.append(way_nodes)
+
+    _WayHandler().apply_file(str(file_path), locations=True)
+
+    return nodes, ways
+
+
+class StreetGraph:
+    """Walkable street network in compressed sparse row form, with a spatial index over its edges.
+
+    Node positions are local metres around centre, see projection.latlon_to_metres.
+    Edges are undirected, each one appears in the adjacency of both of its nodes.
+    """
+
+    def __init__(self, centre: dict[str, float], positions: np.ndarray, edges: np.ndarray) -> None:
+        self.centre = centre
+        self.positions = positions
+        self.edges = edges
+
+        lengths = np.hypot(*(positions[edges[:, 1]] - positions[edges[:, 0]]).T)
+
+        sources = np.concatenate((edges[:, 0], edges[:, 1]))
+        order = np.argsort(sources, kind="stable")
+        self.indices = np.concatenate((edges[:, 1], edges[:, 0]))[order]
+        self.weights = np.concatenate((lengths, lengths))[order]
+        self.indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(positions)), out=self.indptr[1:])
+
+        # Plain list copies for the per node lookups in route searches, where numpy scalar indexing is slow
+        self.adjacency = [
+            list(zip(self.indices[start:end].tolist(), self.weights[start:end].tolist()))
+            for (start, end) in zip(self.indptr[:-1].tolist(), self.indptr[1:].tolist())
+        ]
+        self.position_list: list[tuple[float, float]] = list(map(tuple, positions.tolist()))
+
+        self.edge_index = SegmentIndex(zip(map(tuple, positions[edges[:, 0]].tolist()), map(tuple, positions[edges[:, 1]].tolist())))
+
+    @classmethod
+    def from_osm_file(cls, file_path: str | Path, centre: dict[str, float], radius: float = OSM_EXTRACT_RADIUS_METRES) -> "StreetGraph":
+        """Builds the walkable graph within radius metres of centre, cached in Street_Graphs/."""
+        file_path = Path(file_path)
+        file_stats = file_path.stat()
+        cache_key = hashlib.sha256(f"{file_path.resolve()},{file_stats.st_size},{file_stats.st_mtime_ns},{centre},{radius}".encode()).hexdigest()
+        cache_path = STREET_GRAPHS_DIRECTORY / f"{cache_key}.npz"
+
+        if cache_path.is_file():
+            logger.info("Cached street graph already exists")
+            with np.load(cache_path) as cached:
+                return cls(centre, cached["positions"], cached["edges"])
+
+        if file_path.suffix == ".pbf":
+            nodes, ways = _read_osm_pbf(file_path)
+        else:
+            nodes, ways = _read_osm_xml(file_path)
+
+        node_ids: dict[int, int] = {}
+        positions: list[tuple[float, float]] = []
+        edges: list[tuple[int, int]] = []
+        for way in ways:
+            previous = None
+            for osm_id in way:
+                if osm_id not in nodes:
+                    previous = None
+                    continue
+
+                if osm_id not in node_ids:
+                    latitude, longitude = nodes[osm_id]
+                    position = latlon_to_metres({"latitude": latitude, "longitude": longitude}, centre)
+                    if math.hypot(*position) > radius:
+                        previous = None
+                        continue
+                    node_ids[osm_id] = len(positions)
+                    positions.append(position)
+
+                current = node_ids[osm_id]
+                if previous is not None and previous != current:
+                    edges.append((previous, current))
+                previous = current
+
+        positions_array = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        edges_array = np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+        np.savez(cache_path, positions=positions_array, edges=edges_array)
+        logger.info(f"Street graph built with {len(positions)} nodes & {len(edges)} edges.")
+
+        return cls(centre, positions_array, edges_array)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def neighbours(self, node: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[node], self.indptr[node + 1]
+
+        return self.indices[start:end], self.weights[start:end]
+
+    def nearest_node(self, point: tuple[float, float]) -> int:
+        """The graph node closest to point along its nearest edge, -1 when the graph is empty."""
+        _, edge = self.edge_index.nearest(point)
+        if edge == -1:
+            return -1
+
+        start, end = self.edges[edge]
+        if math.dist(point, self.position_list[start]) <= math.dist(point, self.position_list[end]):
+            return int(start)
+
+        return int(end)
+
+    def node_latlon(self, node: int) -> dict[str, float]:
+        return metres_to_latlon(self.position_list[node], self.centre)
@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from Image_Comparisons.Image_Comparer import magnitude_spectrum
+from batch_score import score_pair, score_route
+
+_CENTRE = {"latitude": 52.95, "longitude": -1.18}
+_DRAWING = "Test_Images/Squiggle1.jpg"
+_RECT = (760, 630)
+
+
+class TestScoreRoute(unittest.TestCase):
+    def test_same_pair_scores_the_same(self) -> None:
+        # Different enough from the drawing that the score comes from the capped, randomised error
+        points = [{"latitude": 52.95 + i * 1e-4, "longitude": -1.18} for i in range(30)]
+
+        scores = {score_route(_CENTRE, points, 14, _DRAWING, _RECT) for _ in range(3)}
+
+        self.assertEqual(len(scores), 1)
+        self.assertTrue(np.isfinite(scores.pop()))
+
+    def test_blank_route_is_an_error(self) -> None:
+        far_away = [{"latitude": 10.0, "longitude": 10.0}, {"latitude": 10.1, "longitude": 10.0}]
+
+        with self.assertRaises(ValueError):
+            score_route(_CENTRE, far_away, 16, _DRAWING, _RECT)
+
+    def test_blank_spectrum_would_be_infinite(self) -> None:
+        # Why blank routes are rejected rather than scored
+        self.assertFalse(np.isfinite(magnitude_spectrum(np.full((8, 8), 255, dtype=np.uint8))).all())
+
+    def test_score_pair_reports_failures(self) -> None:
+        result = score_pair("missing_route.json", _DRAWING, _RECT, 16)
+
+        self.assertIn("error", result)
+        self.assertNotIn("similarity", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
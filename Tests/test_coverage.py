@@ -0,0 +1,77 @@
+import unittest
+
+from Route_Geometry.coverage import CoverageMap, _clip_segment
+
+
+class TestClipSegment(unittest.TestCase):
+    def assertSegmentAlmostEqual(self, first, second) -> None:
+        self.assertIsNotNone(first)
+        for (first_point, second_point) in zip(first, second):
+            for (a, b) in zip(first_point, second_point):
+                self.assertAlmostEqual(a, b)
+
+    def test_inside_is_unchanged(self) -> None:
+        self.assertEqual(_clip_segment((1, 2), (3, 4), (0, 0), (10, 10)), ((1, 2), (3, 4)))
+
+    def test_crossing_is_cut_at_the_edges(self) -> None:
+        self.assertSegmentAlmostEqual(_clip_segment((-5, 5), (15, 5), (0, 0), (10, 10)), ((0, 5), (10, 5)))
+        self.assertSegmentAlmostEqual(_clip_segment((5, 5), (5, 20), (0, 0), (10, 10)), ((5, 5), (5, 10)))
+        self.assertSegmentAlmostEqual(_clip_segment((-10, -10), (20, 20), (0, 0), (10, 10)), ((0, 0), (10, 10)))
+
+    def test_keeps_the_direction(self) -> None:
+        self.assertSegmentAlmostEqual(_clip_segment((15, 5), (-5, 5), (0, 0), (10, 10)), ((10, 5), (0, 5)))
+
+    def test_missing_the_box(self) -> None:
+        self.assertIsNone(_clip_segment((20, 0), (30, 10), (0, 0), (10, 10)))
+        # Passes the corner without going through the box
+        self.assertIsNone(_clip_segment((-5, 8), (8, -5), (5, 5), (10, 10)))
+        # Parallel to an edge & outside it
+        self.assertIsNone(_clip_segment((-1, 0), (-1, 10), (0, 0), (10, 10)))
+
+    def test_degenerate_segment(self) -> None:
+        self.assertEqual(_clip_segment((3, 3), (3, 3), (0, 0), (10, 10)), ((3, 3), (3, 3)))
+        self.assertIsNone(_clip_segment((11, 3), (11, 3), (0, 0), (10, 10)))
+
+
+class TestCoverageMap(unittest.TestCase):
+    def setUp(self) -> None:
+        # A horizontal stroke across the middle of a 100 x 100 drawing
+        self.coverage = CoverageMap([[(0.1, 0.5), (0.9, 0.5)]], 100, 100, tolerance=4)
+
+    def test_walking_the_stroke_covers_it(self) -> None:
+        self.assertGreater(self.coverage.stroke_cells, 0)
+        self.assertEqual(self.coverage.percent_covered, 0)
+
+        newly_covered = self.coverage.add_segment((0, 50), (100, 50))
+
+        self.assertEqual(newly_covered, self.coverage.stroke_cells)
+        self.assertEqual(self.coverage.percent_covered, 100)
+        # Nothing new the second time round
+        self.assertEqual(self.coverage.add_segment((0, 50), (100, 50)), 0)
+
+    def test_far_off_the_drawing_covers_nothing(self) -> None:
+        self.assertEqual(self.coverage.add_segment((-1e7, -1e7), (-1e7 + 5, -1e7)), 0)
+        self.assertEqual(self.coverage.add_segment((0, 10), (100, 10)), 0)
+        self.assertEqual(self.coverage.covered_cells, 0)
+
+    def test_clipping_matches_walking_the_part_on_the_drawing(self) -> None:
+        long_segment = CoverageMap([[(0.1, 0.5), (0.9, 0.5)]], 100, 100, tolerance=4)
+
+        covered = self.coverage.add_segment((30, 50), (60, 50))
+        covered_from_afar = long_segment.add_segment((-1e6, 50), (60, 50))
+
+        # The clipped segment covers the start of the stroke too, but nothing past the end it shares
+        self.assertGreater(covered_from_afar, covered)
+        self.assertEqual(long_segment.add_segment((30, 50), (60, 50)), 0)
+        self.assertEqual(self.coverage.add_segment((-1e6, 50), (60, 50)), covered_from_afar - covered)
+
+    def test_overlay_tracks_the_covered_cells(self) -> None:
+        self.coverage.add_segment((0, 50), (50, 50))
+
+        overlay_cells = self.coverage.overlay.reshape(-1, 4)
+        self.assertEqual(int((overlay_cells[:, 1] == 170).sum()), self.coverage.covered_cells)
+        self.assertEqual(int((overlay_cells[:, 3] == 255).sum()), self.coverage.stroke_cells)
+
+
+if __name__ == "__main__":
+    unittest.main()
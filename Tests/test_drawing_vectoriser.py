@@ -0,0 +1,68 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from Drawing_Vectorisation.drawing_vectoriser import _simplify_contours, _skeletonise, _trace_skeleton
+
+
+def _pixels(polyline: np.ndarray) -> list[tuple[int, int]]:
+    return [tuple(point) for point in polyline.reshape(-1, 2).tolist()]
+
+
+class TestTraceSkeleton(unittest.TestCase):
+    def test_traces_an_open_stroke_once(self) -> None:
+        image = np.zeros((60, 80), dtype=np.uint8)
+        cv2.line(image, (5, 5), (70, 40), 255, 1)
+
+        polylines = _trace_skeleton(image)
+
+        self.assertEqual(len(polylines), 1)
+        self.assertEqual(len(polylines[0]), int(np.count_nonzero(image)))
+        self.assertEqual({_pixels(polylines[0])[0], _pixels(polylines[0])[-1]}, {(5, 5), (70, 40)})
+
+    def test_traces_a_loop_round_to_where_it_started(self) -> None:
+        image = np.zeros((60, 60), dtype=np.uint8)
+        cv2.circle(image, (30, 30), 20, 255, 1)
+
+        polylines = _trace_skeleton(image)
+
+        self.assertEqual(len(polylines), 1)
+        self.assertEqual(_pixels(polylines[0])[0], _pixels(polylines[0])[-1])
+
+    def test_splits_strokes_at_junctions(self) -> None:
+        image = np.zeros((40, 40), dtype=np.uint8)
+        cv2.line(image, (5, 10), (35, 10), 255, 1)
+        cv2.line(image, (20, 11), (20, 35), 255, 1)
+
+        polylines = _trace_skeleton(image)
+        traced = [pixel for polyline in polylines for pixel in _pixels(polyline)]
+
+        self.assertEqual(len(polylines), 3)
+        # Every pixel is traced, the junction once by each stroke meeting there
+        self.assertEqual(set(traced), set(zip(*np.nonzero(image.T))))
+        self.assertEqual(len(traced), int(np.count_nonzero(image)) + 2)
+
+
+class TestSkeletonise(unittest.TestCase):
+    def test_thins_a_thick_stroke_to_one_connected_line(self) -> None:
+        image = np.zeros((60, 100), dtype=np.uint8)
+        cv2.line(image, (10, 30), (90, 30), 255, 7)
+
+        polylines = _trace_skeleton(_skeletonise(image))
+
+        self.assertEqual(len(polylines), 1)
+        self.assertGreater(cv2.arcLength(polylines[0], False), 70)
+
+
+class TestSimplifyContours(unittest.TestCase):
+    def test_drops_the_shortest_strokes_to_fit_max_vertices(self) -> None:
+        contours = [np.array([[[0, y]], [[length, y]]], dtype=np.int32) for (y, length) in enumerate((50, 10, 30, 20))]
+
+        simplified = _simplify_contours(contours, 4)
+
+        self.assertEqual([int(polyline[-1][0][0]) for polyline in simplified], [50, 30])
+
+
+if __name__ == "__main__":
+    unittest.main()
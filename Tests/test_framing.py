@@ -0,0 +1,31 @@
+import unittest
+
+from GPS_Data_Receivers.framing import MAX_PENDING_CHARACTERS, FrameBuffer
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def test_keeps_a_frame_cut_across_reads(self) -> None:
+        frame_buffer = FrameBuffer()
+
+        self.assertEqual(frame_buffer.feed("{'a': 1}%{'b'"), ["{'a': 1}"])
+        self.assertEqual(frame_buffer.feed(": 2}%"), ["{'b': 2}"])
+        self.assertEqual(frame_buffer.pending, "")
+
+    def test_skips_empty_frames(self) -> None:
+        self.assertEqual(FrameBuffer().feed("%{}%{'a': 1}%%"), ["{'a': 1}"])
+
+    def test_overflow_drops_the_pending_text(self) -> None:
+        frame_buffer = FrameBuffer()
+        junk = "x" * (MAX_PENDING_CHARACTERS // 2 + 1)
+
+        frame_buffer.feed(junk)
+        with self.assertRaises(ValueError):
+            frame_buffer.feed(junk)
+        self.assertEqual(frame_buffer.pending, "")
+
+        # The junk doesn't come out in front of the next fix
+        self.assertEqual(frame_buffer.feed("{'a': 1}%"), ["{'a': 1}"])
+
+
+if __name__ == "__main__":
+    unittest.main()
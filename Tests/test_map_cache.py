@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import unittest
+from pathlib import Path
+
+from Server.map_cache import MapCache
+
+
+class TestMapCache(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_for_the_same_map_share_one_fetch(self) -> None:
+        cache = MapCache()
+        release = threading.Event()
+        fetches = []
+
+        def fetch() -> Path:
+            fetches.append(1)
+            release.wait(5)
+            return Path("map.png")
+
+        waiting = [asyncio.create_task(cache._get(("map",), fetch)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(*waiting), [Path("map.png")] * 5)
+        self.assertEqual(len(fetches), 1)
+
+    async def test_failed_fetch_is_tried_again(self) -> None:
+        cache = MapCache()
+
+        def fail() -> Path:
+            raise OSError("Geoapify is down")
+
+        results = await asyncio.gather(*(cache._get(("map",), fail) for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, OSError) for result in results))
+        # Nothing's left behind for the failed map
+        self.assertEqual(cache._fetches, {})
+
+        self.assertEqual(await cache._get(("map",), lambda: Path("map.png")), Path("map.png"))
+
+    async def test_cancelled_request_leaves_the_fetch_running(self) -> None:
+        cache = MapCache()
+        release = threading.Event()
+
+        def fetch() -> Path:
+            release.wait(5)
+            return Path("map.png")
+
+        cancelled = asyncio.create_task(cache._get(("map",), fetch))
+        waiting = asyncio.create_task(cache._get(("map",), fetch))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        release.set()
+
+        self.assertEqual(await waiting, Path("map.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
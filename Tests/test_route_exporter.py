@@ -0,0 +1,56 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from Route_Export import route_exporter
+from Route_Export.route_exporter import iter_json_value
+
+DOCUMENT = {
+    "lat": 51.5,
+    "drawing_points": [[0.125, -3e-05], {"nested": ["]", ","]}, "escaped \" quote", 12345678, []],
+    "empty": [],
+    "user_points": [[51.500123456, -0.1200004], [51.5001, -0.12], [1e-07, 2.5E+3]],
+}
+
+
+def _file(text: str) -> io.StringIO:
+    file = io.StringIO(text)
+    file.name = "test.json"
+    return file
+
+
+class TestIterJsonValue(unittest.TestCase):
+    def test_every_chunk_boundary(self) -> None:
+        # A chunk size of 1 upwards puts a boundary inside every key, number & string in turn
+        for text in (json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent=4)):
+            for chunk_size in (1, 2, 3, 5, 7, 16, 1 << 16):
+                with self.subTest(chunk_size=chunk_size), patch.object(route_exporter, "_READ_CHUNK_SIZE", chunk_size):
+                    for (key, value) in DOCUMENT.items():
+                        expected = value if isinstance(value, list) else [value]
+                        self.assertEqual(list(iter_json_value(_file(text), key)), expected)
+
+    def test_number_cut_at_the_end_of_a_chunk(self) -> None:
+        # "12" would decode on its own, it mustn't be yielded before the rest of the number is read
+        with patch.object(route_exporter, "_READ_CHUNK_SIZE", 12):
+            self.assertEqual(list(iter_json_value(_file('{"points": [12345, 6]}'), "points")), [12345, 6])
+
+    def test_yields_lazily(self) -> None:
+        with patch.object(route_exporter, "_READ_CHUNK_SIZE", 4):
+            file = _file('{"points": [1, 2, 3, 4, 5, 6, 7, 8, 9]' + " " * 1000 + "}")
+            values = iter_json_value(file, "points")
+
+            self.assertEqual(next(values), 1)
+            self.assertLess(file.tell(), 30)
+
+    def test_missing_key(self) -> None:
+        with self.assertRaises(ValueError):
+            list(iter_json_value(_file('{"lat": 1}'), "points"))
+
+    def test_malformed_array(self) -> None:
+        with self.assertRaises(ValueError):
+            list(iter_json_value(_file('{"points": [1 2]}'), "points"))
+
+
+if __name__ == "__main__":
+    unittest.main()
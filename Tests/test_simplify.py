@@ -0,0 +1,67 @@
+import math
+import random
+import unittest
+
+from Route_Geometry.projection import latlon_to_metres, metres_to_latlon
+from Route_Geometry.simplify import simplify_stream
+
+_CENTRE = {"latitude": 52.953241, "longitude": -1.1873294}
+
+
+def _track(offsets: list[tuple[float, float]]) -> list[dict[str, float]]:
+    return [metres_to_latlon(offset, _CENTRE) for offset in offsets]
+
+
+def _distance_to_segment(point: tuple[float, float], start: tuple[float, float], end: tuple[float, float]) -> float:
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length_squared = dx * dx + dy * dy
+    t = 0.0 if not length_squared else max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length_squared))
+
+    return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+
+def _worst_error(track: list[dict[str, float]], tolerance_metres: float) -> float:
+    """Furthest any dropped point is from the simplified segment that replaced it."""
+    kept = list(simplify_stream(track, tolerance_metres))
+    indices = [next(index for index in range(len(track)) if track[index] is point) for point in kept]
+    metres = [latlon_to_metres(point, _CENTRE) for point in track]
+
+    return max(
+        (_distance_to_segment(metres[index], metres[start], metres[end]) for (start, end) in zip(indices, indices[1:]) for index in range(start, end + 1)),
+        default=0.0
+    )
+
+
+class TestSimplifyStream(unittest.TestCase):
+    def test_keeps_first_and_last_points(self) -> None:
+        track = _track([(0, 0), (10, 0.1), (20, 0), (30, 0.1)])
+        kept = list(simplify_stream(track, 1))
+
+        self.assertIs(kept[0], track[0])
+        self.assertIs(kept[-1], track[-1])
+        self.assertEqual(len(kept), 2)
+
+    def test_point_doubling_back_near_the_anchor_settles_the_line(self) -> None:
+        track = _track([(0, 0), (5, 0), (1, 0.5), (1, 10)])
+
+        self.assertLessEqual(_worst_error(track, 3), 3 * 1.001)
+
+    def test_dropped_points_stay_within_tolerance(self) -> None:
+        randomiser = random.Random(0)
+
+        for _ in range(200):
+            tolerance = randomiser.uniform(0.5, 10)
+            x = y = heading = 0.0
+            offsets = []
+            for _ in range(randomiser.randint(2, 300)):
+                heading += randomiser.gauss(0, 1)
+                step = randomiser.uniform(0, 3 * tolerance)
+                x, y = x + step * math.cos(heading), y + step * math.sin(heading)
+                offsets.append((x, y))
+
+            # A little slack for the projection being taken about each anchor rather than one centre
+            self.assertLessEqual(_worst_error(_track(offsets), tolerance), tolerance * 1.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import math
+import random
+import unittest
+
+from Route_Geometry.spatial_index import SegmentIndex
+
+
+class TestSegmentIndex(unittest.TestCase):
+    def test_nearest_measures_to_the_segment_not_its_ends(self) -> None:
+        index = SegmentIndex([((0, 0), (10, 0)), ((0, 5), (0, 15))])
+
+        distance, segment_id = index.nearest((5, 2))
+        self.assertAlmostEqual(distance, 2)
+        self.assertEqual(segment_id, 0)
+
+        distance, segment_id = index.nearest((-3, 10))
+        self.assertAlmostEqual(distance, 3)
+        self.assertEqual(segment_id, 1)
+
+    def test_empty_index(self) -> None:
+        index = SegmentIndex([])
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.nearest((1, 1)), (math.inf, -1))
+        self.assertEqual(index.query_radius((1, 1), 100), [])
+        self.assertFalse(index.within((1, 1), 100))
+
+    def test_from_polylines_joins_consecutive_points(self) -> None:
+        index = SegmentIndex.from_polylines([[(0, 0), (1, 0), (1, 1)], [(5, 5)], [(3, 3), (4, 4)]])
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.nearest((3.5, 3.5))[1], 2)
+
+    def test_zero_length_segment(self) -> None:
+        index = SegmentIndex([((2, 2), (2, 2))])
+
+        self.assertAlmostEqual(index.nearest((5, 6))[0], 5)
+        self.assertTrue(index.within((2, 3), 1))
+
+    def test_query_radius_includes_the_boundary(self) -> None:
+        index = SegmentIndex([((0, 0), (10, 0)), ((0, 3), (10, 3)), ((0, 10), (10, 10))], cell_size=1)
+
+        self.assertEqual(index.query_radius((5, 1), 2), [0, 1])
+        self.assertEqual(index.query_radius((5, 1), 0.5), [])
+        self.assertTrue(index.within((5, 1), 1))
+
+    def test_matches_brute_force(self) -> None:
+        randomiser = random.Random(0)
+        segments = [
+            ((randomiser.uniform(0, 100), randomiser.uniform(0, 100)), (randomiser.uniform(0, 100), randomiser.uniform(0, 100)))
+            for _ in range(200)
+        ]
+
+        for cell_size in (None, 0.5, 7, 500):
+            index = SegmentIndex(segments, cell_size)
+            # Points off the drawing too, where the search falls back on measuring everything
+            for _ in range(200):
+                point = (randomiser.uniform(-150, 250), randomiser.uniform(-150, 250))
+                radius = randomiser.uniform(0, 20)
+
+                self.assertAlmostEqual(index.nearest(point)[0], index._brute_force_nearest(point)[0])
+                self.assertEqual(
+                    index.query_radius(point, radius),
+                    [i for (i, distance) in enumerate(index._distances(point, range(len(index)))) if distance <= radius]
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from Core.task_graph import TaskGraph
+
+
+def _wait_until_done(graph: TaskGraph) -> dict[str, tuple[object, BaseException | None]]:
+    finished = {}
+    while not graph.done:
+        for (name, result, exception) in graph.poll():
+            finished[name] = (result, exception)
+    for (name, result, exception) in graph.poll():
+        finished[name] = (result, exception)
+
+    return finished
+
+
+class TestTaskGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_passes_results_to_dependants(self) -> None:
+        graph = TaskGraph(self.executor)
+        graph.add("a", lambda: 2)
+        graph.add("b", lambda: 3)
+        graph.add("sum", lambda a, b: a + b, "a", "b")
+        graph.start()
+
+        self.assertEqual(_wait_until_done(graph)["sum"], (5, None))
+
+    def test_failure_fails_everything_depending_on_it(self) -> None:
+        error = RuntimeError("no signal")
+
+        def fail() -> None:
+            raise error
+
+        graph = TaskGraph(self.executor)
+        graph.add("location", fail)
+        graph.add("saved", lambda location: location, "location")
+        graph.add("drawn", lambda saved: saved, "saved")
+        graph.add("independent", lambda: "fine")
+        graph.start()
+        finished = _wait_until_done(graph)
+
+        for name in ("location", "saved", "drawn"):
+            self.assertIs(finished[name][1], error)
+        self.assertEqual(finished["independent"], ("fine", None))
+
+    def test_running_is_only_tasks_in_flight(self) -> None:
+        release = threading.Event()
+        graph = TaskGraph(self.executor)
+        graph.add("first", lambda: None)
+        graph.add("slow_a", lambda first: release.wait(5), "first")
+        graph.add("slow_b", lambda first: release.wait(5), "first")
+        graph.add("last", lambda slow_a, slow_b: None, "slow_a", "slow_b")
+        graph.start()
+
+        while not graph.finished("first"):
+            graph.poll()
+        self.assertEqual(graph.running, {"slow_a", "slow_b"})
+
+        release.set()
+        _wait_until_done(graph)
+        self.assertEqual(graph.running, set())
+
+    def test_rejects_unknown_dependencies(self) -> None:
+        graph = TaskGraph(self.executor)
+
+        with self.assertRaises(ValueError):
+            graph.add("b", lambda a: a, "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import math
+import random
+import unittest
+
+from Route_Geometry.projection import metres_to_latlon
+from Route_Geometry.track_pyramid import MAX_ZOOM_LEVEL, TrackPyramid
+
+_CENTRE = {"latitude": 52.953241, "longitude": -1.1873294}
+
+
+def _walk(count: int, seed: int = 0) -> list[dict[str, float]]:
+    randomiser = random.Random(seed)
+    x = y = heading = 0.0
+    points = []
+    for _ in range(count):
+        heading += randomiser.gauss(0, 0.5)
+        x, y = x + 5 * math.cos(heading), y + 5 * math.sin(heading)
+        points.append(metres_to_latlon((x, y), _CENTRE))
+
+    return points
+
+
+class TestTrackPyramid(unittest.TestCase):
+    def test_coarser_zooms_draw_fewer_points(self) -> None:
+        pyramid = TrackPyramid(_walk(2000))
+
+        counts = [len(pyramid.points_for_zoom(zoom)) for zoom in (10, 14, 18)]
+
+        self.assertLess(counts[0], counts[1])
+        self.assertLess(counts[1], counts[2])
+        self.assertLessEqual(counts[2], len(pyramid))
+
+    def test_always_ends_with_the_newest_point(self) -> None:
+        points = _walk(300)
+        pyramid = TrackPyramid()
+
+        for point in points:
+            pyramid.add(point)
+            for zoom in (5, 15):
+                drawn = pyramid.points_for_zoom(zoom)
+                self.assertIs(drawn[0], points[0])
+                self.assertIs(drawn[-1], point)
+
+    def test_draws_every_point_beyond_the_most_detailed_level(self) -> None:
+        points = _walk(100)
+
+        self.assertEqual(TrackPyramid(points).points_for_zoom(MAX_ZOOM_LEVEL + 0.5), points)
+
+    def test_digest_identifies_the_points(self) -> None:
+        points = _walk(50)
+
+        self.assertEqual(TrackPyramid(points).digest, TrackPyramid(points).digest)
+        self.assertNotEqual(TrackPyramid(points).digest, TrackPyramid(points[:-1]).digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from Core.routes import WalkedPointsWriter
+
+
+class TestWalkedPointsWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = Path(directory.name) / "lat_long.json"
+
+    def _write(self, lat_long: dict) -> None:
+        with open(self.file_path, "w") as file:
+            json.dump(lat_long, file)
+
+    def _read(self) -> dict:
+        with open(self.file_path, "r") as file:
+            return json.load(file)
+
+    def test_appends_points_in_order(self) -> None:
+        self._write({"drawing_points": [], "desired_map_original_centre": {"latitude": 1, "longitude": 2}, "zoom": 16})
+        writer = WalkedPointsWriter(self.file_path)
+        points = [{"latitude": i, "longitude": -i} for i in range(5)]
+
+        for point in points:
+            writer.append(point)
+
+        self.assertEqual(self._read(), {"desired_map_original_centre": {"latitude": 1, "longitude": 2}, "zoom": 16, "drawing_points": points})
+
+    def test_never_splices_into_another_list(self) -> None:
+        writer = WalkedPointsWriter(self.file_path)
+        self._write({"drawing_points": []})
+        writer.append({"latitude": 0, "longitude": 0})
+
+        # Rewritten by someone else with a different list last, which ends the file the same way
+        self._write({"drawing_points": [{"latitude": 0, "longitude": 0}], "other": [1, 2, 3]})
+        os.utime(self.file_path, ns=(1, 1))
+        writer.append({"latitude": 1, "longitude": 1})
+        writer.append({"latitude": 2, "longitude": 2})
+
+        lat_long = self._read()
+        self.assertEqual(lat_long["other"], [1, 2, 3])
+        self.assertEqual([point["latitude"] for point in lat_long["drawing_points"]], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
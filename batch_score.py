@@ -0,0 +1,191 @@
+"""Scores every recorded route against every drawing without the pygame UI.
+
+Route files use the lat_long.json layout, a desired_map_original_centre & a list of drawing_points, with an optional zoom.
+Results are streamed to a .csv or .jsonl file as each pair finishes.
+
+Example:
+    python batch_score.py --routes "Recorded_Walks/*.json" --drawings "Test_Images/*.jpg" --output scores.csv
+"""
+import argparse
+import csv
+import glob
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from itertools import product
+from json import dumps as convert_dict_to_json_string, load as load_json_file
+from pathlib import Path
+
+import cv2
+
+from Drawing_Import.drawing_importer import fit_to_rect
+from Image_Comparisons.Image_Comparer import magnitude_spectrum, spectrum_similarity
+from Route_Geometry.route_renderer import render_route
+from settings import LOG_LEVEL, ACCEPTABLE_LOG_LEVELS
+
+_OUTPUT_FIELDS = ("route", "drawing", "zoom", "similarity", "seconds", "error")
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+if LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[0]:
+    logger.setLevel(logging.DEBUG)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[1]:
+    logger.setLevel(logging.INFO)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[2]:
+    logger.setLevel(logging.WARNING)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
+    logger.setLevel(logging.ERROR)
+elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
+    logger.setLevel(logging.CRITICAL)
+
+
+# Caches live per worker process, so each worker decodes a drawing or route file at most once however many pairs it scores
+@lru_cache(maxsize=64)
+def _drawing_features(drawing_path: str, rect: tuple[int, int]):
+    image = cv2.imread(drawing_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Drawing at {drawing_path} could not be read as an image.")
+
+    width, height = fit_to_rect((image.shape[1], image.shape[0]), rect)
+    image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+    return width, height, magnitude_spectrum(image)
+
+
+@lru_cache(maxsize=256)
+def _route(route_path: str) -> tuple[dict[str, float], list[dict[str, float]], float | None]:
+    with open(route_path, "r") as file:
+        route = load_json_file(file)
+
+    return route["desired_map_original_centre"], route["drawing_points"], route.get("zoom")
+
+
+def _init_worker() -> None:
+    # Parallelism comes from the pool, OpenCV's own thread pool in every worker would just fight over the same cores
+    cv2.setNumThreads(1)
+
+
+def score_route(centre: dict[str, float], points: list[dict[str, float]], zoom: float, drawing_path: str, rect: tuple[int, int]) -> float:
+    """Similarity of the walked points to the drawing fitted into rect, the same score the desktop app shows."""
+    width, height, drawing_spectrum = _drawing_features(drawing_path, rect)
+
+    route_image = render_route(points, centre, zoom, width, height)
+    # A blank image's spectrum is all log(0), which would score as nan
+    if route_image.min() == route_image.max():
+        raise ValueError("Route doesn't cross the drawing, so there's nothing to score.")
+
+    # Seeded afresh for every score, so the same route & drawing always score the same
+    similarity = spectrum_similarity(magnitude_spectrum(route_image), drawing_spectrum, random.Random(0))
+
+    return round(float(similarity), 4)
+
+
+def score_pair(route_path: str, drawing_path: str, rect: tuple[int, int], default_zoom: float) -> dict:
+    start = time.perf_counter()
+    result = {"route": route_path, "drawing": drawing_path}
+
+    try:
+        centre, points, zoom = _route(route_path)
+        zoom = zoom or default_zoom
+
+        result["zoom"] = zoom
+        result["similarity"] = score_route(centre, points, zoom, drawing_path, rect)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - start, 6)
+
+    return result
+
+
+def _expand_globs(patterns: list[str]) -> list[str]:
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)})
+    if not paths:
+        raise ValueError(f"No files matched {repr(patterns)}.")
+
+    return paths
+
+
+def _parse_rect(value: str) -> tuple[int, int]:
+    try:
+        width, height = map(int, value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Size must look like 760x630.")
+
+    if not (50 < width <= 10000 and 50 < height <= 10000):
+        raise argparse.ArgumentTypeError("Size width & height must be between 50 & 10000.")
+
+    return width, height
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Score recorded routes against drawings on a process pool.")
+    parser.add_argument("--routes", nargs="+", required=True, help="Globs of route JSON files.")
+    parser.add_argument("--drawings", nargs="+", required=True, help="Globs of drawing images.")
+    parser.add_argument("--output", type=Path, required=True, help="Results file, .csv or .jsonl.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count).")
+    parser.add_argument("--zoom", type=float, default=15, help="Zoom for route files that don't record one.")
+    parser.add_argument("--size", type=_parse_rect, default=(760, 630), help="Rect drawings are fitted into, as WIDTHxHEIGHT.")
+    args = parser.parse_args(argv)
+
+    if args.output.suffix not in (".csv", ".jsonl"):
+        parser.error("--output must end in .csv or .jsonl.")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if not 1 <= args.zoom <= 20:
+        parser.error("--zoom must be between 1 & 20.")
+
+    route_paths = _expand_globs(args.routes)
+    drawing_paths = _expand_globs(args.drawings)
+    total = len(route_paths) * len(drawing_paths)
+    logger.info(f"Scoring {len(route_paths)} routes against {len(drawing_paths)} drawings on {args.workers} workers.")
+
+    # Drawing major order so neighbouring tasks, which tend to land on the same worker, share a cached drawing
+    pairs = ((route_path, drawing_path) for (drawing_path, route_path) in product(drawing_paths, route_paths))
+    # Only a few tasks per worker are queued at once so huge corpora don't build millions of futures up front
+    max_in_flight = 4 * args.workers
+
+    start = time.perf_counter()
+    completed = failed = 0
+    with open(args.output, "w", newline="") as file, ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        csv_writer = None
+        if args.output.suffix == ".csv":
+            csv_writer = csv.DictWriter(file, fieldnames=_OUTPUT_FIELDS)
+            csv_writer.writeheader()
+
+        in_flight = set()
+        while True:
+            for (route_path, drawing_path) in pairs:
+                in_flight.add(executor.submit(score_pair, route_path, drawing_path, args.size, args.zoom))
+                if len(in_flight) >= max_in_flight:
+                    break
+
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if csv_writer is not None:
+                    csv_writer.writerow(result)
+                else:
+                    file.write(convert_dict_to_json_string(result) + "\n")
+
+                completed += 1
+                failed += "error" in result
+            file.flush()
+
+            logger.debug(f"{completed}/{total} pairs scored")
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {completed} pairs ({failed} failed) in {elapsed:.2f}s, {completed / elapsed:.1f} pairs/s.", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
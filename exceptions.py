@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Collection
+from typing import Collection, TYPE_CHECKING
 
-from requests import Response
+if TYPE_CHECKING:
+    from requests import Response
 
 class EndOfFileError(Exception):
     DEFAULT_MESSAGE = "Cannot read next line because end of file has been reached."
@@ -24,7 +25,7 @@ class EndOfFileError(Exception):
 class FailedRequestError(Exception):
     DEFAULT_MESSAGE = "External HTTP request failed."
 
-    def __init__(self, message: str = None, response: Response = None) -> None:
+    def __init__(self, message: str = None, response: "Response" = None) -> None:
         self.message: str = message or self.DEFAULT_MESSAGE
         self.response = response
 
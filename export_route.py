@@ -0,0 +1,74 @@
+"""Exports a recorded route to GPX, GeoJSON or SVG without the pygame UI, to share to Strava or Komoot or to archive.
+
+Route files use the lat_long.json layout, a desired_map_original_centre & a list of drawing_points, with an optional zoom.
+Points are streamed from the route file to each export, so routes of any length are exported in constant memory.
+
+Example:
+    python export_route.py lat_long.json walk.gpx walk.geojson walk.svg --simplify 5 --drawing Test_Images/Squiggle1.jpg
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from Drawing_Import.drawing_importer import DRAWING_RECT, import_drawing
+from Drawing_Vectorisation.drawing_vectoriser import vectorise_drawing
+from Route_Export.route_exporter import EXPORT_FILE_EXTENSIONS, EXPORT_SIMPLIFY_TOLERANCE_METRES, export_route
+
+
+def _parse_rect(value: str) -> tuple[int, int]:
+    try:
+        width, height = map(int, value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Size must look like 760x630.")
+
+    if not (50 < width <= 10000 and 50 < height <= 10000):
+        raise argparse.ArgumentTypeError("Size width & height must be between 50 & 10000.")
+
+    return width, height
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export a recorded route to GPX, GeoJSON or SVG.")
+    parser.add_argument("route", type=Path, help="Route JSON file, like lat_long.json.")
+    parser.add_argument("outputs", type=Path, nargs="+", help=f"Files to export to, each one of {', '.join(EXPORT_FILE_EXTENSIONS)}.")
+    parser.add_argument(
+        "--simplify", type=float, default=EXPORT_SIMPLIFY_TOLERANCE_METRES,
+        help="Drop points that stay within this many metres of the simplified line, 0 keeps every point (default: EXPORT_SIMPLIFY_TOLERANCE_METRES)."
+    )
+    parser.add_argument("--zoom", type=float, help="Zoom the SVG is drawn at, for route files that don't record one.")
+    parser.add_argument("--size", type=_parse_rect, default=DRAWING_RECT, help="Rect the SVG, & any drawing in it, is fitted into, as WIDTHxHEIGHT.")
+    parser.add_argument("--drawing", type=Path, help="Drawing to show the walk over in SVGs.")
+    args = parser.parse_args(argv)
+
+    for output in args.outputs:
+        if output.suffix not in EXPORT_FILE_EXTENSIONS:
+            parser.error(f"Outputs must end in one of {', '.join(EXPORT_FILE_EXTENSIONS)}.")
+    if not 0 <= args.simplify <= 1000:
+        parser.error("--simplify must be between 0 & 1000.")
+    if args.zoom is not None and not 1 <= args.zoom <= 20:
+        parser.error("--zoom must be between 1 & 20.")
+
+    size = args.size
+    drawing_polylines = None
+    if args.drawing is not None:
+        # The walk is drawn at the size the drawing is shown at, like in the app
+        drawing_path = import_drawing(args.drawing, args.size)
+        with Image.open(drawing_path) as drawing:
+            size = drawing.size
+        drawing_polylines = vectorise_drawing(drawing_path)
+
+    failed = 0
+    for output in args.outputs:
+        try:
+            export_route(args.route, output, args.zoom, size, drawing_polylines, args.simplify)
+        except (OSError, ValueError) as e:
+            print(f"Couldn't export {output}: {e}", file=sys.stderr)
+            failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,61 @@
 import logging
-import os.path
-import shutil
 import sys
-from json import load as load_json_file, loads as convert_json_string_to_dict, dump as dump_to_json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from json import load as load_json_file, dump as dump_to_json
 from os import getenv
 from pathlib import Path
 
-import math
 import pygame
-import requests
 from dotenv import load_dotenv
 
-from Frontend.frontend import Button, Image, TextBox, Paragraph, Screen, getFile
-from exceptions import FailedRequestError
-from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL
-from Image_Comparisons.Image_Comparer import image_similarity
+from Core.gps import extract_current_location, get_raw_location_data
+from Core.lazy_imports import lazy_import
+from Core.maps import get_desired_background_map_image, get_walking_background_map_image
+from Core.metrics import overlay_lines, record, span
+from Core.profiling import StateProfiler
+from Core.routes import (
+    add_walked_segment, get_coverage_surface, get_drawing_coverage_map, get_drawing_segment_index, get_suggested_route_image_path,
+    get_walking_drawing_image_path, WalkedPointsWriter
+)
+from Core.task_graph import TaskGraph
+from Frontend.frontend import Button, Image, Overlay, TextBox, Paragraph, Screen, SurfaceImage, Widget, getFile, renderWidgets
+from Route_Geometry.projection import latlon_to_metres
+from Route_Geometry.track_pyramid import TrackPyramid
+from settings import ACCEPTABLE_LOG_LEVELS, LOG_LEVEL, METRICS_ENABLED, PROFILING_ENABLED
+
+# Heavy, only needed once a drawing is imported, so they're kept out of startup
+drawing_importer = lazy_import("Drawing_Import.drawing_importer")
+drawing_vectoriser = lazy_import("Drawing_Vectorisation.drawing_vectoriser")
+Image_Comparer = lazy_import("Image_Comparisons.Image_Comparer")
+route_exporter = lazy_import("Route_Export.route_exporter")
+route_planner = lazy_import("Street_Graph.route_planner")
+street_graph = lazy_import("Street_Graph.street_graph")
 
 load_dotenv()
 
-# noinspection SpellCheckingInspection
-_ALLOWED_OSM_MAP_STYLES = ("osm-carto", "osm-bright", "osm-bright-grey", "osm-bright-smooth", "klokantech-basic", "osm-liberty", "maptiler-3d", "toner", "toner-grey", "positron")
-OSM_MAP_STYLE = getenv("OSM_MAP_STYLE", "osm-carto")
-if OSM_MAP_STYLE not in _ALLOWED_OSM_MAP_STYLES:
-    raise ValueError(f"Environment variable OSM_MAP_STYLE must be one of {repr(_ALLOWED_OSM_MAP_STYLES)}")
-
-_ALLOWED_MAP_IMAGE_FILE_EXTENSIONS = (".jpg", ".png", ".bmp", ".jpeg")
-MAP_IMAGE_FILE_EXTENSION = getenv("MAP_IMAGE_FILE_EXTENSION", ".jpg").lower()
-if MAP_IMAGE_FILE_EXTENSION not in _ALLOWED_MAP_IMAGE_FILE_EXTENSIONS:
-    raise ValueError(f"Environment variable MAP_IMAGE_FILE_EXTENSION must be one of {repr(_ALLOWED_MAP_IMAGE_FILE_EXTENSIONS)}")
-
-# noinspection SpellCheckingInspection
-GEOAPIFY_API_KEY = getenv("GEOAPIFY_API_KEY")
-if not GEOAPIFY_API_KEY:
-    # noinspection SpellCheckingInspection
-    raise ValueError(f"Environment variable GEOAPIFY_API_KEY must be provided.")
-
-_ALLOWED_RECEIVER_FUNCS = ("file", "socket")
-RECEIVER_FUNC = getenv("RECEIVER_FUNC", "file")
-if RECEIVER_FUNC not in _ALLOWED_RECEIVER_FUNCS:
-    raise ValueError(f"Environment variable RECEIVER_FUNC must be one of {repr(_ALLOWED_RECEIVER_FUNCS)}")
-
-if RECEIVER_FUNC == _ALLOWED_RECEIVER_FUNCS[0]:
-    from GPS_Data_Receivers.file_receiver import get_raw_location_data
-elif RECEIVER_FUNC == _ALLOWED_RECEIVER_FUNCS[1]:
-    from GPS_Data_Receivers.socket_receiver import get_raw_location_data
+ON_DRAWING_TOLERANCE_METRES = float(getenv("ON_DRAWING_TOLERANCE_METRES", "25"))
+if not 1 <= ON_DRAWING_TOLERANCE_METRES <= 1000:
+    raise ValueError(f"Environment variable ON_DRAWING_TOLERANCE_METRES must be between 1 & 1000.")
+
+MAX_FPS = int(getenv("MAX_FPS", "30"))
+if not 1 <= MAX_FPS <= 240:
+    raise ValueError(f"Environment variable MAX_FPS must be between 1 & 240.")
+
+# How long the UI sleeps waiting for input before checking in anyway
+_EVENT_WAIT_TIMEOUT_MS = 500
+# How long the window size has to stay still before the layout & images are rescaled to it
+_RESIZE_DEBOUNCE_MS = 150
+
+# The map download runs alongside saving, drawing & scoring the route, which each wait on the one before
+_FINISH_ROUTE_WORKERS = 2
+_FINISH_ROUTE_STEP_DESCRIPTIONS = {
+    "location": "Getting your last location",
+    "walk_saved": "Saving your walk",
+    "walking_map": "Updating the map",
+    "route_drawing": "Drawing your route",
+    "comparison": "Comparing your route to your drawing",
+}
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -58,152 +70,31 @@ elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[3]:
 elif LOG_LEVEL == ACCEPTABLE_LOG_LEVELS[4]:
     logger.setLevel(logging.CRITICAL)
 
-pygame.init()
-pygame.display.set_caption("RouteArt")
-pygame.display.set_icon(pygame.image.load("Frontend\\Window_Icon.png"))
+# Only made when PROFILE is on, then every state gets its own CPU & memory profile
+state_profiler = StateProfiler() if PROFILING_ENABLED else None
 
 
-def extract_current_location(raw_gps_string: str) -> dict[str, float]:
-    raw_gps_data: dict = convert_json_string_to_dict(raw_gps_string.replace("'", "\""))
+def change_state(new_state: str) -> str:
+    logger.debug(f"changing state to {new_state}")
 
-    logger.debug("Raw GPS data successfully extracted from JSON.")
+    if state_profiler is not None:
+        state_profiler.start(new_state)
 
-    return {
-        "latitude": raw_gps_data["network"]["latitude"],
-        "longitude": raw_gps_data["network"]["longitude"]
-    }
-
-
-def get_desired_background_map_image(width: int | float, height: int | float, zoom: int | float, latlon: dict[str, float] = None) -> Path:
-    if isinstance(width, (int, float)):
-        if not 50 < width <= 10000:
-            raise ValueError("Parameter width must be between 50 & 10000.")
-    else:
-        raise TypeError("Parameter width must be an integer or a float.")
-
-    if isinstance(height, (int, float)):
-        if not 50 < height <= 10000:
-            raise ValueError("Parameter height must be between 50 & 10000.")
-    else:
-        raise TypeError("Parameter height must be an integer or a float.")
-
-    if isinstance(zoom, (int, float)):
-        if not 1 <= zoom <= 20:
-            raise ValueError("Parameter zoom must be between 1 & 20.")
-    else:
-        raise TypeError("Parameter zoom must be an integer or a float.")
-    if not latlon:
-        map_centre = extract_current_location(raw_gps_string=get_raw_location_data())
-    else:
-        map_centre = latlon
-
-    file_path = Path(f"""Desired_Background_Map_Images/{(str(abs(hash(f"{OSM_MAP_STYLE},{width},{height},{map_centre},{zoom},{GEOAPIFY_API_KEY}"))) + MAP_IMAGE_FILE_EXTENSION)}""")
-    logger.debug(f"{OSM_MAP_STYLE},{width},{height},{map_centre},{zoom},{GEOAPIFY_API_KEY}")
-    if not os.path.isfile(file_path):
-        map_image_response = requests.get(
-            f"""https://maps.geoapify.com/v1/staticmap?style={OSM_MAP_STYLE}&width={width}&height={height}&center=lonlat:{map_centre["longitude"]},{map_centre["latitude"]}&zoom={zoom}&apiKey={GEOAPIFY_API_KEY}""",
-            stream=True
-        )
-
-        if map_image_response.status_code == 200:
-            with open(file_path, "wb") as file:
-                shutil.copyfileobj(map_image_response.raw, file)
-            logger.info("Desired map image background successfully downloaded.")
-        else:
-            raise FailedRequestError(response=map_image_response)
-    else:
-        logger.info("Cached image already exists")
-
-    return file_path
-
-
-def get_walking_background_map_image(width: int | float, height: int | float, zoom: int | float, marker_latlon: dict[str, float] = None) -> Path:
-    if isinstance(width, (int, float)):
-        if not 50 < width <= 10000:
-            raise ValueError("Parameter width must be between 50 & 10000.")
-    else:
-        raise TypeError("Parameter width must be an integer or a float.")
-
-    if isinstance(height, (int, float)):
-        if not 50 < height <= 10000:
-            raise ValueError("Parameter height must be between 50 & 10000.")
-    else:
-        raise TypeError("Parameter height must be an integer or a float.")
-
-    if isinstance(zoom, (int, float)):
-        if not 1 <= zoom <= 20:
-            raise ValueError("Parameter zoom must be between 1 & 20.")
-    else:
-        raise TypeError("Parameter zoom must be an integer or a float.")
-
-    with open(Path("lat_long.json"), "r") as file:
-        desired_map_original_centre: dict[str, float] = load_json_file(file)["desired_map_original_centre"]
-    if not marker_latlon:
-        current_location = extract_current_location(raw_gps_string=get_raw_location_data())
-    else:
-        current_location = marker_latlon
-
-    file_path = Path(f"""Walking_Background_Map_Images/{(str(abs(hash(f"{OSM_MAP_STYLE},{width},{height},{desired_map_original_centre},{zoom},{current_location},{GEOAPIFY_API_KEY}"))) + MAP_IMAGE_FILE_EXTENSION)}""")
-    if not os.path.isfile(file_path):
-        # noinspection SpellCheckingInspection
-        map_image_response = requests.get(
-            f"""https://maps.geoapify.com/v1/staticmap?style={OSM_MAP_STYLE}&width={width}&height={height}&center=lonlat:{desired_map_original_centre["longitude"]},{desired_map_original_centre["latitude"]}&zoom={zoom}&marker=lonlat:{current_location["longitude"]},{current_location["latitude"]};type:awesome;color:red;icon:user;iconsize:large;whitecircle:no&apiKey={GEOAPIFY_API_KEY}""",
-            stream=True
-        )
-
-        if map_image_response.status_code == 200:
-            with open(file_path, "wb") as file:
-                shutil.copyfileobj(map_image_response.raw, file)
-            logger.info("Walking map image background successfully downloaded.")
-        else:
-            raise FailedRequestError(response=map_image_response)
-
-    return file_path
+    return new_state
 
 
-def get_walking_drawing_image_path(width: int | float, height: int | float, zoom: int | float, thickness: int = 3) -> Path:
-    with open("lat_long.json", 'r') as f:
-        info = convert_json_string_to_dict(f.read())
-
-    centre = info["desired_map_original_centre"]
-
-    surf = pygame.Surface((width, height), pygame.SRCALPHA, 32)
-
-    surf.fill((255, 255, 255, 0))
-
-    X_CONST = 6_378_137
-    Y_CONST = 111139
-
-    points = []
-    for point in info['drawing_points']:
-        longitude = point['longitude']
-        latitude = point['latitude']
-        dif_x = longitude - centre['longitude']  # Find x_dif to centre point
-        dif_y = latitude - centre['latitude']  # Find y_dif to centre point
-
-        dif_x_m = dif_x * X_CONST * math.pi / 180 * math.cos(latitude * math.pi / 180)
-        dif_y_m = dif_y * Y_CONST
-
-        OSM_pixel = math.pi * 6_378_137 * math.cos(math.radians(latitude)) / (2 ** (zoom + 8))
-
-        x = dif_x_m / OSM_pixel
-        y = dif_y_m / OSM_pixel
-
-        x = int(x) + width / 2
-        y = height / 2 - int(y)
-
-        points.append((x, y))
-
-    for (p1, p2) in zip(points, points[1:]):
-        pygame.draw.line(surf, (0, 0, 0), p1, p2, thickness)
-
-    file_name = str(abs(hash(f"{width},{height},{centre},{zoom},{info['drawing_points']}")))
-    pygame.image.save(surf, f"Route_GPS_Drawings\\{file_name}.png")
-
-    return Path(f"Route_GPS_Drawings\\{file_name}.png")
+def save_walked_location(location: dict[str, float], walked_track: TrackPyramid, walked_points_writer: WalkedPointsWriter) -> None:
+    walked_track.add(location)
+    walked_points_writer.append(location)
 
 
 def main():
+    pygame.init()
+    # Posted from the finish route workers, so the otherwise idle event loop wakes up to show each result
+    finish_route_step_done_event = pygame.event.custom_type()
+    pygame.display.set_caption("RouteArt")
+    pygame.display.set_icon(pygame.image.load("Frontend\\Window_Icon.png"))
+
     WINDOW = Screen(1200, 800)
     screen = pygame.display.set_mode(WINDOW.size, pygame.RESIZABLE)
 
@@ -215,7 +106,7 @@ def main():
     mini_logo = Image(WINDOW, "Frontend\\Logo.png", pos=(0, 0), size=0.18)
 
     # Desired map (on left)
-    desired_map_image = Image(WINDOW, pos=(3, 2))
+    desired_map_image = Image(WINDOW, pos=(3, 2), raw_cache=True)
 
     # Zoom in and out w/ Labels
     course_zoom_in_button = Button(WINDOW, "+", pos=(5, 5), size=(20, 20), auto_size=False)
@@ -228,9 +119,11 @@ def main():
     get_new_desired_map_centre_button = Button(WINDOW, "Centre map to current location", pos=(1, 5))
     confirm_desired_map_centre_button = Button(WINDOW, "Confirm map centre", pos=(1, 6))
     drawing = Image(WINDOW)
+    suggested_route_image = Image(WINDOW, pos=(3, 2))
     walk_to_start_title = Paragraph(WINDOW, "Walk to any point on your drawing to start your journey\nOnly press the button below when you are on your drawing!", font_size=28, pos=(3, 4))
 
     # Right hand map with pointers
+    # Not raw cached, a new map is made for every fix, so its raw pixels would only pile up unread
     location_marker_map_image = Image(WINDOW, pos=(5, 3))
     start_walking_button = Button(WINDOW, "I am ready to start my route", pos=(3, 6))
 
@@ -239,50 +132,138 @@ def main():
 
     add_new_walking_point_button = Button(WINDOW, "Add new route drawing point", pos=(3, 6))
     finish_walking_button = Button(WINDOW, "Finish route", pos=(3, 7))
+    off_course_label = TextBox(WINDOW, "", pos=(5, 7))
+
+    # Strokes of the drawing already walked in green & still to walk in red, over the drawing
+    coverage_image = SurfaceImage(WINDOW, pos=(1, 3), alpha=0.8)
+    coverage_label = TextBox(WINDOW, "", pos=(1, 7))
     comparison_percentage = TextBox(WINDOW, "", font_size=28, pos=(3, 6))
+    export_walk_button = Button(WINDOW, "Export walk", pos=(5, 6))
+    export_walk_label = TextBox(WINDOW, "", pos=(5, 7))
+    finish_route_progress_label = TextBox(WINDOW, "", pos=(5, 5))
 
-    state = "import_drawing"
+    # FPS & stage timings, toggled with F3
+    metrics_overlay = Overlay()
+    show_metrics_overlay = False
+
+    state = change_state("import_drawing")
     desired_map_zoom = 4
     desired_map_cache_still_deciding_centre = {}
-
-    with open(Path("lat_long.json"), "r") as file:
+    drawing_polylines: list[list[tuple[float, float]]] = []
+    drawing_index = None
+    coverage_map = None
+    last_walked_location: dict[str, float] | None = None
+    walked_track = TrackPyramid()
+    walked_points_writer = WalkedPointsWriter()
+    finish_route_executor: ThreadPoolExecutor | None = None
+    finish_route_steps: TaskGraph | None = None
+
+    with span("lat_long.read"), open(Path("lat_long.json"), "r") as file:
         lat_longJSON: dict[str, dict[str, float] | list[dict[str, float]]] = load_json_file(file)
 
     lat_longJSON["drawing_points"] = []
     lat_longJSON["desired_map_original_centre"] = {}
+    lat_longJSON.pop("zoom", None)
 
-    with open(Path("lat_long.json"), "w") as file:
+    with span("lat_long.write"), open(Path("lat_long.json"), "w") as file:
         dump_to_json(lat_longJSON, file)
 
+    # Widgets shown in each state, in the order they're drawn
+    state_widgets: dict[str, list[Widget]] = {
+        "import_drawing": [big_logo, title, import_drawing_button],
+        "get_desired_map": [
+            desired_map_image, drawing, mini_logo, course_zoom_in_button, course_zoom_out_button, course_zoom_label,
+            fine_zoom_out_button, fine_zoom_in_button, fine_zoom_label, get_new_desired_map_centre_button, confirm_desired_map_centre_button
+        ],
+        "pre_walk": [mini_logo, desired_map_image, drawing, suggested_route_image, start_walking_button, walk_to_start_title],
+        "walking": [
+            mini_logo, desired_map_image, drawing, location_marker_map_image, walking_drawing_image,
+            coverage_image, add_new_walking_point_button, finish_walking_button, off_course_label, coverage_label
+        ],
+        "image_comparison": [
+            mini_logo, drawing, walking_drawing_image, coverage_image, comparison_percentage, coverage_label, export_walk_button, export_walk_label,
+            finish_route_progress_label
+        ]
+    }
+
+    clock = pygame.time.Clock()
+    full_redraw = True
+    pending_window_size: tuple[int, int] | None = None
+    last_resize_time = 0
+
     while True:
+        clock.tick(MAX_FPS)
         mousedown = False
+        previous_state = state
 
-        for event in pygame.event.get():
+        # Sleep until something happens rather than spinning, then take everything else that queued up meanwhile
+        for event in [pygame.event.wait(_RESIZE_DEBOUNCE_MS if pending_window_size else _EVENT_WAIT_TIMEOUT_MS), *pygame.event.get()]:
             if event.type == pygame.QUIT:
+                # Lets any running finish route step end before pygame, which they draw with, is shut down under them. Map
+                # downloads time out, so this waits seconds at most
+                if finish_route_executor is not None:
+                    finish_route_executor.shutdown(cancel_futures=True)
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mousedown = True
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_metrics_overlay = not show_metrics_overlay
+                full_redraw = True
 
             if event.type == pygame.VIDEORESIZE:
-                WINDOW.size = (event.w, event.h)
-
-        screen.fill((255, 255, 255))
+                pending_window_size = (event.w, event.h)
+                last_resize_time = pygame.time.get_ticks()
+
+        frame_start = time.perf_counter()
+
+        # Dragging the window edge fires a storm of resize events, only lay out again once it settles
+        if pending_window_size and pygame.time.get_ticks() - last_resize_time >= _RESIZE_DEBOUNCE_MS:
+            WINDOW.size = pending_window_size
+            pending_window_size = None
+            full_redraw = True
+
+        # Results of finishing the route are shown as each step completes rather than all at the end
+        if finish_route_steps is not None and (finished_steps := finish_route_steps.poll()):
+            for (step, result, exception) in finished_steps:
+                if exception is not None:
+                    logger.error(f"Finishing route step {step} failed: {exception!r}")
+                    if step == "comparison":
+                        comparison_percentage.text = "Your route couldn't be compared to your drawing"
+                elif step == "location":
+                    with span("coverage.update"):
+                        add_walked_segment(coverage_map, last_walked_location, result, desired_map_cache_still_deciding_centre, desired_map_zoom)
+                        last_walked_location = result
+                        coverage_image.setSurface(get_coverage_surface(coverage_map))
+                    coverage_label.text = f"{coverage_map.percent_covered:.0f}% of your drawing walked"
+                elif step == "walking_map":
+                    location_marker_map_image.reloadImage(result)
+                elif step == "route_drawing":
+                    walking_drawing_image.reloadImage(result)
+                elif step == "comparison":
+                    comparison_percentage.text = f"Your route was {result} similar to the uploaded drawing!"
+
+            if finish_route_steps.done:
+                finish_route_progress_label.text = ""
+            else:
+                running_steps = finish_route_steps.running
+                running = [description.lower() for (step, description) in _FINISH_ROUTE_STEP_DESCRIPTIONS.items() if step in running_steps]
+                finish_route_progress_label.text = f"{finish_route_steps.finished_count}/{len(finish_route_steps)} done, {' & '.join(running)}..."
 
         if state == "import_drawing":
-            big_logo.draw(screen)
-            title.draw(screen)
-            import_drawing_button.draw(screen)
-
             if import_drawing_button.click(mousedown):
                 drawing_file_path = getFile()
                 logger.debug(drawing_file_path or "No file chosen")
 
                 if drawing_file_path:
+                    # Decoded straight down to its on-screen size, rather than loading the full size photo & shrinking it
+                    with span("drawing.import"):
+                        drawing_file_path = drawing_importer.import_drawing(drawing_file_path)
                     drawing.reloadImage(drawing_file_path)
                     logger.debug("file found")
 
-                    drawing.fitToRect((760, 630))
+                    with span("drawing.vectorise"):
+                        drawing_polylines = drawing_vectoriser.vectorise_drawing(drawing_file_path)
 
                     drawing_width, drawing_height = drawing.img.get_size()
 
@@ -295,22 +276,9 @@ def main():
                     drawing.pos = (3, 2)
                     drawing.alpha = 0.25
 
-                    logger.debug("changing state to get_desired_map")
-                    state = "get_desired_map"
+                    state = change_state("get_desired_map")
 
         elif state == "get_desired_map":
-            desired_map_image.draw(screen)
-            drawing.draw(screen)
-            mini_logo.draw(screen)
-            course_zoom_in_button.draw(screen)
-            course_zoom_out_button.draw(screen)
-            course_zoom_label.draw(screen)
-            fine_zoom_out_button.draw(screen)
-            fine_zoom_in_button.draw(screen)
-            fine_zoom_label.draw(screen)
-            get_new_desired_map_centre_button.draw(screen)
-            confirm_desired_map_centre_button.draw(screen)
-
             if course_zoom_in_button.click(mousedown):
                 if desired_map_zoom + 1 <= 20:
                     logger.debug("course zoom in")
@@ -353,92 +321,154 @@ def main():
                 desired_map_cache_still_deciding_centre = extract_current_location(raw_gps_string=raw)
                 desired_map_image.reloadImage(get_desired_background_map_image(drawing_width, drawing_height, desired_map_zoom, desired_map_cache_still_deciding_centre))
             elif confirm_desired_map_centre_button.click(mousedown):
-                with open(Path("lat_long.json"), "r") as file:
+                with span("lat_long.read"), open(Path("lat_long.json"), "r") as file:
                     lat_longJSON: dict[str, dict[str, float] | list[dict[str, float]]] = load_json_file(file)
 
                 lat_longJSON["desired_map_original_centre"] = desired_map_cache_still_deciding_centre
+                # Lets the walk be exported or rescored later at the scale it was drawn at
+                lat_longJSON["zoom"] = desired_map_zoom
 
-                with open(Path("lat_long.json"), "w") as file:
+                with span("lat_long.write"), open(Path("lat_long.json"), "w") as file:
                     dump_to_json(lat_longJSON, file)
 
-                logger.debug("changing state to pre_walk")
-                state = "pre_walk"
+                drawing_width, drawing_height = drawing.img.get_size()
+                drawing_index = get_drawing_segment_index(drawing_polylines, desired_map_cache_still_deciding_centre, desired_map_zoom, drawing_width, drawing_height)
+                coverage_map = get_drawing_coverage_map(drawing_polylines, desired_map_cache_still_deciding_centre, desired_map_zoom, drawing_width, drawing_height, ON_DRAWING_TOLERANCE_METRES)
 
-        elif state == "pre_walk":
-            mini_logo.draw(screen)
-            desired_map_image.draw(screen)
-            drawing.draw(screen)
-            start_walking_button.draw(screen)
-            walk_to_start_title.draw(screen)
+                # A route suggestion is only a help, so a missing or broken extract is logged & the walk goes ahead without one
+                try:
+                    if street_graph.OSM_EXTRACT_FILE_PATH is not None:
+                        walkable_streets = street_graph.StreetGraph.from_osm_file(street_graph.OSM_EXTRACT_FILE_PATH, desired_map_cache_still_deciding_centre)
+                        suggested_routes = route_planner.suggest_route(walkable_streets, drawing_vectoriser.scale_polylines(drawing_polylines, drawing_width, drawing_height), desired_map_zoom, drawing_width, drawing_height)
+                        logger.debug(f"Suggested route has {len(suggested_routes)} strokes")
 
-            if start_walking_button.click(mousedown):
-                desired_map_image.pos = (1, 3)
-                drawing.pos = (1, 3)
-                drawing.alpha = 0.25
+                        if suggested_routes:
+                            suggested_route_image.reloadImage(get_suggested_route_image_path(suggested_routes, drawing_width, drawing_height, desired_map_zoom))
+                except (ImportError, OSError, SyntaxError, TypeError, ValueError) as e:
+                    # SyntaxError covers a malformed extract, ElementTree's ParseError is one
+                    logger.error(f"Couldn't suggest a route: {e!r}")
+
+                state = change_state("pre_walk")
 
+        elif state == "pre_walk":
+            if start_walking_button.click(mousedown):
                 raw = get_raw_location_data()
                 logger.debug(raw)
                 current_location = extract_current_location(raw)
 
-                with open(Path("lat_long.json"), "r") as file:
-                    lat_longJSON: dict[str, dict[str, float] | list[dict[str, float]]] = load_json_file(file)
+                distance_from_drawing, _ = drawing_index.nearest(latlon_to_metres(current_location, desired_map_cache_still_deciding_centre))
+                logger.debug(f"{distance_from_drawing}m from drawing")
 
-                lat_longJSON["drawing_points"].append(current_location)
+                # A drawing that vectorised to nothing can't be checked, so let the user start anywhere
+                if len(drawing_index) and distance_from_drawing > ON_DRAWING_TOLERANCE_METRES:
+                    walk_to_start_title.text = f"You are {distance_from_drawing:.0f}m away from your drawing, walk a bit closer\nOnly press the button below when you are on your drawing!"
+                else:
+                    desired_map_image.pos = (1, 3)
+                    drawing.pos = (1, 3)
+                    drawing.alpha = 0.25
 
-                with open(Path("lat_long.json"), "w") as file:
-                    dump_to_json(lat_longJSON, file)
+                    save_walked_location(current_location, walked_track, walked_points_writer)
 
-                drawing_width, drawing_height = drawing.img.get_size()
+                    drawing_width, drawing_height = drawing.img.get_size()
 
-                location_marker_map_image.reloadImage(get_walking_background_map_image(drawing_width, drawing_height, desired_map_zoom, current_location))
-                walking_drawing_image.reloadImage(get_walking_drawing_image_path(drawing_width, drawing_height, desired_map_zoom))
+                    location_marker_map_image.reloadImage(get_walking_background_map_image(drawing_width, drawing_height, desired_map_zoom, current_location))
+                    walking_drawing_image.reloadImage(get_walking_drawing_image_path(drawing_width, drawing_height, desired_map_zoom, track=walked_track, centre=desired_map_cache_still_deciding_centre))
 
-                logger.debug("changing state to walking")
-                state = "walking"
+                    add_walked_segment(coverage_map, current_location, current_location, desired_map_cache_still_deciding_centre, desired_map_zoom)
+                    last_walked_location = current_location
+                    coverage_image.setSurface(get_coverage_surface(coverage_map))
+                    coverage_label.text = f"{coverage_map.percent_covered:.0f}% of your drawing walked"
+
+                    state = change_state("walking")
 
         elif state == "walking":
-            mini_logo.draw(screen)
-            desired_map_image.draw(screen)
-            drawing.draw(screen)
-            location_marker_map_image.draw(screen)
-            walking_drawing_image.draw(screen)
-            add_new_walking_point_button.draw(screen)
-            finish_walking_button.draw(screen)
-
-            if add_new_walking_point_button.click(mousedown) or finish_walking_button.click(mousedown):
+            if add_new_walking_point_button.click(mousedown):
                 raw = get_raw_location_data()
                 logger.debug(raw)
                 current_location = extract_current_location(raw)
 
-                with open(Path("lat_long.json"), "r") as file:
-                    lat_longJSON: dict[str, dict[str, float] | list[dict[str, float]]] = load_json_file(file)
+                save_walked_location(current_location, walked_track, walked_points_writer)
 
-                lat_longJSON["drawing_points"].append(current_location)
+                distance_from_drawing, _ = drawing_index.nearest(latlon_to_metres(current_location, desired_map_cache_still_deciding_centre))
+                if not len(drawing_index):
+                    off_course_label.text = ""
+                elif distance_from_drawing > ON_DRAWING_TOLERANCE_METRES:
+                    off_course_label.text = f"You are {distance_from_drawing:.0f}m off your drawing"
+                else:
+                    off_course_label.text = "You are on your drawing"
 
-                with open(Path("lat_long.json"), "w") as file:
-                    dump_to_json(lat_longJSON, file)
+                # Only the cells near the new stretch of walk are touched, however long the walk gets
+                with span("coverage.update"):
+                    add_walked_segment(coverage_map, last_walked_location, current_location, desired_map_cache_still_deciding_centre, desired_map_zoom)
+                    last_walked_location = current_location
+                    coverage_image.setSurface(get_coverage_surface(coverage_map))
+                coverage_label.text = f"{coverage_map.percent_covered:.0f}% of your drawing walked"
 
                 drawing_width, drawing_height = drawing.img.get_size()
 
                 location_marker_map_image.reloadImage(get_walking_background_map_image(drawing_width, drawing_height, desired_map_zoom, current_location))
-                walking_drawing_image.reloadImage(get_walking_drawing_image_path(drawing_width, drawing_height, desired_map_zoom))
+                walking_drawing_image.reloadImage(get_walking_drawing_image_path(drawing_width, drawing_height, desired_map_zoom, track=walked_track, centre=desired_map_cache_still_deciding_centre))
+
+            elif finish_walking_button.click(mousedown):
+                drawing_width, drawing_height = drawing.img.get_size()
+                drawing_path = drawing.path
+
+                # The last point is recorded, drawn & scored off the UI thread, the map & route drawing only wait on what they need
+                if finish_route_executor is None:
+                    finish_route_executor = ThreadPoolExecutor(max_workers=_FINISH_ROUTE_WORKERS, thread_name_prefix="finish_route")
+                finish_route_steps = TaskGraph(finish_route_executor, lambda _: pygame.event.post(pygame.event.Event(finish_route_step_done_event)))
+                finish_route_steps.add("location", lambda: extract_current_location(get_raw_location_data()))
+                finish_route_steps.add("walk_saved", lambda location: save_walked_location(location, walked_track, walked_points_writer), "location")
+                # Given the centre rather than reading it from lat_long.json, which walk_saved may be rewriting at the same time
+                finish_route_steps.add(
+                    "walking_map",
+                    lambda location: get_walking_background_map_image(drawing_width, drawing_height, desired_map_zoom, location, desired_map_cache_still_deciding_centre),
+                    "location"
+                )
+                finish_route_steps.add(
+                    "route_drawing", lambda _: get_walking_drawing_image_path(drawing_width, drawing_height, desired_map_zoom, track=walked_track, centre=desired_map_cache_still_deciding_centre), "walk_saved"
+                )
+                finish_route_steps.add("comparison", lambda route_drawing_path: Image_Comparer.image_similarity(route_drawing_path, drawing_path), "route_drawing")
+                finish_route_steps.start()
 
-            if finish_walking_button.click(mousedown):
                 drawing.pos = (3, 3)
                 drawing.alpha = 1
                 walking_drawing_image.pos = (3, 3)
-                comparison_percentage.text = f"Your route was {image_similarity(walking_drawing_image.path, drawing.path)} similar to the uploaded drawing!"
+                coverage_image.pos = (3, 3)
+                coverage_label.pos = (3, 7)
+                comparison_percentage.text = "Comparing your route to your drawing..."
+                finish_route_progress_label.text = f"0/{len(finish_route_steps)} done, getting your last location..."
 
-                logger.debug("changing state to image_comparison")
-                state = "image_comparison"
+                state = change_state("image_comparison")
 
         elif state == "image_comparison":
-            mini_logo.draw(screen)
-            drawing.draw(screen)
-            walking_drawing_image.draw(screen)
-            comparison_percentage.draw(screen)
-
-        pygame.display.flip()
+            if export_walk_button.click(mousedown):
+                # lat_long.json is wiped on the next launch, so this is what keeps the walk
+                if not finish_route_steps.finished("walk_saved"):
+                    export_walk_label.text = "Your walk is still being saved"
+                else:
+                    try:
+                        export_paths = route_exporter.export_walk(Path("lat_long.json"), desired_map_zoom, drawing.img.get_size(), drawing_polylines)
+                    except (OSError, ValueError) as e:
+                        logger.error(f"Couldn't export walk: {e}")
+                        export_walk_label.text = "Your walk couldn't be exported"
+                    else:
+                        export_walk_label.text = f"Exported to {export_paths[0].with_suffix('')}.*"
+
+        if state != previous_state:
+            full_redraw = True
+
+        widgets = [widget for widget in state_widgets[state] if not isinstance(widget, Image) or widget.loaded]
+        if show_metrics_overlay:
+            metrics_overlay.lines = overlay_lines(clock.get_fps())
+            widgets.append(metrics_overlay)
+
+        with span("frame.render"):
+            renderWidgets(screen, widgets, full_redraw)
+        full_redraw = False
+
+        if METRICS_ENABLED:
+            record("frame", time.perf_counter() - frame_start)
 
 
 if __name__ == "__main__":
@@ -8,3 +8,26 @@ ACCEPTABLE_LOG_LEVELS = ("debug", "info", "warning", "error", "critical")
 LOG_LEVEL = getenv("LOG_LEVEL", "warning").lower()
 if LOG_LEVEL not in ACCEPTABLE_LOG_LEVELS:
     raise ValueError(f"Environment variable LOG_LEVEL must be one of {repr(ACCEPTABLE_LOG_LEVELS)}.")
+
+# Span timings are only collected when turned on, so instrumented code costs next to nothing otherwise
+ACCEPTABLE_METRICS_FLAGS = ("off", "on")
+METRICS = getenv("METRICS", "off").lower()
+if METRICS not in ACCEPTABLE_METRICS_FLAGS:
+    raise ValueError(f"Environment variable METRICS must be one of {repr(ACCEPTABLE_METRICS_FLAGS)}.")
+METRICS_ENABLED = METRICS == ACCEPTABLE_METRICS_FLAGS[1]
+
+ACCEPTABLE_METRICS_FILE_EXTENSIONS = (".json", ".prom")
+METRICS_FILE_NAME = getenv("METRICS_FILE_NAME") or None
+if METRICS_FILE_NAME is not None and not METRICS_FILE_NAME.endswith(ACCEPTABLE_METRICS_FILE_EXTENSIONS):
+    raise ValueError(f"Environment variable METRICS_FILE_NAME must end in one of {repr(ACCEPTABLE_METRICS_FILE_EXTENSIONS)}.")
+
+# CPU & memory profiles are captured per UI state when turned on, written to the Profiles directory
+ACCEPTABLE_PROFILE_FLAGS = ("off", "on")
+PROFILE = getenv("PROFILE", "off").lower()
+if PROFILE not in ACCEPTABLE_PROFILE_FLAGS:
+    raise ValueError(f"Environment variable PROFILE must be one of {repr(ACCEPTABLE_PROFILE_FLAGS)}.")
+PROFILING_ENABLED = PROFILE == ACCEPTABLE_PROFILE_FLAGS[1]
+
+PROFILE_TOP_N = int(getenv("PROFILE_TOP_N", "25"))
+if not 1 <= PROFILE_TOP_N <= 1000:
+    raise ValueError(f"Environment variable PROFILE_TOP_N must be between 1 & 1000.")